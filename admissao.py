@@ -0,0 +1,220 @@
+from collections import deque
+from flask import g, request
+import math
+import os
+import threading
+import time
+
+from logger import logger
+
+# Configuração do controle de admissão das requisições, via variáveis de ambiente
+# ADMISSAO: '1' limita as requisições simultâneas do processo, com fila de espera limitada
+ADMISSAO = os.environ.get("ADMISSAO", "0") == "1"
+# Requisições simultâneas de leitura (GET) e de escrita (POST, DELETE) do processo
+ADMISSAO_LEITURAS = int(os.environ.get("ADMISSAO_LEITURAS", 16))
+ADMISSAO_ESCRITAS = int(os.environ.get("ADMISSAO_ESCRITAS", 4))
+# Limites próprios de rotas caras, no formato 'METODO /rota=N' separados por vírgula;
+# a requisição ocupa também uma vaga do orçamento de leitura ou de escrita
+ADMISSAO_ROTAS = os.environ.get("ADMISSAO_ROTAS", "GET /livros/export=2,POST /livros/bulk=1")
+# Requisições que podem aguardar vaga em cada limite; além delas, a resposta é 503 imediato
+ADMISSAO_FILA = int(os.environ.get("ADMISSAO_FILA", 32))
+# Tempo máximo (ms) de espera por vaga, somado entre os limites da rota; depois dele, 503
+ADMISSAO_ESPERA_MS = float(os.environ.get("ADMISSAO_ESPERA_MS", 500))
+
+# Rotas POST que apenas consultam o catálogo e usam o orçamento de leitura
+ROTAS_POST_LEITURA = {"/livros/lookup"}
+# Rotas nunca limitadas (o monitoramento precisa responder justamente durante a sobrecarga)
+ROTAS_ISENTAS = {"/metrics"}
+
+
+class Rejeitada(Exception):
+    """ A requisição não obteve vaga: a fila do limite está cheia ou o prazo de espera acabou. """
+
+    def __init__(self, limite, motivo: str):
+        super().__init__(f"{limite.nome}: {motivo}")
+        self.limite = limite
+        self.motivo = motivo
+
+
+class Limite:
+    """
+    Limite de requisições simultâneas com fila de espera limitada, em ordem de chegada.
+
+    Ao sair, a requisição entrega a vaga diretamente à primeira da fila, de modo que
+    uma requisição recém-chegada não passa à frente das que já aguardam. Com a fila
+    cheia a requisição é rejeitada sem esperar.
+    """
+
+    def __init__(self, nome: str, concorrencia: int, fila: int = ADMISSAO_FILA):
+        self.nome = nome
+        self.concorrencia = concorrencia
+        self.maximo_fila = fila
+        self.em_execucao = 0
+        self._fila = deque()  # eventos das requisições em espera
+        self._trava = threading.Lock()
+        self.admitidas = 0
+        self.rejeicoes = {"fila_cheia": 0, "prazo": 0}
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+
+    def entra(self, prazo: float):
+        """
+        Ocupa uma vaga, aguardando até o instante 'prazo' (time.monotonic) se necessário.
+
+        :return: O tempo (s) de espera pela vaga.
+        :raises Rejeitada: Se a fila estiver cheia ou o prazo acabar.
+        """
+        inicio = time.monotonic()
+        with self._trava:
+            if self.em_execucao < self.concorrencia and not self._fila:
+                self.em_execucao += 1
+                self.admitidas += 1
+                return 0.0
+            if len(self._fila) >= self.maximo_fila:
+                self.rejeicoes["fila_cheia"] += 1
+                raise Rejeitada(self, "fila_cheia")
+            vaga = threading.Event()
+            self._fila.append(vaga)
+
+        concedida = vaga.wait(max(prazo - inicio, 0))
+        with self._trava:
+            if not concedida and not vaga.is_set():
+                self._fila.remove(vaga)
+                self.rejeicoes["prazo"] += 1
+                raise Rejeitada(self, "prazo")
+            # A vaga foi entregue por 'sai' (em_execucao já a conta)
+            espera = time.monotonic() - inicio
+            self.admitidas += 1
+            self.espera_total += espera
+            self.espera_maxima = max(self.espera_maxima, espera)
+        return espera
+
+    def sai(self):
+        """ Libera a vaga, entregando-a à primeira requisição da fila, se houver. """
+        with self._trava:
+            if self._fila:
+                self._fila.popleft().set()
+            else:
+                self.em_execucao -= 1
+
+    def estatisticas(self):
+        with self._trava:
+            return {"concorrencia": self.concorrencia, "em_execucao": self.em_execucao, "fila": len(self._fila),
+                    "admitidas": self.admitidas, "rejeicoes": dict(self.rejeicoes),
+                    "espera_total": self.espera_total, "espera_maxima": self.espera_maxima}
+
+
+def _interpreta_rotas(texto: str):
+    """ Converte 'GET /livros/export=2,POST /livros/bulk=1' em {('GET', '/livros/export'): 2, ...}. """
+    rotas = {}
+    for item in filter(None, (parte.strip() for parte in texto.split(","))):
+        try:
+            rota, concorrencia = item.rsplit("=", 1)
+            metodo, caminho = rota.split()
+            rotas[(metodo.upper(), caminho)] = int(concorrencia)
+        except ValueError:
+            raise ValueError(f"ADMISSAO_ROTAS inválido: '{item}' (use 'METODO /rota=N').")
+    return rotas
+
+
+class Admissao:
+    """
+    Controle de admissão das requisições do processo.
+
+    Cada requisição ocupa uma vaga do orçamento de leitura ou do de escrita, separados para
+    que uma carga de inclusões não esgote as leituras nem o contrário, e antes, nas rotas
+    configuradas, uma vaga do limite da própria rota. Assim as rotas caras aguardam na sua
+    fila sem ocupar o orçamento compartilhado com as rotas baratas.
+    """
+
+    def __init__(self, leituras: int = ADMISSAO_LEITURAS, escritas: int = ADMISSAO_ESCRITAS,
+                 rotas: str = ADMISSAO_ROTAS, fila: int = ADMISSAO_FILA, espera_ms: float = ADMISSAO_ESPERA_MS):
+        self.espera = espera_ms / 1000
+        self.limites = {"leitura": Limite("leitura", leituras, fila), "escrita": Limite("escrita", escritas, fila)}
+        self.limites_rotas = {(metodo, caminho): Limite(f"{metodo} {caminho}", concorrencia, fila)
+                              for (metodo, caminho), concorrencia in _interpreta_rotas(rotas).items()}
+
+    def limites_da_requisicao(self, metodo: str, rota: str):
+        """ Retorna os limites que a requisição deve ocupar, na ordem em que são ocupados. """
+        leitura = metodo in ("GET", "HEAD") or (metodo == "POST" and rota in ROTAS_POST_LEITURA)
+        orcamento = self.limites["leitura" if leitura else "escrita"]
+        limite_rota = self.limites_rotas.get((metodo, rota))
+        return [limite_rota, orcamento] if limite_rota is not None else [orcamento]
+
+    def admite(self, limites):
+        """
+        Ocupa as vagas de todos os limites, dentro de um único prazo de espera.
+
+        :return: Lista dos limites ocupados (a liberar com 'libera').
+        :raises Rejeitada: Se algum limite rejeitar a requisição (as vagas já ocupadas são liberadas).
+        """
+        prazo = time.monotonic() + self.espera
+        ocupados = []
+        try:
+            for limite in limites:
+                limite.entra(prazo)
+                ocupados.append(limite)
+        except Rejeitada:
+            self.libera(ocupados)
+            raise
+        return ocupados
+
+    @staticmethod
+    def libera(limites):
+        for limite in reversed(limites):
+            limite.sai()
+
+    def retry_after(self):
+        """ Segundos sugeridos ao cliente no cabeçalho Retry-After: o prazo de espera, arredondado para cima. """
+        return max(1, math.ceil(self.espera))
+
+    def estatisticas(self):
+        limites = list(self.limites.values()) + list(self.limites_rotas.values())
+        return {limite.nome: limite.estatisticas() for limite in limites}
+
+
+admissao = Admissao() if ADMISSAO else None
+
+
+def registra_admissao(app):
+    """
+    Aplica o controle de admissão às rotas da aplicação (exceto GET /metrics): antes de
+    cada requisição ocupa as vagas da rota, aguardando na fila até ADMISSAO_ESPERA_MS, e
+    responde 503 com Retry-After se não conseguir. As vagas são liberadas no teardown da
+    requisição (também quando ela falha) ou, nas respostas em streaming, ao fim do envio do corpo.
+
+    Os limites valem por processo: com vários workers, o total é o limite vezes os workers.
+
+    :param app: A aplicação Flask.
+    """
+    if admissao is None:
+        return
+
+    @app.before_request
+    def admite_requisicao():
+        if request.url_rule is None or request.method == "OPTIONS" or request.url_rule.rule in ROTAS_ISENTAS:
+            return None
+        limites = admissao.limites_da_requisicao(request.method, request.url_rule.rule)
+        try:
+            g.admissao_limites = admissao.admite(limites)
+        except Rejeitada as e:
+            logger.debug("Requisição rejeitada (%s): %s %s", e, request.method, request.path)
+            return ({"message": "Servidor sobrecarregado, tente novamente em instantes."}, 503,
+                    {"Retry-After": str(admissao.retry_after())})
+        return None
+
+    @app.after_request
+    def libera_ao_fim_do_envio(response):
+        # Em respostas em streaming (ex.: /livros/export) o teardown ocorre antes do envio do
+        # corpo; as vagas são liberadas quando o servidor termina de enviá-lo
+        if response.is_streamed:
+            limites = g.pop("admissao_limites", None)
+            if limites:
+                response.call_on_close(lambda: admissao.libera(limites))
+        return response
+
+    @app.teardown_request
+    def libera_requisicao(exception=None):
+        limites = g.pop("admissao_limites", None)
+        if limites:
+            admissao.libera(limites)
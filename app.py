@@ -1,32 +1,55 @@
-from flask_openapi3 import OpenAPI, Info, Tag
-from flask import redirect
+from flask_openapi3 import Info, Tag
+from flask import redirect, request, Response, stream_with_context
 
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
 
-from model import Session, Autor, Editora, Livro
-from logger import logger
+from model import Session, Autor, Editora, Livro, consulta_livros, \
+                  remove_livro, remove_livros, insere_livros_lote, insere_nomeados_lote, busca_livros, \
+                  consulta_contagens, inicializa_banco, CONTAGEM_MATERIALIZADA, LIVRO_VIEW_MATERIALIZADA, \
+                  INICIALIZA_BANCO
+from logger import logger, configura_log, registra_log_requisicao
+from documentacao import OpenAPISobDemanda, APIBlueprintSobDemanda
+from sessao import registra_sessao
+from metricas import registra_metricas, metricas
+from cache import cache_leitura, consultas_coalescidas, TABELAS_LIVRO
+from escrita import escritor, RegistroDuplicado
+from autocompletar import indice_prefixos, indexa_resultado_lote, carrega_autocompletar
+from etag import get_condicional
+from leitura import roteia_leitura, sessao_leitura, registra_leitura
+from admissao import registra_admissao
 from schemas import *
 from flask_cors import CORS
-from urllib.parse import unquote
+import zlib
 
 info = Info(title="Minha API", version="1.0.0")
-app = OpenAPI(__name__, info=info)
-CORS(app)
+
+# Rotas da API, registradas na aplicação por create_app
+api = APIBlueprintSobDemanda("catalogo", __name__)
 
 # Definindo tags
 home_tag = Tag(name="Documentação", description="Documentação: Swagger, Redoc ou RapiDoc")
 autor_tag = Tag(name="Autor", description="Adição e visualização de autores")
 editora_tag = Tag(name="Editora", description="Adição e visualização de editoras")
 livro_tag = Tag(name="Livro", description="Adição, visualização e remoção de livros")
+estatistica_tag = Tag(name="Estatística", description="Contagens de livros por editora, autor e ano")
+autocompletar_tag = Tag(name="Autocompletar", description="Sugestões de livros, autores e editoras pelo início do nome")
+monitoramento_tag = Tag(name="Monitoramento", description="Métricas de requisições e do banco de dados")
 
-@app.get('/', tags=[home_tag])
+@api.get('/', tags=[home_tag])
 def home():
     """Redireciona para /openapi"""
     return redirect('/openapi')
 
+@api.get('/metrics', tags=[monitoramento_tag])
+def get_metricas():
+    """
+        Exporta as métricas do processo no formato do Prometheus: requisições e latências por rota,
+        comandos SQL e tempo de banco por rota, e os comandos SQL mais lentos.
+    """
+    return Response(metricas.exporta(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
 ### GERENCIAR AUTOR ###
-@app.post('/autor', tags=[autor_tag],
+@api.post('/autor', tags=[autor_tag],
           responses={"200": AutorViewSchema, "409": ErrorSchema, "400": ErrorSchema})
 def add_autor(form: AutorSchema):
     """
@@ -34,53 +57,126 @@ def add_autor(form: AutorSchema):
         Retorna uma representação de Autor.
     """
     autor = Autor(nome=form.nome)
-    logger.debug(f"Adicionando autor de nome: '{autor.nome}'")
+    logger.debug("Adicionando autor de nome: '%s'", autor.nome)
 
     try:
-        # Criando conexão com a base de dados
-        session = Session()
-        # Adicionando um Autor
-        session.add(autor)
-        # Efetivando a adição do novo Autor na tabela
-        session.commit()
-
-        logger.debug(f"Autor '{autor.nome}' adicionado com sucesso.")
+        if escritor is not None:
+            # Escrita em grupo: efetivada pela thread de escrita, junto com as inclusões simultâneas
+            autor.id = escritor.insere("autor", autor.nome)
+        else:
+            # Criando conexão com a base de dados
+            session = Session()
+            # Adicionando um Autor
+            session.add(autor)
+            # Efetivando a adição do novo Autor na tabela
+            session.commit()
+        indice_prefixos.adiciona("autor", autor.id, autor.nome)
+
+        logger.debug("Autor '%s' adicionado com sucesso.", autor.nome)
         return apresenta_autor(autor), 200
-    except IntegrityError as e:
+    except (IntegrityError, RegistroDuplicado) as e:
         # IntegrityError para evitar duplicidade do nome
         error_msg = "Já existe um autor com o mesmo nome."
 
-        logger.warning(f"Erro ao adicionar autor '{autor.nome}': {error_msg}")
+        logger.warning("Erro ao adicionar autor '%s': %s", autor.nome, error_msg)
         return {"message": error_msg}, 409
     except Exception as e:
         # Erro imprevisto
         error_msg = "Não foi possível salvar o novo autor."
         
-        logger.warning(f"Erro ao adicionar autor '{autor.nome}': {error_msg}")
+        logger.warning("Erro ao adicionar autor '%s': %s", autor.nome, error_msg)
         return {"message": error_msg}, 400
 
-@app.get('/autores', tags=[autor_tag],
-          responses={"200": ListagemAutoresSchema, "404": ErrorSchema})
-def get_autores():
+@api.post('/autores/bulk', tags=[autor_tag],
+          responses={"200": ListagemResultadoLoteSchema, "409": ErrorSchema, "400": ErrorSchema})
+def add_autores_lote(body: AutorLoteSchema):
     """
-        Busca por todos os autores cadastrados.
-        Retorna uma lista de autores.
+        Adiciona um lote de novos autores em uma única transação.
+        Retorna o resultado de cada registro: criado ou duplicado.
     """
-    logger.debug("Coletando todos os autores.")
+    logger.debug("Adicionando lote de %s autores.", len(body.autores))
 
-    # Criando conexão com a base de dados
     session = Session()
-    # Realizando a busca
-    autores = session.query(Autor).all()
+    try:
+        nomes = [autor.nome for autor in body.autores]
+        resultados = insere_nomeados_lote(session, Autor, nomes)
+        session.commit()
+        indexa_resultado_lote("autor", resultados, nomes)
+
+        logger.debug("Lote de autores adicionado: %s registros processados.", len(resultados))
+        return apresenta_resultado_lote(resultados), 200
+    except IntegrityError:
+        # Inserção concorrente de um mesmo nome entre a verificação e a inserção
+        session.rollback()
+        error_msg = "Conflito ao salvar o lote de autores, tente novamente."
+
+        logger.warning("Erro ao adicionar lote de autores: %s", error_msg)
+        return {"message": error_msg}, 409
+    except Exception as e:
+        # Erro imprevisto
+        session.rollback()
+        error_msg = "Não foi possível salvar o lote de autores."
+
+        logger.error("Erro ao adicionar lote de autores: %s", e)
+        return {"message": error_msg}, 400
+    finally:
+        session.close()
+
+@api.get('/autores', tags=[autor_tag],
+          responses={"200": ListagemAutoresSchema, "404": ErrorSchema})
+@roteia_leitura
+@get_condicional("autor")
+@cache_leitura("autor")
+def get_autores(query: PaginacaoSchema):
+    """
+        Busca pelos autores cadastrados, paginados por cursor.
+        Retorna uma lista de autores e o cursor da próxima página.
+    """
+    logger.debug("Coletando autores.")
+
+    # Criando conexão com a base de dados (de leitura, se configurada; ver leitura.py)
+    session = sessao_leitura()
+    # Realizando a busca (um registro a mais para saber se existe próxima página)
+    busca = session.query(Autor.id, Autor.nome)
+    if query.after is not None:
+        busca = busca.filter(Autor.id > query.after)
+    autores, next_cursor = pagina(busca.order_by(Autor.id).limit(query.limit + 1).all(), query.limit)
 
     if not autores:
-        return {"autores": []}, 200
+        return {"autores": [], "next_cursor": None}, 200
     else:
-        logger.debug(f"{len(autores)} autores encontrados.")
-        return apresenta_autores(autores), 200
+        logger.debug("%s autores encontrados.", len(autores))
+        return Response(apresenta_autores_json(autores, next_cursor), mimetype="application/json")
+
+@api.get('/autor/<int:id>/livros', tags=[autor_tag],
+          responses={"200": ListagemLivrosSchema, "404": ErrorSchema})
+@get_condicional(*TABELAS_LIVRO)
+@cache_leitura(*TABELAS_LIVRO)
+def get_livros_autor(path: AutorPathSchema, query: LivroListagemSchema):
+    """
+        Busca pelos livros do autor, paginados por cursor.
+        Retorna uma lista de livros, apenas com os campos solicitados, e o cursor da próxima página.
+    """
+    logger.debug("Coletando livros do autor #%s.", path.id)
+
+    # Criando conexão com a base de dados
+    session = Session()
+    if session.get(Autor, path.id) is None:
+        error_msg = "Autor não encontrado."
+        logger.warning("Erro ao buscar livros do autor #%s: %s", path.id, error_msg)
+        return {"message": error_msg}, 404
+
+    # Realizando a busca (projeção em tuplas, com número constante de SELECTs)
+    campos = query.campos
+    livros = consulta_livros(session, limit=query.limit + 1, after=query.after, campos=campos, id_autor=path.id,
+                             materializada=LIVRO_VIEW_MATERIALIZADA)
+    livros, next_cursor = pagina(livros, query.limit, chave=lambda livro: livro[0])
+
+    logger.debug("%s livros encontrados para o autor #%s.", len(livros), path.id)
+    return Response(apresenta_livros_json(livros, campos, next_cursor), mimetype="application/json")
 
 ### GERENCIAR EDITORA ###
-@app.post('/editora', tags=[editora_tag],
+@api.post('/editora', tags=[editora_tag],
           responses={"200": EditoraViewSchema, "409": ErrorSchema, "400": ErrorSchema})
 def add_editora(form: EditoraSchema):
     """
@@ -88,60 +184,167 @@ def add_editora(form: EditoraSchema):
         Retorna uma representação da Editora.
     """
     editora = Editora(nome=form.nome)
-    logger.debug(f"Adicionando editora de nome: '{editora.nome}'")
+    logger.debug("Adicionando editora de nome: '%s'", editora.nome)
     
     try:
-        # Criando conexão com a base de dados
-        session = Session()
-        # Adicionando uma Editora
-        session.add(editora)
-        # Efetivando a adição da nova Editora na tabela
-        session.commit()
-
-        logger.debug(f"Editora '{editora.nome}' adicionada com sucesso.")
+        if escritor is not None:
+            # Escrita em grupo: efetivada pela thread de escrita, junto com as inclusões simultâneas
+            editora.id = escritor.insere("editora", editora.nome)
+        else:
+            # Criando conexão com a base de dados
+            session = Session()
+            # Adicionando uma Editora
+            session.add(editora)
+            # Efetivando a adição da nova Editora na tabela
+            session.commit()
+        indice_prefixos.adiciona("editora", editora.id, editora.nome)
+
+        logger.debug("Editora '%s' adicionada com sucesso.", editora.nome)
         return apresenta_editora(editora), 200
-    except IntegrityError as e:
+    except (IntegrityError, RegistroDuplicado) as e:
         # IntegrityError para evitar duplicidade do nome
         error_msg = "Já existe uma editora com o mesmo nome."
 
-        logger.warning(f"Erro ao adicionar editora '{editora.nome}': {error_msg}")
+        logger.warning("Erro ao adicionar editora '%s': %s", editora.nome, error_msg)
         return {"message": error_msg}, 409
     except Exception as e:
         # Erro imprevisto
         error_msg = "Não foi possível salvar a editora."
 
-        logger.warning(f"Erro ao adicionar editora '{editora.nome}': {error_msg}")
+        logger.warning("Erro ao adicionar editora '%s': %s", editora.nome, error_msg)
         return {"message": error_msg}, 400
 
-@app.get('/editoras', tags=[editora_tag],
-          responses={"200": ListagemEditorasSchema, "404": ErrorSchema})
-def get_editoras():
+@api.post('/editoras/bulk', tags=[editora_tag],
+          responses={"200": ListagemResultadoLoteSchema, "409": ErrorSchema, "400": ErrorSchema})
+def add_editoras_lote(body: EditoraLoteSchema):
     """
-        Busca por todas as editoras cadastradas.
-        Retorna uma lista de editoras.
+        Adiciona um lote de novas editoras em uma única transação.
+        Retorna o resultado de cada registro: criado ou duplicado.
     """
-    logger.debug("Coletando todas as editoras.")
+    logger.debug("Adicionando lote de %s editoras.", len(body.editoras))
 
-    # Criando conexão com a base de dados
     session = Session()
-    # Realizando a busca
-    editoras = session.query(Editora).all()
+    try:
+        nomes = [editora.nome for editora in body.editoras]
+        resultados = insere_nomeados_lote(session, Editora, nomes)
+        session.commit()
+        indexa_resultado_lote("editora", resultados, nomes)
+
+        logger.debug("Lote de editoras adicionado: %s registros processados.", len(resultados))
+        return apresenta_resultado_lote(resultados), 200
+    except IntegrityError:
+        # Inserção concorrente de um mesmo nome entre a verificação e a inserção
+        session.rollback()
+        error_msg = "Conflito ao salvar o lote de editoras, tente novamente."
+
+        logger.warning("Erro ao adicionar lote de editoras: %s", error_msg)
+        return {"message": error_msg}, 409
+    except Exception as e:
+        # Erro imprevisto
+        session.rollback()
+        error_msg = "Não foi possível salvar o lote de editoras."
+
+        logger.error("Erro ao adicionar lote de editoras: %s", e)
+        return {"message": error_msg}, 400
+    finally:
+        session.close()
+
+@api.get('/editoras', tags=[editora_tag],
+          responses={"200": ListagemEditorasSchema, "404": ErrorSchema})
+@roteia_leitura
+@get_condicional("editora")
+@cache_leitura("editora")
+def get_editoras(query: PaginacaoSchema):
+    """
+        Busca pelas editoras cadastradas, paginadas por cursor.
+        Retorna uma lista de editoras e o cursor da próxima página.
+    """
+    logger.debug("Coletando editoras.")
+
+    # Criando conexão com a base de dados (de leitura, se configurada; ver leitura.py)
+    session = sessao_leitura()
+    # Realizando a busca (um registro a mais para saber se existe próxima página)
+    busca = session.query(Editora.id, Editora.nome)
+    if query.after is not None:
+        busca = busca.filter(Editora.id > query.after)
+    editoras, next_cursor = pagina(busca.order_by(Editora.id).limit(query.limit + 1).all(), query.limit)
 
     if not editoras:
-        return {"editoras": []}, 200
+        return {"editoras": [], "next_cursor": None}, 200
     else:
-        logger.debug(f"{len(editoras)} editoras encontradas.")
-        return apresenta_editoras(editoras), 200
+        logger.debug("%s editoras encontradas.", len(editoras))
+        return Response(apresenta_editoras_json(editoras, next_cursor), mimetype="application/json")
+
+@api.get('/editora/<int:id>/livros', tags=[editora_tag],
+          responses={"200": ListagemLivrosSchema, "404": ErrorSchema})
+@get_condicional(*TABELAS_LIVRO)
+@cache_leitura(*TABELAS_LIVRO)
+def get_livros_editora(path: EditoraPathSchema, query: LivroListagemSchema):
+    """
+        Busca pelos livros da editora, paginados por cursor.
+        Retorna uma lista de livros, apenas com os campos solicitados, e o cursor da próxima página.
+    """
+    logger.debug("Coletando livros da editora #%s.", path.id)
+
+    # Criando conexão com a base de dados
+    session = Session()
+    if session.get(Editora, path.id) is None:
+        error_msg = "Editora não encontrada."
+        logger.warning("Erro ao buscar livros da editora #%s: %s", path.id, error_msg)
+        return {"message": error_msg}, 404
+
+    # Realizando a busca (projeção em tuplas, com número constante de SELECTs)
+    campos = query.campos
+    livros = consulta_livros(session, limit=query.limit + 1, after=query.after, campos=campos, id_editora=path.id,
+                             materializada=LIVRO_VIEW_MATERIALIZADA)
+    livros, next_cursor = pagina(livros, query.limit, chave=lambda livro: livro[0])
+
+    logger.debug("%s livros encontrados para a editora #%s.", len(livros), path.id)
+    return Response(apresenta_livros_json(livros, campos, next_cursor), mimetype="application/json")
+
+### ESTATÍSTICAS ###
+@api.get('/estatisticas', tags=[estatistica_tag],
+          responses={"200": ListagemEstatisticasSchema})
+@get_condicional(*TABELAS_LIVRO)
+@cache_leitura(*TABELAS_LIVRO)
+def get_estatisticas(query: EstatisticasBuscaSchema):
+    """
+        Conta os livros por editora, por autor ou por ano de publicação, paginando pela chave do grupo.
+        Retorna a lista de grupos com seus totais e o cursor da próxima página.
+    """
+    logger.debug("Coletando estatísticas por %s.", query.agrupamento)
+
+    # Criando conexão com a base de dados
+    session = Session()
+    # Realizando a busca (GROUP BY, ou leitura da tabela de resumo se materializada)
+    grupos = consulta_contagens(session, query.agrupamento, limit=query.limit + 1, after=query.after,
+                                materializada=CONTAGEM_MATERIALIZADA)
+    grupos, next_cursor = pagina(grupos, query.limit, chave=lambda grupo: grupo[0])
+
+    logger.debug("%s grupos encontrados.", len(grupos))
+    return apresenta_estatisticas(query.agrupamento, grupos, next_cursor), 200
+
+### AUTOCOMPLETAR ###
+@api.get('/autocomplete', tags=[autocompletar_tag],
+          responses={"200": ListagemSugestoesSchema})
+def get_autocompletar(query: AutocompletarBuscaSchema):
+    """
+        Sugere livros, autores ou editoras cujo nome começa com o prefixo informado, sem considerar acentos.
+        Responde a partir do índice em memória do processo, sem consultar o banco.
+        Retorna as sugestões em ordem alfabética.
+    """
+    sugestoes = indice_prefixos.busca(query.tipo, query.prefix, query.limit)
+    return apresenta_sugestoes(query.tipo, sugestoes), 200
 
 ### GERENCIAR LIVRO ###
 
-@app.post('/livro', tags=[livro_tag],
+@api.post('/livro', tags=[livro_tag],
           responses={"200": LivroViewSchema, "409": ErrorSchema, "400": ErrorSchema})
 def add_livro(form: LivroSchema):
     """
         Adiciona um novo livro.
     """
-    logger.debug(f"Adicionando livro de título: '{form.titulo}'")
+    logger.debug("Adicionando livro de título: '%s'", form.titulo)
 
     try:
         session = Session()
@@ -151,16 +354,28 @@ def add_livro(form: LivroSchema):
         if not editora:
             error_msg = "Editora não encontrada."
 
-            logger.warning(f"Erro ao adicionar livro '{form.titulo}': {error_msg}")
+            logger.warning("Erro ao adicionar livro '%s': %s", form.titulo, error_msg)
             return {"message": error_msg}, 400
 
         # Buscar os autores pelo ID
         autores = session.query(Autor).filter(Autor.id.in_(form.ids_autores)).all()
         if not autores or len(autores) != len(form.ids_autores):
             error_msg = "Um ou mais autores não encontrados."
-            logger.warning(f"Erro ao adicionar livro '{form.titulo}': {error_msg}")
+            logger.warning("Erro ao adicionar livro '%s': %s", form.titulo, error_msg)
             return {"message": error_msg}, 400
 
+        if escritor is not None:
+            # Escrita em grupo: efetivada pela thread de escrita, junto com as inclusões simultâneas;
+            # a resposta é montada com a editora e os autores já lidos na validação. A conexão
+            # volta ao pool antes da espera, para não faltar conexão à própria thread de escrita
+            session.close()
+            id = escritor.insere("livro", form)
+            indice_prefixos.adiciona("livro", id, form.titulo)
+            logger.debug("Livro '%s' adicionado com sucesso.", form.titulo)
+            nomes_autores = [autor.nome for autor in sorted(autores, key=lambda autor: autor.id)]
+            return apresenta_livros_consulta(
+                [(id, form.titulo, form.ano_publicacao.year, editora.nome, nomes_autores)])["livros"][0], 200
+
         # Criar o livro e associar autores
         livro = Livro(
             titulo=form.titulo,
@@ -172,15 +387,16 @@ def add_livro(form: LivroSchema):
         # Adicionar e salvar no banco
         session.add(livro)
         session.commit()
-        
-        logger.debug(f"Livro '{livro.titulo}' adicionado com sucesso.")
+        indice_prefixos.adiciona("livro", livro.id, livro.titulo)
+
+        logger.debug("Livro '%s' adicionado com sucesso.", livro.titulo)
         return apresenta_livro(livro), 200
 
-    except IntegrityError:
+    except (IntegrityError, RegistroDuplicado):
         # IntegrityError para evitar duplicidade do nome
         error_msg = "Já existe um livro com o mesmo título."
 
-        logger.warning(f"Erro ao adicionar livro '{form.titulo}': {error_msg}")
+        logger.warning("Erro ao adicionar livro '%s': %s", form.titulo, error_msg)
         return {"message": error_msg}, 409
 
     except Exception as e:
@@ -188,93 +404,230 @@ def add_livro(form: LivroSchema):
         session.rollback()
         error_msg = "Não foi possível salvar o livro."
 
-        logger.error(f"Erro ao adicionar livro '{form.titulo}': {str(e)}")
+        logger.error("Erro ao adicionar livro '%s': %s", form.titulo, e)
         return {"message": error_msg}, 400
 
     finally:
         session.close()
 
-@app.get('/livros', tags=[livro_tag],
-          responses={"200": ListagemLivrosSchema, "404": ErrorSchema})
-def get_livros():
+@api.post('/livros/bulk', tags=[livro_tag],
+          responses={"200": ListagemResultadoLoteSchema, "409": ErrorSchema, "400": ErrorSchema})
+def add_livros_lote(body: LivroLoteSchema):
     """
-        Busca por todos os livros cadastrados.
-        Retorna uma lista de livros.
+        Adiciona um lote de novos livros, com seus autores, em uma única transação.
+        Retorna o resultado de cada registro: criado, duplicado ou referencia_invalida.
     """
-    logger.debug("Coletando todos os livros.")
+    logger.debug("Adicionando lote de %s livros.", len(body.livros))
 
-    # Criando conexão com a base de dados
     session = Session()
-    # Realizando a busca
-    livros = session.query(Livro).all()
+    try:
+        resultados = insere_livros_lote(session, body.livros)
+        session.commit()
+        indexa_resultado_lote("livro", resultados, [livro.titulo for livro in body.livros])
+
+        logger.debug("Lote de livros adicionado: %s registros processados.", len(resultados))
+        return apresenta_resultado_lote(resultados), 200
+    except IntegrityError:
+        # Inserção concorrente de um mesmo título entre a verificação e a inserção
+        session.rollback()
+        error_msg = "Conflito ao salvar o lote de livros, tente novamente."
+
+        logger.warning("Erro ao adicionar lote de livros: %s", error_msg)
+        return {"message": error_msg}, 409
+    except Exception as e:
+        # Erro imprevisto
+        session.rollback()
+        error_msg = "Não foi possível salvar o lote de livros."
+
+        logger.error("Erro ao adicionar lote de livros: %s", e)
+        return {"message": error_msg}, 400
+    finally:
+        session.close()
+
+@api.get('/livros', tags=[livro_tag],
+          responses={"200": ListagemLivrosSchema, "404": ErrorSchema})
+@roteia_leitura
+@get_condicional(*TABELAS_LIVRO)
+@cache_leitura(*TABELAS_LIVRO)
+def get_livros(query: LivroFiltroSchema):
+    """
+        Busca pelos livros cadastrados, paginados por cursor, opcionalmente filtrados por intervalo de anos
+        de publicação, editora e/ou autor (filtros aplicados no banco, por índices).
+        Retorna uma lista de livros, apenas com os campos solicitados, e o cursor da próxima página.
+    """
+    logger.debug("Coletando livros: %s", query.filtros)
+
+    # Criando conexão com a base de dados (de leitura, se configurada; ver leitura.py)
+    session = sessao_leitura()
+    # Realizando a busca (projeção em tuplas, com número constante de SELECTs)
+    campos = query.campos
+    livros = consulta_livros(session, limit=query.limit + 1, after=query.after, campos=campos,
+                             materializada=LIVRO_VIEW_MATERIALIZADA, **query.filtros)
+    livros, next_cursor = pagina(livros, query.limit, chave=lambda livro: livro[0])
 
     if not livros:
-        return {"livros": []}, 200
+        return {"livros": [], "next_cursor": None}, 200
     else:
-        logger.debug(f"{len(livros)} livros encontrados.")
-        return apresenta_livros(livros), 200
+        logger.debug("%s livros encontrados.", len(livros))
+        return Response(apresenta_livros_json(livros, campos, next_cursor), mimetype="application/json")
+
+# Quantidade de livros lidos por SELECT durante a exportação
+TAMANHO_LOTE_EXPORTACAO = 1000
 
-@app.get('/livro', tags=[livro_tag],
+@api.get('/livros/export', tags=[livro_tag])
+def export_livros():
+    """
+        Exporta todo o catálogo de livros em NDJSON (um livro por linha).
+        A leitura é feita em lotes por cursor, mantendo a memória constante por requisição.
+        Comprime a resposta com gzip se o cliente aceitar (Accept-Encoding).
+    """
+    logger.debug("Exportando catálogo de livros.")
+    gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+
+    def gera_linhas():
+        # Criando conexão com a base de dados, mantida aberta durante o streaming
+        session = Session()
+        try:
+            after = None
+            while True:
+                livros = consulta_livros(session, limit=TAMANHO_LOTE_EXPORTACAO, after=after,
+                                         materializada=LIVRO_VIEW_MATERIALIZADA)
+                if not livros:
+                    break
+                after = livros[-1][0]
+                yield b"".join(codifica_json(livro) + b"\n"
+                               for livro in apresenta_livros_consulta(livros)["livros"])
+        finally:
+            session.close()
+
+    def gera_gzip(linhas):
+        # wbits=31 produz o formato gzip (cabeçalho + deflate + trailer)
+        compressor = zlib.compressobj(wbits=31)
+        for lote in linhas:
+            dados = compressor.compress(lote)
+            if dados:
+                yield dados
+        yield compressor.flush()
+
+    linhas = gera_linhas()
+    response = Response(stream_with_context(gera_gzip(linhas) if gzip else linhas),
+                        mimetype="application/x-ndjson")
+    if gzip:
+        response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+@api.get('/livros/busca', tags=[livro_tag],
+          responses={"200": ListagemBuscaLivrosSchema})
+@get_condicional(*TABELAS_LIVRO)
+@cache_leitura(*TABELAS_LIVRO)
+def busca_texto_livros(query: LivroBuscaTextoSchema):
+    """
+        Busca livros por palavras do título, dos nomes dos autores ou da editora.
+        Cada palavra é buscada por prefixo e sem considerar acentos.
+        Retorna os livros em ordem de relevância e o offset da próxima página.
+    """
+    logger.debug("Buscando livros pelos termos: '%s'", query.q)
+
+    # Criando conexão com a base de dados
+    session = Session()
+    try:
+        # Busca uma posição a mais para saber se existe próxima página
+        ids = busca_livros(session, query.q, limit=query.limit + 1, offset=query.offset)
+        next_offset = query.offset + query.limit if len(ids) > query.limit else None
+        ids = ids[:query.limit]
+
+        # Carrega os livros encontrados e os reordena por relevância
+        posicoes = {id: posicao for posicao, id in enumerate(ids)}
+        livros = sorted(consulta_livros(session, ids=ids, materializada=LIVRO_VIEW_MATERIALIZADA),
+                        key=lambda livro: posicoes[livro[0]]) if ids else []
+
+        logger.debug("%s livros encontrados para '%s'.", len(livros), query.q)
+        resultado = apresenta_livros_consulta(livros)
+        return Response(codifica_json({"livros": resultado["livros"], "next_offset": next_offset}),
+                        mimetype="application/json")
+    finally:
+        session.close()
+
+@api.post('/livros/lookup', tags=[livro_tag],
+          responses={"200": LookupLivrosSchema})
+def lookup_livros(body: LivroLookupSchema):
+    """
+        Busca vários livros de uma vez, pelos títulos e/ou ids informados, com uma única consulta.
+        Retorna os livros encontrados na ordem informada e as chaves não encontradas.
+        Buscas idênticas simultâneas são atendidas por uma única consulta ao banco.
+    """
+    logger.debug("Buscando %s livros por id e %s por título.", len(body.ids), len(body.titulos))
+
+    def consulta():
+        # Criando conexão com a base de dados
+        session = Session()
+        livros = consulta_livros(session, ids=body.ids, titulos=body.titulos,
+                                 materializada=LIVRO_VIEW_MATERIALIZADA)
+        return apresenta_lookup_livros(livros, body.ids, body.titulos)
+
+    corpo = consultas_coalescidas.executa(("lookup", tuple(body.ids), tuple(body.titulos)), consulta)
+    return Response(corpo, mimetype="application/json")
+
+@api.get('/livro', tags=[livro_tag],
           responses={"200": LivroViewSchema, "404": ErrorSchema})
+@roteia_leitura
+@get_condicional(*TABELAS_LIVRO)
+@cache_leitura(*TABELAS_LIVRO)
 def get_livro(query: LivroBuscaSchema):
     """
         Busca por um livro a partir do título.
         Retorna os dados do livro encontrado.
     """
     livro_titulo = query.titulo
-    logger.debug(f"Coletando dados do livro de título: {livro_titulo}")
+    logger.debug("Coletando dados do livro de título: %s", livro_titulo)
     
-    # Criando conexão com a base de dados
-    session = Session()
-    # Realizando a busca
-    livro = session.query(Livro).filter(Livro.titulo == livro_titulo).first()
+    # Criando conexão com a base de dados (de leitura, se configurada; ver leitura.py)
+    session = sessao_leitura()
+    # Realizando a busca (uma linha de livro_view, se materializada)
+    livros = consulta_livros(session, titulos=[livro_titulo], materializada=LIVRO_VIEW_MATERIALIZADA)
 
-    if not livro:
+    if not livros:
         # Se o livro não for encontrado
         error_msg = "Livro não encontrado."
-        logger.warning(f"Erro ao buscar livro '{livro_titulo}': {error_msg}")
+        logger.warning("Erro ao buscar livro '%s': %s", livro_titulo, error_msg)
         return {"message": error_msg}, 404
     else:
-        logger.debug(f"Livro encontrado: '{livro.titulo}'")
-        return apresenta_livro(livro), 200
+        livro = apresenta_livros_consulta(livros)["livros"][0]
+        logger.debug("Livro encontrado: '%s'", livro["titulo"])
+        return livro, 200
 
-@app.delete('/livro', tags=[livro_tag],
+@api.delete('/livro', tags=[livro_tag],
             responses={"200": LivroDelSchema, "404": ErrorSchema})
 def del_livro(query: LivroBuscaSchema):
     """
         Deleta um Livro a partir do nome do livro informado.
         Retorna uma mensagem de confirmação da remoção.
     """
-    # Descodifica o título do livro da URL (caso tenha sido codificado)
-    livro_titulo = unquote(unquote(query.titulo))
-    print(livro_titulo)
-    
+    # O título já chega descodificado da URL
+    livro_titulo = query.titulo
+
     # Log para rastrear a operação de exclusão
-    logger.debug(f"Deletando dados sobre Livro #{livro_titulo}")
+    logger.debug("Deletando dados sobre Livro #%s", livro_titulo)
 
     # Cria a sessão para interação com a base de dados
     session = Session()
 
     try:
-        # Busca o livro a ser deletado na base de dados, considerando o título
-        livro = session.query(Livro).filter(Livro.titulo == livro_titulo).first()
-
-        if not livro:
+        # Remove o livro, considerando o título, e suas associações com autores (sem carregar objetos ORM)
+        id = remove_livro(session, livro_titulo)
+        if id is None:
             # Caso o livro não seja encontrado na base de dados, retorna erro 404
             error_msg = "Livro não encontrado na base de dados."
 
-            logger.warning(f"Erro ao deletar Livro de título: '#{livro_titulo}', {error_msg}")
+            logger.warning("Erro ao deletar Livro de título: '#%s', %s", livro_titulo, error_msg)
             return {"message": error_msg}, 404
 
-        # Desassocia os autores do livro antes de deletá-lo
-        livro.autores.clear()  # Remove todas as relações Many-to-Many com autores
-
-        # Deleta o livro da base de dados
-        session.delete(livro)
         session.commit()  # Confirma as alterações na base
+        indice_prefixos.remove("livro", [id])
 
         # Se o livro foi deletado com sucesso, retorna mensagem de confirmação
-        logger.debug(f"Deletado Livro de título: #{livro_titulo} e suas associações")
+        logger.debug("Deletado Livro de título: #%s e suas associações", livro_titulo)
         return {"message": "Livro removido", "título": livro_titulo}
 
     except Exception as e:
@@ -289,3 +642,72 @@ def del_livro(query: LivroBuscaSchema):
     finally:
         # Fecha a sessão para liberar os recursos da conexão com a base de dados
         session.close()
+
+@api.delete('/livros', tags=[livro_tag],
+            responses={"200": RemocaoLivrosSchema, "500": ErrorSchema})
+def del_livros(query: LivroRemocaoSchema):
+    """
+        Deleta em conjunto os livros que atendem aos filtros (ids, editora e/ou intervalo de anos de publicação),
+        e suas associações com autores, em uma única transação.
+        Retorna a quantidade de livros e de associações removidos.
+    """
+    logger.debug("Deletando livros: %s", query.model_dump(exclude_none=True))
+
+    session = Session()
+    try:
+        ids, associacoes = remove_livros(session, ids=query.ids, id_editora=query.id_editora,
+                                         ano_de=query.ano_de, ano_ate=query.ano_ate)
+        session.commit()  # Confirma as remoções e invalida os caches das tabelas alteradas
+        indice_prefixos.remove("livro", ids)
+
+        logger.debug("Deletados %s livros e %s associações com autores.", len(ids), associacoes)
+        return {"message": "Livros removidos", "livros": len(ids), "associacoes": associacoes}
+
+    except Exception as e:
+        # Erro imprevisto
+        session.rollback()
+        error_msg = "Não foi possível remover os livros."
+
+        logger.error("Erro ao deletar livros: %s", e)
+        return {"message": error_msg}, 500
+
+    finally:
+        session.close()
+
+
+def create_app():
+    """
+        Fábrica da aplicação: configura o log, prepara o banco (uma única vez por processo)
+        e registra as rotas. A documentação OpenAPI só é gerada no primeiro acesso a /openapi.
+    """
+    configura_log()
+    if INICIALIZA_BANCO:
+        inicializa_banco()
+    # Índice do autocompletar: uma única consulta ao banco na partida
+    carrega_autocompletar(Session())
+    Session.remove()
+
+    app = OpenAPISobDemanda(__name__, info=info)
+    CORS(app)
+    registra_log_requisicao(app)
+    registra_sessao(app)
+    registra_leitura(app)
+    registra_metricas(app)
+    # Depois das métricas: a espera por vaga e as respostas 503 entram na latência das rotas
+    registra_admissao(app)
+    app.register_api(api)
+    return app
+
+
+_app = None
+
+
+def __getattr__(nome):
+    # 'app' é criada no primeiro acesso (flask run, gunicorn app:app, from app import app),
+    # e não na importação do módulo
+    global _app
+    if nome == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
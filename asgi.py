@@ -0,0 +1,484 @@
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from pydantic import ValidationError
+from sqlalchemy import event, make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session as SessaoSincrona
+from werkzeug.http import parse_etags, parse_date, http_date
+from contextlib import asynccontextmanager
+from functools import wraps
+import asyncio
+import zlib
+
+from model import db_url, DB_POOL_SIZE, DB_MAX_OVERFLOW, CONTAGEM_MATERIALIZADA, INICIALIZA_BANCO, \
+                  LIVRO_VIEW_MATERIALIZADA, inicializa_banco, configura_sqlite, \
+                  registra_alteracoes, consulta_versoes, Autor, Editora, consulta_livros, \
+                  remove_livro, remove_livros, insere_livros_lote, insere_nomeados_lote, busca_livros, \
+                  consulta_contagens
+from model.lote import DUPLICADO, REFERENCIA_INVALIDA
+from cache import consultas_coalescidas, TABELAS_LIVRO
+from escrita import escritor
+from autocompletar import indice_prefixos, indexa_resultado_lote, carrega_autocompletar
+from logger import logger, configura_log
+from schemas import *
+
+# Modo de execução assíncrono (ASGI): as mesmas rotas de app.py, com os mesmos schemas,
+# servidas com uma engine assíncrona. As consultas do modelo são reaproveitadas com
+# AsyncSession.run_sync, que as executa sobre a conexão assíncrona sem bloquear o event loop.
+# Execução: uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+# Drivers assíncronos equivalentes aos drivers síncronos de cada banco
+DRIVERS_ASSINCRONOS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def cria_engine_assincrona(url: str = db_url, pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW):
+    """
+    Cria a engine assíncrona equivalente à de model.cria_engine, trocando o driver do
+    banco pelo driver assíncrono (ex.: sqlite -> aiosqlite) e aplicando os mesmos PRAGMAs.
+
+    :param url: A url de acesso ao banco (síncrona).
+    :param pool_size: Quantidade de conexões mantidas no pool.
+    :param max_overflow: Conexões extras permitidas além do pool.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    url = url.set(drivername=DRIVERS_ASSINCRONOS.get(backend, url.drivername))
+
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        return create_async_engine(url, echo=False)
+
+    engine = create_async_engine(url, echo=False, pool_size=pool_size, max_overflow=max_overflow,
+                                 pool_pre_ping=backend != "sqlite")
+    if backend == "sqlite":
+        event.listen(engine.sync_engine, "connect", configura_sqlite)
+    return engine
+
+
+class SessaoCatalogo(SessaoSincrona):
+    """ Sessão síncrona usada internamente pelas sessões assíncronas, com o acompanhamento de alterações. """
+
+
+# Versões das tabelas e notificações de commit, como nas sessões do modo síncrono
+registra_alteracoes(SessaoCatalogo)
+
+engine_assincrona = cria_engine_assincrona()
+SessaoAssincrona = async_sessionmaker(engine_assincrona, sync_session_class=SessaoCatalogo,
+                                      expire_on_commit=False)
+
+
+def resposta(dados, status: int = 200):
+    """ Retorna uma resposta JSON, serializando 'dados' com o codificador rápido (se ainda não forem bytes). """
+    corpo = dados if isinstance(dados, bytes) else codifica_json(dados)
+    return Response(corpo, status_code=status, media_type="application/json")
+
+
+def leitura(*tabelas):
+    """
+    Decorator das rotas de leitura: abre a sessão assíncrona e responde GETs condicionais
+    (ETag / Last-Modified) a partir das versões das tabelas, como etag.get_condicional.
+
+    :param tabelas: Nomes das tabelas das quais a resposta depende.
+    """
+    def decorator(funcao):
+        @wraps(funcao)
+        async def wrapper(request):
+            async with SessaoAssincrona() as session:
+                versoes, alterado_em = await session.run_sync(consulta_versoes, tabelas)
+                etag = "v" + ".".join(map(str, versoes))
+
+                if "if-none-match" in request.headers:
+                    nao_modificado = parse_etags(request.headers["if-none-match"]).contains(etag)
+                else:
+                    desde = parse_date(request.headers.get("if-modified-since"))
+                    nao_modificado = alterado_em is not None and desde is not None \
+                                     and alterado_em.replace(microsecond=0) <= desde
+
+                if nao_modificado:
+                    return Response(status_code=304, headers={"ETag": f'"{etag}"'})
+                response = await funcao(request, session)
+
+            if response.status_code == 200:
+                response.headers["ETag"] = f'"{etag}"'
+                if alterado_em is not None:
+                    response.headers["Last-Modified"] = http_date(alterado_em)
+            return response
+        return wrapper
+    return decorator
+
+
+async def erro_validacao(request, exc: ValidationError):
+    # Mesmo status usado pelo flask-openapi3 para parâmetros inválidos
+    return Response(exc.json(), status_code=422, media_type="application/json")
+
+
+async def valida_formulario(request, schema, listas=()):
+    """ Valida os dados de formulário da requisição com o schema, tratando os campos em 'listas' como listas. """
+    formulario = await request.form()
+    dados = dict(formulario)
+    for campo in listas:
+        dados[campo] = formulario.getlist(campo)
+    return schema.model_validate(dados)
+
+
+def _lista_nomeados(session, modelo, query: PaginacaoSchema):
+    # Mesma busca de get_autores/get_editoras: (id, nome) por cursor, um registro a mais
+    busca = session.query(modelo.id, modelo.nome)
+    if query.after is not None:
+        busca = busca.filter(modelo.id > query.after)
+    return busca.order_by(modelo.id).limit(query.limit + 1).all()
+
+
+def _busca_livro(session, titulo: str):
+    # Mesma busca de get_livro (uma linha de livro_view, se materializada)
+    livros = consulta_livros(session, titulos=[titulo], materializada=LIVRO_VIEW_MATERIALIZADA)
+    return apresenta_livros_consulta(livros)["livros"][0] if livros else None
+
+
+### GERENCIAR AUTOR E EDITORA ###
+async def add_nomeado(request, modelo, schema, entidade: str, mensagem_duplicado: str):
+    form = await valida_formulario(request, schema)
+    logger.debug("Adicionando %s de nome: '%s'", entidade, form.nome)
+
+    if escritor is not None:
+        # Escrita em grupo: efetivada pela thread de escrita, junto com as inclusões simultâneas
+        status, id = await asyncio.wrap_future(escritor.submete(modelo.__tablename__, form.nome))
+    else:
+        async with SessaoAssincrona() as session:
+            try:
+                [(status, id)] = await session.run_sync(insere_nomeados_lote, modelo, [form.nome])
+                if status != DUPLICADO:
+                    await session.commit()
+            except IntegrityError:
+                # Inserção concorrente de um mesmo nome entre a verificação e a inserção
+                await session.rollback()
+                status = DUPLICADO
+
+    if status == DUPLICADO:
+        logger.warning("Erro ao adicionar %s '%s': %s", entidade, form.nome, mensagem_duplicado)
+        return resposta({"message": mensagem_duplicado}, 409)
+
+    indice_prefixos.adiciona(modelo.__tablename__, id, form.nome)
+    logger.debug("%s '%s' adicionado com sucesso.", entidade.capitalize(), form.nome)
+    return resposta({"id": id, "nome": form.nome})
+
+
+async def add_autor(request):
+    return await add_nomeado(request, Autor, AutorSchema, "autor", "Já existe um autor com o mesmo nome.")
+
+
+async def add_editora(request):
+    return await add_nomeado(request, Editora, EditoraSchema, "editora", "Já existe uma editora com o mesmo nome.")
+
+
+async def add_nomeados_lote(request, modelo, schema, plural: str):
+    body = schema.model_validate(await request.json())
+    nomes = [registro.nome for registro in getattr(body, plural)]
+    logger.debug("Adicionando lote de %s %s.", len(nomes), plural)
+
+    async with SessaoAssincrona() as session:
+        try:
+            resultados = await session.run_sync(insere_nomeados_lote, modelo, nomes)
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            error_msg = f"Conflito ao salvar o lote de {plural}, tente novamente."
+            logger.warning("Erro ao adicionar lote de %s: %s", plural, error_msg)
+            return resposta({"message": error_msg}, 409)
+
+    indexa_resultado_lote(modelo.__tablename__, resultados, nomes)
+    return resposta(apresenta_resultado_lote(resultados))
+
+
+async def add_autores_lote(request):
+    return await add_nomeados_lote(request, Autor, AutorLoteSchema, "autores")
+
+
+async def add_editoras_lote(request):
+    return await add_nomeados_lote(request, Editora, EditoraLoteSchema, "editoras")
+
+
+@leitura("autor")
+async def get_autores(request, session):
+    query = PaginacaoSchema.model_validate(dict(request.query_params))
+    autores, next_cursor = pagina(await session.run_sync(_lista_nomeados, Autor, query), query.limit)
+    return resposta(apresenta_autores_json(autores, next_cursor))
+
+
+@leitura("editora")
+async def get_editoras(request, session):
+    query = PaginacaoSchema.model_validate(dict(request.query_params))
+    editoras, next_cursor = pagina(await session.run_sync(_lista_nomeados, Editora, query), query.limit)
+    return resposta(apresenta_editoras_json(editoras, next_cursor))
+
+
+async def livros_de(request, session, modelo, path_schema, filtro: str, entidade: str):
+    path = path_schema.model_validate(request.path_params)
+    query = LivroListagemSchema.model_validate(dict(request.query_params))
+    if await session.get(modelo, path.id) is None:
+        return resposta({"message": f"{entidade} não encontrad{'o' if modelo is Autor else 'a'}."}, 404)
+
+    campos = query.campos
+    livros = await session.run_sync(consulta_livros, limit=query.limit + 1, after=query.after,
+                                    campos=campos, materializada=LIVRO_VIEW_MATERIALIZADA,
+                                    **{filtro: path.id})
+    livros, next_cursor = pagina(livros, query.limit, chave=lambda livro: livro[0])
+    return resposta(apresenta_livros_json(livros, campos, next_cursor))
+
+
+@leitura(*TABELAS_LIVRO)
+async def get_livros_autor(request, session):
+    return await livros_de(request, session, Autor, AutorPathSchema, "id_autor", "Autor")
+
+
+@leitura(*TABELAS_LIVRO)
+async def get_livros_editora(request, session):
+    return await livros_de(request, session, Editora, EditoraPathSchema, "id_editora", "Editora")
+
+
+### ESTATÍSTICAS ###
+@leitura(*TABELAS_LIVRO)
+async def get_estatisticas(request, session):
+    query = EstatisticasBuscaSchema.model_validate(dict(request.query_params))
+    grupos = await session.run_sync(consulta_contagens, query.agrupamento, limit=query.limit + 1,
+                                    after=query.after, materializada=CONTAGEM_MATERIALIZADA)
+    grupos, next_cursor = pagina(grupos, query.limit, chave=lambda grupo: grupo[0])
+    return resposta(apresenta_estatisticas(query.agrupamento, grupos, next_cursor))
+
+
+### AUTOCOMPLETAR ###
+async def get_autocompletar(request):
+    # Responde a partir do índice em memória, sem sessão nem consulta ao banco
+    query = AutocompletarBuscaSchema.model_validate(dict(request.query_params))
+    sugestoes = indice_prefixos.busca(query.tipo, query.prefix, query.limit)
+    return resposta(apresenta_sugestoes(query.tipo, sugestoes))
+
+
+### GERENCIAR LIVRO ###
+async def add_livro(request):
+    form = await valida_formulario(request, LivroSchema, listas=("ids_autores",))
+    logger.debug("Adicionando livro de título: '%s'", form.titulo)
+
+    async with SessaoAssincrona() as session:
+        if escritor is not None:
+            # Escrita em grupo: efetivada pela thread de escrita, junto com as inclusões simultâneas
+            status, id = await asyncio.wrap_future(escritor.submete("livro", form))
+        else:
+            try:
+                [(status, id)] = await session.run_sync(insere_livros_lote, [form])
+                if status not in (DUPLICADO, REFERENCIA_INVALIDA):
+                    await session.commit()
+            except IntegrityError:
+                # Inserção concorrente de um mesmo título entre a verificação e a inserção
+                await session.rollback()
+                status = DUPLICADO
+
+        if status == REFERENCIA_INVALIDA:
+            error_msg = "Editora ou um ou mais autores não encontrados."
+            logger.warning("Erro ao adicionar livro '%s': %s", form.titulo, error_msg)
+            return resposta({"message": error_msg}, 400)
+        if status == DUPLICADO:
+            error_msg = "Já existe um livro com o mesmo título."
+            logger.warning("Erro ao adicionar livro '%s': %s", form.titulo, error_msg)
+            return resposta({"message": error_msg}, 409)
+
+        indice_prefixos.adiciona("livro", id, form.titulo)
+        livros = await session.run_sync(consulta_livros, ids=[id], materializada=LIVRO_VIEW_MATERIALIZADA)
+
+    logger.debug("Livro '%s' adicionado com sucesso.", form.titulo)
+    return resposta(apresenta_livros_consulta(livros)["livros"][0])
+
+
+async def add_livros_lote(request):
+    body = LivroLoteSchema.model_validate(await request.json())
+    logger.debug("Adicionando lote de %s livros.", len(body.livros))
+
+    async with SessaoAssincrona() as session:
+        try:
+            resultados = await session.run_sync(insere_livros_lote, body.livros)
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            error_msg = "Conflito ao salvar o lote de livros, tente novamente."
+            logger.warning("Erro ao adicionar lote de livros: %s", error_msg)
+            return resposta({"message": error_msg}, 409)
+
+    indexa_resultado_lote("livro", resultados, [livro.titulo for livro in body.livros])
+    return resposta(apresenta_resultado_lote(resultados))
+
+
+@leitura(*TABELAS_LIVRO)
+async def get_livros(request, session):
+    query = LivroFiltroSchema.model_validate(dict(request.query_params))
+    campos = query.campos
+    livros = await session.run_sync(consulta_livros, limit=query.limit + 1, after=query.after, campos=campos,
+                                    materializada=LIVRO_VIEW_MATERIALIZADA, **query.filtros)
+    livros, next_cursor = pagina(livros, query.limit, chave=lambda livro: livro[0])
+    return resposta(apresenta_livros_json(livros, campos, next_cursor))
+
+
+# Quantidade de livros lidos por SELECT durante a exportação
+TAMANHO_LOTE_EXPORTACAO = 1000
+
+
+async def export_livros(request):
+    gzip = "gzip" in request.headers.get("accept-encoding", "")
+
+    async def gera_linhas():
+        async with SessaoAssincrona() as session:
+            after = None
+            while True:
+                livros = await session.run_sync(consulta_livros, limit=TAMANHO_LOTE_EXPORTACAO, after=after,
+                                                materializada=LIVRO_VIEW_MATERIALIZADA)
+                if not livros:
+                    break
+                after = livros[-1][0]
+                yield b"".join(codifica_json(livro) + b"\n"
+                               for livro in apresenta_livros_consulta(livros)["livros"])
+
+    async def gera_gzip(linhas):
+        # wbits=31 produz o formato gzip (cabeçalho + deflate + trailer)
+        compressor = zlib.compressobj(wbits=31)
+        async for lote in linhas:
+            dados = compressor.compress(lote)
+            if dados:
+                yield dados
+        yield compressor.flush()
+
+    linhas = gera_linhas()
+    headers = {"Vary": "Accept-Encoding"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(gera_gzip(linhas) if gzip else linhas, media_type="application/x-ndjson",
+                             headers=headers)
+
+
+@leitura(*TABELAS_LIVRO)
+async def busca_texto_livros(request, session):
+    query = LivroBuscaTextoSchema.model_validate(dict(request.query_params))
+    ids = await session.run_sync(busca_livros, query.q, limit=query.limit + 1, offset=query.offset)
+    next_offset = query.offset + query.limit if len(ids) > query.limit else None
+    ids = ids[:query.limit]
+
+    posicoes = {id: posicao for posicao, id in enumerate(ids)}
+    livros = sorted(await session.run_sync(consulta_livros, ids=ids, materializada=LIVRO_VIEW_MATERIALIZADA),
+                    key=lambda livro: posicoes[livro[0]]) if ids else []
+    return resposta({"livros": apresenta_livros_consulta(livros)["livros"], "next_offset": next_offset})
+
+
+async def lookup_livros(request):
+    body = LivroLookupSchema.model_validate(await request.json())
+    logger.debug("Buscando %s livros por id e %s por título.", len(body.ids), len(body.titulos))
+
+    async def consulta():
+        async with SessaoAssincrona() as session:
+            livros = await session.run_sync(consulta_livros, ids=body.ids, titulos=body.titulos,
+                                            materializada=LIVRO_VIEW_MATERIALIZADA)
+        return apresenta_lookup_livros(livros, body.ids, body.titulos)
+
+    return resposta(await consultas_coalescidas.executa_assincrono(
+        ("lookup", tuple(body.ids), tuple(body.titulos)), consulta))
+
+
+@leitura(*TABELAS_LIVRO)
+async def get_livro(request, session):
+    query = LivroBuscaSchema.model_validate(dict(request.query_params))
+    livro = await session.run_sync(_busca_livro, query.titulo)
+    if livro is None:
+        error_msg = "Livro não encontrado."
+        logger.warning("Erro ao buscar livro '%s': %s", query.titulo, error_msg)
+        return resposta({"message": error_msg}, 404)
+    return resposta(livro)
+
+
+async def del_livro(request):
+    query = LivroBuscaSchema.model_validate(dict(request.query_params))
+    # O título já chega descodificado da URL
+    livro_titulo = query.titulo
+    logger.debug("Deletando dados sobre Livro #%s", livro_titulo)
+
+    async with SessaoAssincrona() as session:
+        id = await session.run_sync(remove_livro, livro_titulo)
+        if id is None:
+            error_msg = "Livro não encontrado na base de dados."
+            logger.warning("Erro ao deletar Livro de título: '#%s', %s", livro_titulo, error_msg)
+            return resposta({"message": error_msg}, 404)
+        await session.commit()
+    indice_prefixos.remove("livro", [id])
+
+    logger.debug("Deletado Livro de título: #%s e suas associações", livro_titulo)
+    return resposta({"message": "Livro removido", "título": livro_titulo})
+
+
+async def del_livros(request):
+    parametros = dict(request.query_params)
+    if "ids" in parametros:
+        parametros["ids"] = request.query_params.getlist("ids")
+    query = LivroRemocaoSchema.model_validate(parametros)
+    logger.debug("Deletando livros: %s", query.model_dump(exclude_none=True))
+
+    async with SessaoAssincrona() as session:
+        ids, associacoes = await session.run_sync(remove_livros, ids=query.ids, id_editora=query.id_editora,
+                                                  ano_de=query.ano_de, ano_ate=query.ano_ate)
+        await session.commit()
+    indice_prefixos.remove("livro", ids)
+
+    logger.debug("Deletados %s livros e %s associações com autores.", len(ids), associacoes)
+    return resposta({"message": "Livros removidos", "livros": len(ids), "associacoes": associacoes})
+
+
+async def livros(request):
+    # '/livros' atende GET (listagem) e DELETE (remoção em conjunto), como em app.py
+    if request.method == "DELETE":
+        return await del_livros(request)
+    return await get_livros(request)
+
+
+async def livro(request):
+    # '/livro' atende GET (busca) e DELETE (remoção), como em app.py
+    if request.method == "DELETE":
+        return await del_livro(request)
+    return await get_livro(request)
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    # Configura o log e prepara o banco ao iniciar o servidor, como app.create_app,
+    # e fecha as conexões do pool ao encerrar
+    configura_log()
+    if INICIALIZA_BANCO:
+        inicializa_banco()
+    async with SessaoAssincrona() as session:
+        await session.run_sync(carrega_autocompletar)
+    yield
+    await engine_assincrona.dispose()
+
+
+app = Starlette(
+    routes=[
+        Route("/autor", add_autor, methods=["POST"]),
+        Route("/autores/bulk", add_autores_lote, methods=["POST"]),
+        Route("/autores", get_autores, methods=["GET"]),
+        Route("/autor/{id:int}/livros", get_livros_autor, methods=["GET"]),
+        Route("/editora", add_editora, methods=["POST"]),
+        Route("/editoras/bulk", add_editoras_lote, methods=["POST"]),
+        Route("/editoras", get_editoras, methods=["GET"]),
+        Route("/editora/{id:int}/livros", get_livros_editora, methods=["GET"]),
+        Route("/estatisticas", get_estatisticas, methods=["GET"]),
+        Route("/autocomplete", get_autocompletar, methods=["GET"]),
+        Route("/livro", add_livro, methods=["POST"]),
+        Route("/livro", livro, methods=["GET", "DELETE"]),
+        Route("/livros/bulk", add_livros_lote, methods=["POST"]),
+        Route("/livros", livros, methods=["GET", "DELETE"]),
+        Route("/livros/export", export_livros, methods=["GET"]),
+        Route("/livros/busca", busca_texto_livros, methods=["GET"]),
+        Route("/livros/lookup", lookup_livros, methods=["POST"]),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])],
+    exception_handlers={ValidationError: erro_validacao},
+    lifespan=ciclo_de_vida,
+)
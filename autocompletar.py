@@ -0,0 +1,173 @@
+from bisect import bisect_left, insort
+from sqlalchemy import select, literal
+import os
+import sys
+import threading
+import time
+import unicodedata
+
+from model import Session, Autor, Editora, Livro
+from logger import logger
+
+# Tipos de registro indexados
+TIPOS_AUTOCOMPLETAR = ("livro", "autor", "editora")
+
+# Intervalo (s) de recarga completa do índice, para incluir as escritas feitas por outros
+# processos (outros workers, cargas em lote por scripts); 0 desliga a recarga
+AUTOCOMPLETAR_RECARGA = float(os.environ.get("AUTOCOMPLETAR_RECARGA", 300))
+
+
+def _tamanho(entrada):
+    # A tupla, o nome normalizado, o id e o nome (o id e o nome normalizado são
+    # compartilhados com o dicionário de chaves)
+    return sys.getsizeof(entrada) + sum(sys.getsizeof(valor) for valor in entrada)
+
+
+def normaliza_nome(texto: str):
+    """ Normaliza um nome para a busca por prefixo: sem acentos e sem diferença de maiúsculas. """
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(caractere for caractere in decomposto if not unicodedata.combining(caractere)).casefold()
+
+
+class IndicePrefixos:
+    """
+    Índice em memória dos nomes de livros, autores e editoras para a busca por prefixo.
+
+    Cada tipo é um vetor ordenado de tuplas (nome normalizado, id, nome); a busca localiza
+    o primeiro nome com o prefixo por busca binária (bisect) e percorre os seguintes
+    enquanto tiverem o prefixo, sem acessar o banco. Inclusões e remoções mantêm o vetor
+    ordenado (insort), e um dicionário id -> nome normalizado localiza o registro a remover.
+    """
+
+    def __init__(self):
+        self._entradas = {tipo: [] for tipo in TIPOS_AUTOCOMPLETAR}
+        self._chaves = {tipo: {} for tipo in TIPOS_AUTOCOMPLETAR}
+        self._bytes = {tipo: 0 for tipo in TIPOS_AUTOCOMPLETAR}  # memória das entradas, mantida a cada alteração
+        self._trava = threading.Lock()
+        self._carregado_em = None
+        self._recarregando = False
+        self._alteracoes = None  # inclusões e remoções feitas durante uma carga, reaplicadas ao fim dela
+
+    def carrega(self, session):
+        """ Recarrega todo o índice com um único SELECT (UNION ALL dos três tipos). """
+        with self._trava:
+            self._alteracoes = []
+        consulta = select(literal("livro"), Livro.id, Livro.titulo).union_all(
+            select(literal("autor"), Autor.id, Autor.nome),
+            select(literal("editora"), Editora.id, Editora.nome),
+        )
+        entradas = {tipo: [] for tipo in TIPOS_AUTOCOMPLETAR}
+        for tipo, id, nome in session.execute(consulta):
+            entradas[tipo].append((normaliza_nome(nome), id, nome))
+        for lista in entradas.values():
+            lista.sort()
+        chaves = {tipo: {id: chave for chave, id, _ in lista} for tipo, lista in entradas.items()}
+        tamanhos = {tipo: sum(map(_tamanho, lista)) for tipo, lista in entradas.items()}
+
+        with self._trava:
+            alteracoes, self._alteracoes = self._alteracoes or [], None
+            self._entradas, self._chaves, self._bytes = entradas, chaves, tamanhos
+            self._carregado_em = time.monotonic()
+            # A consulta pode ter sido feita antes de commits já aplicados ao índice anterior
+            for alteracao in alteracoes:
+                alteracao()
+        logger.debug("Índice de autocompletar carregado: %s", {tipo: len(lista) for tipo, lista in entradas.items()})
+
+    def adiciona(self, tipo: str, id: int, nome: str):
+        """ Inclui (ou atualiza) um registro no índice. """
+        with self._trava:
+            self._adiciona(tipo, id, nome)
+            if self._alteracoes is not None:
+                self._alteracoes.append(lambda: self._adiciona(tipo, id, nome))
+
+    def _adiciona(self, tipo: str, id: int, nome: str):
+        self._remove(tipo, id)
+        entrada = (normaliza_nome(nome), id, nome)
+        insort(self._entradas[tipo], entrada)
+        self._chaves[tipo][id] = entrada[0]
+        self._bytes[tipo] += _tamanho(entrada)
+
+    def remove(self, tipo: str, ids):
+        """ Remove do índice os registros com os ids informados. """
+        ids = list(ids)
+        with self._trava:
+            for id in ids:
+                self._remove(tipo, id)
+            if self._alteracoes is not None:
+                self._alteracoes.extend(lambda id=id: self._remove(tipo, id) for id in ids)
+
+    def _remove(self, tipo: str, id: int):
+        chave = self._chaves[tipo].pop(id, None)
+        if chave is None:
+            return
+        entradas = self._entradas[tipo]
+        posicao = bisect_left(entradas, (chave, id))
+        if posicao < len(entradas) and entradas[posicao][:2] == (chave, id):
+            self._bytes[tipo] -= _tamanho(entradas.pop(posicao))
+
+    def busca(self, tipo: str, prefixo: str, limit: int = 10):
+        """
+        Busca os registros cujo nome normalizado começa com o prefixo (também normalizado).
+
+        :return: Lista de até 'limit' tuplas (id, nome), em ordem alfabética.
+        """
+        prefixo = normaliza_nome(prefixo)
+        self.recarrega_se_expirado()
+        with self._trava:
+            entradas = self._entradas[tipo]
+            posicao = bisect_left(entradas, (prefixo,))
+            resultado = []
+            for chave, id, nome in entradas[posicao:posicao + limit]:
+                if not chave.startswith(prefixo):
+                    break
+                resultado.append((id, nome))
+        return resultado
+
+    def recarrega_se_expirado(self, intervalo: float = AUTOCOMPLETAR_RECARGA):
+        """ Dispara, em uma thread de fundo, a recarga do índice carregado há mais de 'intervalo' segundos. """
+        with self._trava:
+            # Um índice nunca carregado (ex.: banco indisponível na partida) também é recarregado
+            expirado = intervalo and not self._recarregando and \
+                       (self._carregado_em is None or time.monotonic() - self._carregado_em > intervalo)
+            if not expirado:
+                return
+            self._recarregando = True
+
+        def recarrega():
+            session = Session()
+            try:
+                self.carrega(session)
+            except Exception as e:
+                logger.warning("Erro ao recarregar o índice de autocompletar: %s", e)
+            finally:
+                Session.remove()
+                with self._trava:
+                    self._recarregando = False
+
+        threading.Thread(target=recarrega, name="recarga-autocompletar", daemon=True).start()
+
+    def estatisticas(self):
+        """ Retorna, por tipo, a quantidade de entradas e a memória ocupada pelo índice (bytes, aproximada). """
+        with self._trava:
+            return {tipo: {"entradas": len(entradas),
+                           "bytes": sys.getsizeof(entradas) + sys.getsizeof(self._chaves[tipo]) + self._bytes[tipo]}
+                    for tipo, entradas in self._entradas.items()}
+
+
+indice_prefixos = IndicePrefixos()
+
+
+def carrega_autocompletar(session):
+    """ Carrega o índice de autocompletar ao iniciar a aplicação; se o banco ainda não estiver pronto, o índice
+        fica vazio até a próxima recarga. """
+    try:
+        indice_prefixos.carrega(session)
+    except Exception as e:
+        logger.warning("Não foi possível carregar o índice de autocompletar: %s", e)
+
+
+def indexa_resultado_lote(tipo: str, resultados, nomes):
+    """ Inclui no índice os registros criados por uma inserção em lote, a partir das tuplas (situação, id). """
+    for (_, id), nome in zip(resultados, nomes):
+        if id is not None:
+            indice_prefixos.adiciona(tipo, id, nome)
@@ -0,0 +1,32 @@
+import logging
+import os
+import sys
+import tempfile
+
+# Diretório raiz do projeto, para importar 'app', 'model' e 'schemas'
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepara_ambiente(silencia_logs: bool = True):
+    """
+    Prepara a execução de um benchmark isolado do banco de desenvolvimento.
+
+    Muda o diretório de trabalho para um diretório temporário (onde serão criados
+    'database/' e 'log/') e silencia os logs da aplicação. Deve ser chamada antes
+    de importar 'app' ou 'model'.
+
+    :param silencia_logs: Se False, mantém os logs ativos (para medir o custo do próprio log).
+    :return: O caminho do diretório temporário.
+    """
+    if RAIZ not in sys.path:
+        sys.path.insert(0, RAIZ)
+    diretorio = tempfile.mkdtemp(prefix="bench-")
+    os.chdir(diretorio)
+    if silencia_logs:
+        logging.disable(logging.ERROR)
+    return diretorio
+
+
+def percentil(valores, p: float):
+    """ Retorna o percentil 'p' (0 a 1) de uma lista já ordenada, ou None se estiver vazia. """
+    return valores[int(p * (len(valores) - 1))] if valores else None
@@ -0,0 +1,134 @@
+"""
+Simula um pico de exportações do catálogo (GET /livros/export, a listagem completa) e mede
+a latência das rotas baratas atendidas ao mesmo tempo (GET /autores e POST /livro), sem e
+com o controle de admissão (ADMISSAO=1), além das exportações concluídas e das respostas 503.
+
+A configuração da admissão é lida na importação de 'admissao', então cada modo roda em um
+processo próprio, sobre um banco novo.
+
+Uso: python -m bench.admissao [--segundos 10] [--exportadores 16] [--leitores 2] [--escritores 2]
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from bench import prepara_ambiente, percentil, RAIZ
+
+# Variáveis de ambiente de cada modo
+MODOS = {
+    "sem_admissao": {"ADMISSAO": "0"},
+    "com_admissao": {"ADMISSAO": "1"},
+}
+
+
+def executa_cenario(args):
+    """ Executa o pico no processo atual, com o controle de admissão já configurado pelo ambiente. """
+    prepara_ambiente()
+    from model import Session, inicializa_banco
+    from bench.catalogo import gera_catalogo
+
+    inicializa_banco()
+    gera_catalogo(Session(), 50, 2000, 20000)
+    Session.remove()
+    from app import app
+
+    sequencia = itertools.count()
+    trava = threading.Lock()
+    latencias = {"leitura": [], "escrita": []}
+    exportacoes, rejeicoes, erros = 0, 0, 0
+    fim = time.monotonic() + args.segundos
+
+    def registra(tipo, response, duracao):
+        nonlocal rejeicoes, erros
+        with trava:
+            if response.status_code == 503:
+                rejeicoes += 1
+            elif response.status_code != 200:
+                erros += 1
+            elif tipo is not None:
+                latencias[tipo].append(duracao)
+
+    def exportador():
+        nonlocal exportacoes
+        client = app.test_client()
+        while time.monotonic() < fim:
+            # Lê todo o corpo e fecha a resposta (o que libera as vagas da exportação)
+            with client.get("/livros/export") as response:
+                response.get_data()
+            registra(None, response, 0)
+            if response.status_code == 200:
+                with trava:
+                    exportacoes += 1
+            else:
+                # Respeita o Retry-After, como um cliente bem-comportado (limitado ao fim da medição)
+                time.sleep(min(float(response.headers.get("Retry-After", 0)), max(fim - time.monotonic(), 0)))
+
+    def leitor():
+        client = app.test_client()
+        while time.monotonic() < fim:
+            n = next(sequencia)
+            inicio = time.perf_counter()
+            response = client.get(f"/autores?limit=50&after={n % 1900}")
+            registra("leitura", response, time.perf_counter() - inicio)
+
+    def escritor():
+        client = app.test_client()
+        while time.monotonic() < fim:
+            n = next(sequencia)
+            inicio = time.perf_counter()
+            response = client.post("/livro", data={"titulo": f"Livro Pico {n}", "ano_publicacao": "2000-01-01",
+                                                   "id_editora": n % 50 + 1, "ids_autores": [n % 2000 + 1]})
+            registra("escrita", response, time.perf_counter() - inicio)
+
+    threads = [threading.Thread(target=exportador) for _ in range(args.exportadores)] + \
+              [threading.Thread(target=leitor) for _ in range(args.leitores)] + \
+              [threading.Thread(target=escritor) for _ in range(args.escritores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    resultado = {"exportacoes": exportacoes, "rejeicoes_503": rejeicoes, "erros": erros}
+    for tipo, valores in latencias.items():
+        valores.sort()
+        resultado[f"{tipo}_s"] = round(len(valores) / args.segundos, 1)
+        resultado[f"{tipo}_p50_ms"] = round(percentil(valores, 0.50) * 1000, 3) if valores else None
+        resultado[f"{tipo}_p99_ms"] = round(percentil(valores, 0.99) * 1000, 3) if valores else None
+    with open(args.resultado, "w") as arquivo:
+        json.dump(resultado, arquivo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--exportadores", type=int, default=16)
+    parser.add_argument("--leitores", type=int, default=2)
+    parser.add_argument("--escritores", type=int, default=2)
+    parser.add_argument("--resultado", help=argparse.SUPPRESS)  # uso interno: executa um único cenário
+    args = parser.parse_args()
+
+    if args.resultado:
+        executa_cenario(args)
+        return
+
+    resultado = []
+    for modo, variaveis in MODOS.items():
+        with tempfile.NamedTemporaryFile(suffix=".json") as arquivo:
+            env = dict(os.environ, PYTHONPATH=RAIZ, CACHE_BACKEND="desligado", LOG_NIVEL="CRITICAL", **variaveis)
+            subprocess.run([sys.executable, "-m", "bench.admissao", "--segundos", str(args.segundos),
+                            "--exportadores", str(args.exportadores), "--leitores", str(args.leitores),
+                            "--escritores", str(args.escritores), "--resultado", arquivo.name],
+                           env=env, cwd=RAIZ, stdout=subprocess.DEVNULL, check=True)
+            resultado.append({"modo": modo, **json.load(arquivo)})
+
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Compara o modo síncrono (app.py, servidor WSGI com threads) com o modo assíncrono
+(asgi.py, uvicorn com engine aiosqlite) sob N clientes simultâneos, medindo
+requisições por segundo e latências p50/p99 das leituras do catálogo.
+
+Os dois servidores são iniciados localmente sobre o mesmo banco, pré-carregado,
+e com o cache de respostas desligado, para que cada requisição chegue ao banco.
+
+Uso: python -m bench.assincrono [--clientes 1 8 32] [--duracao 5] [--livros 2000]
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+from bench import prepara_ambiente, percentil, RAIZ
+
+# Comandos de cada modo; '{porta}' é substituído pela porta do servidor
+MODOS = {
+    "sincrono": [sys.executable, "-m", "flask", "--app", "app", "run", "--with-threads", "--port", "{porta}"],
+    "assincrono": [sys.executable, "-m", "uvicorn", "asgi:app", "--log-level", "warning", "--port", "{porta}"],
+}
+
+
+def carrega_catalogo(livros: int):
+    """ Pré-carrega editoras, autores e livros pelas rotas de inserção em lote e retorna os títulos. """
+    from app import app
+
+    client = app.test_client()
+    client.post("/editoras/bulk", json={"editoras": [{"nome": f"Editora {i}"} for i in range(20)]})
+    client.post("/autores/bulk", json={"autores": [{"nome": f"Autor {i}"} for i in range(200)]})
+    titulos = [f"Livro {i}" for i in range(livros)]
+    for inicio in range(0, livros, 500):
+        client.post("/livros/bulk", json={"livros": [
+            {"titulo": titulo, "ano_publicacao": "2000-01-01T00:00:00", "id_editora": i % 20 + 1,
+             "ids_autores": [i % 200 + 1, (i * 7) % 200 + 1]}
+            for i, titulo in enumerate(titulos[inicio:inicio + 500], start=inicio)]})
+    return titulos
+
+
+def inicia_servidor(modo: str, porta: int):
+    """ Inicia o servidor do modo informado e aguarda até que ele responda. """
+    env = dict(os.environ, PYTHONPATH=RAIZ, CACHE_BACKEND="desligado")
+    comando = [parte.format(porta=porta) for parte in MODOS[modo]]
+    processo = subprocess.Popen(comando, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        try:
+            conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=1)
+            conexao.request("GET", "/autores")
+            conexao.getresponse().read()
+            return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError(f"O servidor do modo '{modo}' não respondeu na porta {porta}.")
+
+
+def executa(porta: int, caminhos, clientes: int, duracao: float):
+    """ Executa 'clientes' conexões simultâneas por 'duracao' segundos e retorna vazão e latências. """
+    fim = time.perf_counter() + duracao
+    latencias = []
+    erros = [0]
+    trava = threading.Lock()
+
+    def cliente(deslocamento):
+        conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+        medidas, falhas, i = [], 0, deslocamento
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            try:
+                conexao.request("GET", caminhos[i % len(caminhos)])
+                response = conexao.getresponse()
+                response.read()
+                if response.status == 200:
+                    medidas.append(time.perf_counter() - inicio)
+                else:
+                    falhas += 1
+            except (OSError, http.client.HTTPException):
+                conexao.close()
+                falhas += 1
+            i += 1
+        conexao.close()
+        with trava:
+            latencias.extend(medidas)
+            erros[0] += falhas
+
+    threads = [threading.Thread(target=cliente, args=(n * 7,)) for n in range(clientes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencias.sort()
+    return {
+        "req_s": round(len(latencias) / duracao, 1),
+        "p50_ms": round(percentil(latencias, 0.50) * 1000, 2) if latencias else None,
+        "p99_ms": round(percentil(latencias, 0.99) * 1000, 2) if latencias else None,
+        "erros": erros[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duracao", type=float, default=5.0)
+    parser.add_argument("--livros", type=int, default=2000, help="livros pré-carregados")
+    parser.add_argument("--porta", type=int, default=5100)
+    args = parser.parse_args()
+
+    prepara_ambiente()
+    titulos = carrega_catalogo(args.livros)
+    # Mistura de leituras: listagem paginada, busca por título e listagem de autores
+    caminhos = []
+    for i, titulo in enumerate(titulos[:200]):
+        caminhos += [f"/livros?limit=50&after={i * 5}", f"/livro?titulo={quote(titulo)}", "/autores?limit=50"]
+
+    resultado = []
+    for n, modo in enumerate(MODOS):
+        processo = inicia_servidor(modo, args.porta + n)
+        try:
+            for clientes in args.clientes:
+                medicao = executa(args.porta + n, caminhos, clientes, args.duracao)
+                resultado.append({"modo": modo, "clientes": clientes, **medicao})
+        finally:
+            processo.terminate()
+            processo.wait()
+
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
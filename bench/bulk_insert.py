@@ -0,0 +1,54 @@
+"""
+Compara a taxa de inserção (linhas/s) de livros via POST /livro (um livro por
+requisição) e via POST /livros/bulk (lotes em uma única transação).
+
+Uso: python -m bench.bulk_insert [--livros 2000] [--lote 500]
+"""
+import argparse
+import json
+import time
+
+from bench import prepara_ambiente
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--livros", type=int, default=2000, help="quantidade de livros por caminho")
+    parser.add_argument("--lote", type=int, default=500, help="tamanho de cada lote no caminho bulk")
+    args = parser.parse_args()
+
+    prepara_ambiente()
+    from app import app
+
+    client = app.test_client()
+    client.post("/editora", data={"nome": "Editora Benchmark"})
+    client.post("/autor", data={"nome": "Autor Benchmark"})
+    id_editora = client.get("/editoras").json["editoras"][-1]["id"]
+    id_autor = client.get("/autores").json["autores"][-1]["id"]
+
+    def livro(prefixo, i):
+        return {"titulo": f"{prefixo} {i}", "ano_publicacao": "2000-01-01T00:00:00",
+                "id_editora": id_editora, "ids_autores": [id_autor]}
+
+    inicio = time.perf_counter()
+    for i in range(args.livros):
+        client.post("/livro", data=livro("Unitario", i))
+    unitario = time.perf_counter() - inicio
+
+    livros = [livro("Lote", i) for i in range(args.livros)]
+    inicio = time.perf_counter()
+    for i in range(0, args.livros, args.lote):
+        client.post("/livros/bulk", json={"livros": livros[i:i + args.lote]})
+    lote = time.perf_counter() - inicio
+
+    print(json.dumps({
+        "livros": args.livros,
+        "lote": args.lote,
+        "unitario_linhas_s": round(args.livros / unitario, 1),
+        "bulk_linhas_s": round(args.livros / lote, 1),
+        "ganho": round(unitario / lote, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Gera um catálogo sintético (editoras, autores, livros e associações em livro_autor)
+diretamente sobre os modelos de model/, com INSERTs executemany em lotes.
+
+Uso: python -m bench.catalogo [--editoras 50] [--autores 2000] [--livros 20000] [--autores-por-livro 3]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+
+from bench import prepara_ambiente
+
+# Palavras usadas nos títulos e nomes, para que a busca textual encontre resultados variados
+PALAVRAS = ["amor", "tempo", "mar", "cidade", "noite", "sertão", "guerra", "memória", "casa", "rio",
+            "estrela", "caminho", "silêncio", "jardim", "ilha", "sombra", "vento", "pedra", "sonho", "luz"]
+SOBRENOMES = ["Silva", "Souza", "Costa", "Santos", "Oliveira", "Pereira", "Lima", "Carvalho", "Araújo", "Melo"]
+
+# Registros inseridos por INSERT executemany
+TAMANHO_LOTE = 5000
+
+
+def gera_catalogo(session, editoras: int, autores: int, livros: int, autores_por_livro: int = 3,
+                  semente: int = 42):
+    """
+    Insere um catálogo sintético e efetiva a transação.
+
+    Os títulos são únicos ('<palavras> <n>'), os anos variam entre 1900 e 2024 e cada livro
+    recebe de 1 a 'autores_por_livro' autores distintos, sorteados de forma reprodutível.
+
+    :param session: A sessão de banco de dados.
+    :param editoras: Quantidade de editoras.
+    :param autores: Quantidade de autores.
+    :param livros: Quantidade de livros.
+    :param autores_por_livro: Máximo de autores associados a cada livro.
+    :param semente: Semente do sorteio, para gerar sempre o mesmo catálogo.
+    :return: Dicionário com as quantidades inseridas em cada tabela.
+    """
+    from sqlalchemy import insert
+    from model import Autor, Editora, Livro
+    from model.autor import livro_autor
+
+    sorteio = random.Random(semente)
+
+    def insere(tabela, registros):
+        for inicio in range(0, len(registros), TAMANHO_LOTE):
+            session.execute(insert(tabela), registros[inicio:inicio + TAMANHO_LOTE])
+
+    insere(Editora, [{"id": i, "nome": f"Editora {sorteio.choice(PALAVRAS).title()} {i}"}
+                     for i in range(1, editoras + 1)])
+    insere(Autor, [{"id": i, "nome": f"{sorteio.choice(PALAVRAS).title()} {sorteio.choice(SOBRENOMES)} {i}"}
+                   for i in range(1, autores + 1)])
+
+    registros_livros, associacoes = [], []
+    for i in range(1, livros + 1):
+        titulo = " ".join(sorteio.sample(PALAVRAS, 2)).capitalize()
+        registros_livros.append({"id": i, "titulo": f"{titulo} {i}",
+                                 "ano_publicacao": datetime(sorteio.randint(1900, 2024), 1, 1),
+                                 "id_editora": sorteio.randint(1, editoras)})
+        for id_autor in sorteio.sample(range(1, autores + 1), sorteio.randint(1, min(autores_por_livro, autores))):
+            associacoes.append({"id_livro": i, "id_autor": id_autor})
+    insere(Livro, registros_livros)
+    insere(livro_autor, associacoes)
+    session.commit()
+
+    return {"editoras": editoras, "autores": autores, "livros": livros, "livro_autor": len(associacoes)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--editoras", type=int, default=50)
+    parser.add_argument("--autores", type=int, default=2000)
+    parser.add_argument("--livros", type=int, default=20000)
+    parser.add_argument("--autores-por-livro", type=int, default=3)
+    args = parser.parse_args()
+
+    prepara_ambiente()
+    from model import Session, inicializa_banco
+
+    inicializa_banco()
+    inicio = time.perf_counter()
+    quantidades = gera_catalogo(Session(), args.editoras, args.autores, args.livros, args.autores_por_livro)
+    print(json.dumps({**quantidades, "segundos": round(time.perf_counter() - inicio, 2)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Mede a vazão de leitura (listagens de livros por segundo) com N escritores em paralelo,
+comparando a engine padrão do SQLAlchemy com a engine de model.cria_engine
+(WAL, synchronous=NORMAL, busy_timeout, mmap e cache).
+
+Uso: python -m bench.concorrencia [--leitores 8] [--escritores 0 1 4] [--duracao 3]
+"""
+import argparse
+import json
+import threading
+import time
+
+from bench import prepara_ambiente
+
+
+def executa(engine, leitores: int, escritores: int, duracao: float):
+    """ Executa leitores e escritores simultâneos por 'duracao' segundos e retorna as contagens. """
+    from sqlalchemy.orm import sessionmaker
+    from model import Livro, consulta_livros
+
+    Session = sessionmaker(bind=engine)
+    fim = time.perf_counter() + duracao
+    contagem = {"leituras": 0, "escritas": 0, "erros": 0}
+    trava = threading.Lock()
+
+    def conta(chave):
+        with trava:
+            contagem[chave] += 1
+
+    def leitor():
+        while time.perf_counter() < fim:
+            session = Session()
+            try:
+                consulta_livros(session, limit=100)
+                conta("leituras")
+            except Exception:
+                conta("erros")
+            finally:
+                session.close()
+
+    def escritor(n):
+        i = 0
+        while time.perf_counter() < fim:
+            session = Session()
+            try:
+                session.add(Livro(titulo=f"Escritor {id(engine)} {n} {i}"))
+                session.commit()
+                conta("escritas")
+            except Exception:
+                session.rollback()
+                conta("erros")
+            finally:
+                session.close()
+            i += 1
+
+    threads = [threading.Thread(target=leitor) for _ in range(leitores)]
+    threads += [threading.Thread(target=escritor, args=(n,)) for n in range(escritores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {chave: round(valor / duracao, 1) for chave, valor in contagem.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leitores", type=int, default=8)
+    parser.add_argument("--escritores", type=int, nargs="+", default=[0, 1, 4])
+    parser.add_argument("--duracao", type=float, default=3.0)
+    parser.add_argument("--livros", type=int, default=500, help="livros pré-carregados")
+    args = parser.parse_args()
+
+    diretorio = prepara_ambiente()
+    from sqlalchemy import create_engine
+    from model import Base, cria_engine, cria_indice_busca
+
+    resultado = []
+    for nome, fabrica in (("padrao", lambda url: create_engine(url)), ("ajustada", cria_engine)):
+        url = f"sqlite:///{diretorio}/{nome}.sqlite3"
+        engine = fabrica(url)
+        Base.metadata.create_all(engine)
+        cria_indice_busca(engine)
+        with engine.begin() as conn:
+            conn.execute(Base.metadata.tables["livro"].insert(),
+                         [{"titulo": f"Livro {i}"} for i in range(args.livros)])
+        for escritores in args.escritores:
+            medicao = executa(engine, args.leitores, escritores, args.duracao)
+            resultado.append({"engine": nome, "leitores": args.leitores,
+                              "escritores": escritores, "por_segundo": medicao})
+        engine.dispose()
+
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
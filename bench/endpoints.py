@@ -0,0 +1,221 @@
+"""
+Executa cada rota de app.py sobre um catálogo sintético (bench.catalogo), pelo cliente
+de teste do Flask e por um servidor HTTP local real, e reporta em JSON, por rota:
+vazão, latências p50/p95/p99, comandos SQL por requisição e pico de memória (RSS).
+
+As leituras rodam antes das escritas, e a remoção por último. O cache de respostas
+fica desligado (salvo com --cache), para que cada requisição chegue ao banco.
+
+Uso: python -m bench.endpoints [--livros 20000] [--requisicoes 200] [--clientes 8] [--saida resultado.json]
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import resource
+import threading
+import time
+from urllib.parse import quote, urlencode
+
+from bench import prepara_ambiente, percentil
+
+# Sequência global para gerar nomes e títulos únicos nas escritas, inclusive entre threads
+_sequencia = itertools.count()
+
+
+def rotas(editoras: int, autores: int, titulos):
+    """
+    Retorna as rotas medidas: (nome, fração das requisições, fábrica da requisição).
+    A fábrica recebe o índice da requisição e retorna (método, caminho, form, json).
+
+    :param editoras: Quantidade de editoras do catálogo.
+    :param autores: Quantidade de autores do catálogo.
+    :param titulos: Títulos do catálogo; os do fim da lista são removidos pelo DELETE.
+    """
+    livros = len(titulos)
+    removiveis = iter(reversed(titulos))
+
+    def livro_novo():
+        n = next(_sequencia)
+        return {"titulo": f"Benchmark {n}", "ano_publicacao": "2000-01-01T00:00:00",
+                "id_editora": n % editoras + 1, "ids_autores": [n % autores + 1]}
+
+    return [
+        ("GET /autores", 1, lambda i: ("GET", f"/autores?limit=50&after={i * 50 % autores}", None, None)),
+        ("GET /editoras", 1, lambda i: ("GET", "/editoras?limit=50", None, None)),
+        ("GET /autor/<id>/livros", 1, lambda i: ("GET", f"/autor/{i % autores + 1}/livros?limit=50", None, None)),
+        ("GET /editora/<id>/livros", 1, lambda i: ("GET", f"/editora/{i % editoras + 1}/livros?limit=50", None, None)),
+        ("GET /estatisticas", 1, lambda i: ("GET", f"/estatisticas?agrupamento={('editora', 'autor', 'ano')[i % 3]}",
+                                            None, None)),
+        ("GET /livros", 1, lambda i: ("GET", f"/livros?limit=100&after={i * 100 % livros}", None, None)),
+        ("GET /livros?fields", 1, lambda i: ("GET", f"/livros?limit=100&after={i * 100 % livros}&fields=id,titulo",
+                                             None, None)),
+        ("GET /livros/export", 0.05, lambda i: ("GET", "/livros/export", None, None)),
+        ("GET /livros/busca", 1, lambda i: ("GET", f"/livros/busca?q={quote(titulos[i % livros].split()[0])}",
+                                            None, None)),
+        ("GET /livro", 1, lambda i: ("GET", f"/livro?titulo={quote(titulos[i * 7 % livros])}", None, None)),
+        ("POST /livros/lookup", 1, lambda i: ("POST", "/livros/lookup", None, {
+            "titulos": [titulos[(i * 50 + j) * 7 % livros] for j in range(50)]})),
+        ("POST /autor", 1, lambda i: ("POST", "/autor", {"nome": f"Autor Benchmark {next(_sequencia)}"}, None)),
+        ("POST /editora", 1, lambda i: ("POST", "/editora", {"nome": f"Editora Benchmark {next(_sequencia)}"}, None)),
+        ("POST /livro", 1, lambda i: ("POST", "/livro", livro_novo(), None)),
+        ("POST /autores/bulk", 0.2, lambda i: ("POST", "/autores/bulk", None, {"autores": [
+            {"nome": f"Autor Benchmark {next(_sequencia)}"} for _ in range(100)]})),
+        ("POST /editoras/bulk", 0.2, lambda i: ("POST", "/editoras/bulk", None, {"editoras": [
+            {"nome": f"Editora Benchmark {next(_sequencia)}"} for _ in range(100)]})),
+        ("POST /livros/bulk", 0.2, lambda i: ("POST", "/livros/bulk", None, {
+            "livros": [livro_novo() for _ in range(100)]})),
+        ("DELETE /livro", 1, lambda i: ("DELETE", f"/livro?titulo={quote(next(removiveis))}", None, None)),
+    ]
+
+
+class ContadorSQL:
+    """ Conta os comandos SQL executados pela engine, em todas as threads. """
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.total = 0
+        self._trava = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._conta)
+
+    def _conta(self, conn, cursor, statement, parameters, context, executemany):
+        with self._trava:
+            self.total += 1
+
+
+def requisicao_cliente(client):
+    """ Retorna uma função que executa a requisição pelo cliente de teste do Flask e retorna o status. """
+    def executa(metodo, caminho, form, corpo):
+        response = client.open(caminho, method=metodo, data=form, json=corpo)
+        response.get_data()
+        return response.status_code
+    return executa
+
+
+def requisicao_servidor(porta: int):
+    """ Retorna uma função que executa a requisição no servidor local, com uma conexão por thread. """
+    local = threading.local()
+
+    def executa(metodo, caminho, form, corpo):
+        if not hasattr(local, "conexao"):
+            local.conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=60)
+        headers, dados = {}, None
+        if form is not None:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+            dados = urlencode(form, doseq=True)
+        elif corpo is not None:
+            headers["Content-Type"] = "application/json"
+            dados = json.dumps(corpo)
+        try:
+            local.conexao.request(metodo, caminho, body=dados, headers=headers)
+            response = local.conexao.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            local.conexao.close()
+            return None
+    return executa
+
+
+def mede(executa, fabrica, requisicoes: int, clientes: int, contador: ContadorSQL):
+    """ Executa 'requisicoes' requisições da rota com 'clientes' threads e retorna as medidas. """
+    indices = iter(range(requisicoes))
+    trava = threading.Lock()
+    latencias, erros = [], [0]
+
+    def cliente():
+        while True:
+            with trava:
+                i = next(indices, None)
+            if i is None:
+                return
+            requisicao = fabrica(i)
+            inicio = time.perf_counter()
+            status = executa(*requisicao)
+            duracao = time.perf_counter() - inicio
+            with trava:
+                if status == 200:
+                    latencias.append(duracao)
+                else:
+                    erros[0] += 1
+
+    sql_antes = contador.total
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=cliente) for _ in range(clientes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - inicio
+
+    latencias.sort()
+    ms = lambda valor: round(valor * 1000, 3) if valor is not None else None
+    return {
+        "requisicoes": requisicoes,
+        "erros": erros[0],
+        "req_s": round(requisicoes / total, 1),
+        "p50_ms": ms(percentil(latencias, 0.50)),
+        "p95_ms": ms(percentil(latencias, 0.95)),
+        "p99_ms": ms(percentil(latencias, 0.99)),
+        "sql_por_requisicao": round((contador.total - sql_antes) / requisicoes, 2),
+        # ru_maxrss é o pico do processo inteiro (KiB no Linux), acumulado desde o início
+        "pico_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--editoras", type=int, default=50)
+    parser.add_argument("--autores", type=int, default=2000)
+    parser.add_argument("--livros", type=int, default=20000)
+    parser.add_argument("--autores-por-livro", type=int, default=3)
+    parser.add_argument("--requisicoes", type=int, default=200, help="requisições por rota")
+    parser.add_argument("--clientes", type=int, default=8, help="threads simultâneas contra o servidor local")
+    parser.add_argument("--modos", nargs="+", choices=["cliente", "servidor"], default=["cliente", "servidor"])
+    parser.add_argument("--cache", action="store_true", help="mantém o cache de respostas ligado")
+    parser.add_argument("--saida", help="arquivo em que o JSON também é gravado")
+    args = parser.parse_args()
+    saida = os.path.abspath(args.saida) if args.saida else None
+
+    prepara_ambiente()
+    if not args.cache:
+        os.environ["CACHE_BACKEND"] = "desligado"
+    from werkzeug.serving import make_server
+    from app import app
+    from model import Session, Livro, engine
+    from bench.catalogo import gera_catalogo
+
+    catalogo = gera_catalogo(Session(), args.editoras, args.autores, args.livros, args.autores_por_livro)
+    titulos = [titulo for titulo, in Session().query(Livro.titulo).order_by(Livro.id)]
+    Session.remove()
+    contador = ContadorSQL(engine)
+    # As mesmas fábricas servem aos dois modos, para que a remoção não repita títulos já removidos
+    medidas = rotas(args.editoras, args.autores, titulos)
+    resultado = {"catalogo": catalogo, "requisicoes": args.requisicoes, "clientes": args.clientes, "rotas": []}
+
+    for modo in args.modos:
+        if modo == "cliente":
+            executa, clientes, servidor = requisicao_cliente(app.test_client()), 1, None
+        else:
+            servidor = make_server("127.0.0.1", 0, app, threaded=True)
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            executa, clientes = requisicao_servidor(servidor.server_port), args.clientes
+        try:
+            for nome, fracao, fabrica in medidas:
+                medicao = mede(executa, fabrica, max(1, int(args.requisicoes * fracao)), clientes, contador)
+                resultado["rotas"].append({"modo": modo, "rota": nome, **medicao})
+        finally:
+            if servidor is not None:
+                servidor.shutdown()
+
+    relatorio = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if saida:
+        with open(saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(relatorio)
+    print(relatorio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Mede vazão e latência das inclusões unitárias (POST /autor, /editora e /livro) com 1, 8
+e 64 escritores simultâneos, com um commit por requisição e com a escrita em grupo
+(ESCRITA_EM_GRUPO=1), em que uma thread efetiva as inclusões simultâneas em uma só transação.
+
+A configuração da escrita é lida na importação de 'escrita', então cada cenário roda em
+um processo próprio, sobre um banco novo.
+
+Uso: python -m bench.escrita [--requisicoes 2000] [--escritores 1 8 64] [--janela-ms 2]
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from bench import prepara_ambiente, percentil, RAIZ
+
+# Variáveis de ambiente de cada modo
+MODOS = {
+    "individual": {"ESCRITA_EM_GRUPO": "0"},
+    "em_grupo": {"ESCRITA_EM_GRUPO": "1"},
+}
+
+
+def executa_cenario(args):
+    """ Executa as inclusões no processo atual, com o modo de escrita já configurado pelo ambiente. """
+    prepara_ambiente()
+    from app import app
+    from model import Session
+    from bench.catalogo import gera_catalogo
+
+    gera_catalogo(Session(), 20, 200, 1000)
+    Session.remove()
+
+    proxima = iter(range(args.requisicoes))
+    sequencia = itertools.count()
+    trava = threading.Lock()
+    latencias, erros = [], 0
+
+    def escritor():
+        nonlocal erros
+        client = app.test_client()
+        while True:
+            with trava:
+                i = next(proxima, None)
+            if i is None:
+                return
+            n = next(sequencia)
+            inicio = time.perf_counter()
+            if i % 3 == 0:
+                response = client.post("/autor", data={"nome": f"Autor Escrita {n}"})
+            elif i % 3 == 1:
+                response = client.post("/editora", data={"nome": f"Editora Escrita {n}"})
+            else:
+                response = client.post("/livro", data={"titulo": f"Livro Escrita {n}", "ano_publicacao": "2000-01-01",
+                                                       "id_editora": n % 20 + 1, "ids_autores": [n % 200 + 1]})
+            duracao = time.perf_counter() - inicio
+            with trava:
+                latencias.append(duracao)
+                erros += response.status_code != 200
+
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=escritor) for _ in range(args.escritores[0])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - inicio
+
+    latencias.sort()
+    with open(args.resultado, "w") as arquivo:
+        json.dump({
+            "req_s": round(args.requisicoes / total, 1),
+            "p50_ms": round(percentil(latencias, 0.50) * 1000, 3),
+            "p99_ms": round(percentil(latencias, 0.99) * 1000, 3),
+            "erros": erros,
+        }, arquivo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--escritores", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--janela-ms", default="2", help="ESCRITA_GRUPO_JANELA_MS do modo em grupo")
+    parser.add_argument("--resultado", help=argparse.SUPPRESS)  # uso interno: executa um único cenário
+    args = parser.parse_args()
+
+    if args.resultado:
+        executa_cenario(args)
+        return
+
+    resultado = []
+    for escritores in args.escritores:
+        for modo, variaveis in MODOS.items():
+            with tempfile.NamedTemporaryFile(suffix=".json") as arquivo:
+                env = dict(os.environ, PYTHONPATH=RAIZ, CACHE_BACKEND="desligado", LOG_NIVEL="CRITICAL",
+                           ESCRITA_GRUPO_JANELA_MS=args.janela_ms, **variaveis)
+                subprocess.run([sys.executable, "-m", "bench.escrita", "--requisicoes", str(args.requisicoes),
+                                "--escritores", str(escritores), "--resultado", arquivo.name],
+                               env=env, cwd=RAIZ, stdout=subprocess.DEVNULL, check=True)
+                resultado.append({"escritores": escritores, "modo": modo, **json.load(arquivo)})
+
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
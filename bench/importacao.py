@@ -0,0 +1,73 @@
+"""
+Mede o tempo de partida a frio de um worker, em processos novos: a importação de 'app'
+(via python -X importtime), a criação da aplicação (create_app: log, banco e rotas)
+e a primeira geração da especificação OpenAPI. Lista também os módulos mais lentos
+de importar, pelo tempo acumulado (incluindo os módulos que cada um importa).
+
+Uso: python -m bench.importacao [--repeticoes 5] [--modulos 15]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from bench import RAIZ
+
+# Executado em cada processo novo; os tempos de cada fase vão para a saída padrão
+SCRIPT = """
+import json, time
+inicio = time.perf_counter()
+import app
+importado = time.perf_counter()
+aplicacao = app.create_app()
+criado = time.perf_counter()
+aplicacao.api_doc
+documentado = time.perf_counter()
+print(json.dumps({"importacao_ms": (importado - inicio) * 1000, "create_app_ms": (criado - importado) * 1000,
+                  "openapi_ms": (documentado - criado) * 1000}))
+"""
+
+
+def le_importtime(saida: str):
+    """ Retorna {módulo: tempo acumulado em µs} a partir da saída de python -X importtime. """
+    tempos = {}
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, proprio, acumulado, modulo = [parte.strip() for parte in linha.replace("import time:", "|").split("|")]
+        tempos[modulo] = int(acumulado)
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--modulos", type=int, default=15, help="quantidade de módulos mais lentos listados")
+    args = parser.parse_args()
+
+    fases, importacoes = [], []
+    for _ in range(args.repeticoes):
+        # Cada processo parte de um diretório vazio, como um worker recém-criado
+        with tempfile.TemporaryDirectory(prefix="bench-") as diretorio:
+            env = dict(os.environ, PYTHONPATH=RAIZ, LOG_NIVEL="CRITICAL")
+            processo = subprocess.run([sys.executable, "-X", "importtime", "-c", SCRIPT], env=env, cwd=diretorio,
+                                      capture_output=True, text=True, check=True)
+        fases.append(json.loads(processo.stdout.strip().splitlines()[-1]))
+        importacoes.append(le_importtime(processo.stderr))
+
+    # Mediana de cada fase e de cada módulo entre as repetições
+    resultado = {fase: round(statistics.median(medida[fase] for medida in fases), 1) for fase in fases[0]}
+    modulos = {modulo: statistics.median(tempos.get(modulo, 0) for tempos in importacoes)
+               for modulo in importacoes[0]}
+    resultado["modulos_mais_lentos_ms"] = {
+        modulo: round(tempo / 1000, 1)
+        for modulo, tempo in sorted(modulos.items(), key=lambda item: item[1], reverse=True)[:args.modulos]
+    }
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Mede as leituras (GET /livros, /autores, /editoras e /livro) com escritores simultâneos
+(POST /autor e /livro), em cada modo de leitura (LEITURA_MODO): tudo no banco principal,
+pool somente leitura sobre o mesmo arquivo e cópia em memória.
+
+A configuração da leitura é lida na importação de 'leitura', então cada modo roda em um
+processo próprio, sobre um banco novo.
+
+Uso: python -m bench.leitura [--segundos 10] [--leitores 8] [--escritores 2]
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from bench import prepara_ambiente, percentil, RAIZ
+
+MODOS = ("primario", "somente_leitura", "memoria")
+
+
+def executa_cenario(args):
+    """ Executa leitores e escritores no processo atual, com o modo de leitura já configurado pelo ambiente. """
+    prepara_ambiente()
+    from model import Session, inicializa_banco
+    from bench.catalogo import gera_catalogo
+
+    inicializa_banco()
+    gera_catalogo(Session(), 50, 2000, 20000)
+    Session.remove()
+    from app import app
+    time.sleep(0.5)  # primeira cópia, no modo 'memoria'
+
+    leituras = [lambda n: f"/livros?limit=100&after={n % 19000}", lambda n: f"/autores?limit=100&after={n % 1900}",
+                lambda n: f"/editoras?after={n % 40}", lambda n: f"/livro?titulo=Amor%20tempo%20{n % 20000 + 1}"]
+    sequencia = itertools.count()
+    trava = threading.Lock()
+    latencias, escritas, erros = [], 0, 0
+    fim = time.monotonic() + args.segundos
+
+    def leitor():
+        nonlocal erros
+        client = app.test_client()
+        while time.monotonic() < fim:
+            n = next(sequencia)
+            inicio = time.perf_counter()
+            response = client.get(leituras[n % len(leituras)](n))
+            duracao = time.perf_counter() - inicio
+            with trava:
+                latencias.append(duracao)
+                erros += response.status_code not in (200, 404)
+
+    def escritor():
+        nonlocal escritas, erros
+        client = app.test_client()
+        while time.monotonic() < fim:
+            n = next(sequencia)
+            if n % 2:
+                response = client.post("/autor", data={"nome": f"Autor Leitura {n}"})
+            else:
+                response = client.post("/livro", data={"titulo": f"Livro Leitura {n}", "ano_publicacao": "2000-01-01",
+                                                       "id_editora": n % 50 + 1, "ids_autores": [n % 2000 + 1]})
+            with trava:
+                escritas += 1
+                erros += response.status_code != 200
+
+    threads = [threading.Thread(target=leitor) for _ in range(args.leitores)] + \
+              [threading.Thread(target=escritor) for _ in range(args.escritores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencias.sort()
+    with open(args.resultado, "w") as arquivo:
+        json.dump({
+            "leituras_s": round(len(latencias) / args.segundos, 1),
+            "leitura_p50_ms": round(percentil(latencias, 0.50) * 1000, 3),
+            "leitura_p99_ms": round(percentil(latencias, 0.99) * 1000, 3),
+            "escritas_s": round(escritas / args.segundos, 1),
+            "erros": erros,
+        }, arquivo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--leitores", type=int, default=8)
+    parser.add_argument("--escritores", type=int, default=2)
+    parser.add_argument("--resultado", help=argparse.SUPPRESS)  # uso interno: executa um único cenário
+    args = parser.parse_args()
+
+    if args.resultado:
+        executa_cenario(args)
+        return
+
+    resultado = []
+    for modo in MODOS:
+        with tempfile.NamedTemporaryFile(suffix=".json") as arquivo:
+            env = dict(os.environ, PYTHONPATH=RAIZ, CACHE_BACKEND="desligado", LOG_NIVEL="CRITICAL",
+                       LEITURA_MODO=modo)
+            subprocess.run([sys.executable, "-m", "bench.leitura", "--segundos", str(args.segundos),
+                            "--leitores", str(args.leitores), "--escritores", str(args.escritores),
+                            "--resultado", arquivo.name],
+                           env=env, cwd=RAIZ, stdout=subprocess.DEVNULL, check=True)
+            resultado.append({"modo": modo, **json.load(arquivo)})
+
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
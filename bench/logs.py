@@ -0,0 +1,110 @@
+"""
+Mede a latência das requisições com o log desligado e ligado (nível DEBUG, com uma linha
+de acesso por requisição), gravando na thread da requisição (modo síncrono, inclusive
+com a rotação a cada 10 KB da configuração anterior) ou pela fila com thread de fundo.
+
+A configuração do log é lida na importação de 'logger', então cada cenário roda em
+um processo próprio.
+
+Uso: python -m bench.logs [--requisicoes 2000] [--threads 8] [--livros 2000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from bench import prepara_ambiente, percentil, RAIZ
+
+# Variáveis de ambiente de cada cenário
+CENARIOS = {
+    "desligado": {"LOG_NIVEL": "CRITICAL"},
+    "sincrono_10kb": {"LOG_MODO": "sincrono", "LOG_NIVEL": "DEBUG", "LOG_ACESSO": "1", "LOG_MAX_BYTES": "10000"},
+    "sincrono": {"LOG_MODO": "sincrono", "LOG_NIVEL": "DEBUG", "LOG_ACESSO": "1"},
+    "fila": {"LOG_MODO": "fila", "LOG_NIVEL": "DEBUG", "LOG_ACESSO": "1"},
+    "fila_json": {"LOG_MODO": "fila", "LOG_NIVEL": "DEBUG", "LOG_ACESSO": "1", "LOG_FORMATO": "json"},
+}
+
+
+def executa_cenario(args):
+    """ Executa as requisições no processo atual, com o log já configurado pelo ambiente. """
+    prepara_ambiente(silencia_logs=False)
+    from app import app
+    from model import Session
+    from bench.catalogo import gera_catalogo
+
+    gera_catalogo(Session(), 20, 200, args.livros)
+    Session.remove()
+
+    proxima = iter(range(args.requisicoes))
+    trava = threading.Lock()
+    latencias = []
+
+    def cliente():
+        client = app.test_client()
+        while True:
+            with trava:
+                i = next(proxima, None)
+            if i is None:
+                return
+            inicio = time.perf_counter()
+            if i % 4 == 0:
+                client.get(f"/livros?limit=50&after={i % args.livros}")
+            elif i % 4 == 1:
+                client.get(f"/autor/{i % 200 + 1}/livros?limit=20")
+            elif i % 4 == 2:
+                client.get("/livro?titulo=inexistente")  # registra um warning
+            else:
+                client.post("/autor", data={"nome": f"Autor Log {i}"})
+            duracao = time.perf_counter() - inicio
+            with trava:
+                latencias.append(duracao)
+
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=cliente) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - inicio
+
+    latencias.sort()
+    with open(args.resultado, "w") as arquivo:
+        json.dump({
+            "req_s": round(args.requisicoes / total, 1),
+            "p50_ms": round(percentil(latencias, 0.50) * 1000, 3),
+            "p99_ms": round(percentil(latencias, 0.99) * 1000, 3),
+        }, arquivo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--livros", type=int, default=2000, help="livros do catálogo sintético")
+    parser.add_argument("--resultado", help=argparse.SUPPRESS)  # uso interno: executa um único cenário
+    args = parser.parse_args()
+
+    if args.resultado:
+        executa_cenario(args)
+        return
+
+    resultado = []
+    for nome, variaveis in CENARIOS.items():
+        with tempfile.NamedTemporaryFile(suffix=".json") as arquivo:
+            env = dict(os.environ, PYTHONPATH=RAIZ, CACHE_BACKEND="desligado", **variaveis)
+            # A saída do console vai para /dev/null; os arquivos de log continuam sendo gravados
+            subprocess.run([sys.executable, "-m", "bench.logs", "--requisicoes", str(args.requisicoes),
+                            "--threads", str(args.threads), "--livros", str(args.livros),
+                            "--resultado", arquivo.name],
+                           env=env, cwd=RAIZ, stdout=subprocess.DEVNULL, check=True)
+            resultado.append({"cenario": nome, **json.load(arquivo)})
+
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
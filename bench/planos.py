@@ -0,0 +1,106 @@
+"""
+Exibe, com EXPLAIN QUERY PLAN, os planos da listagem de livros (GET /livros) com cada
+combinação dos filtros ano_de/ano_ate, id_editora e id_autor, tanto com junções quanto
+no modelo de leitura 'livro_view', sobre um catálogo sintético do tamanho informado.
+Os comandos são os gerados por consulta_livros, capturados durante a execução, com os
+mesmos parâmetros.
+
+A ausência de varreduras completas (SCAN) é conferida por tests/test_planos.py; aqui os
+planos são apenas relatados, marcando os que percorrem uma tabela inteira.
+
+Uso: python -m bench.planos [--livros 20000] [--autores 2000]
+"""
+import argparse
+import itertools
+import json
+
+from bench import prepara_ambiente
+
+# Valores de cada filtro nas combinações conferidas (o intervalo de anos conta como um filtro)
+FILTROS = {
+    "ano": {"ano_de": 1950, "ano_ate": 1960},
+    "id_editora": {"id_editora": 7},
+    "id_autor": {"id_autor": 42},
+}
+
+
+def percorre_tabela(plano):
+    """ Retorna as linhas do plano que percorrem uma tabela ou índice inteiro. """
+    return [linha for linha in plano if linha.startswith("SCAN ") and linha != "SCAN CONSTANT ROW"]
+
+
+def planos_da_consulta(engine, session, consulta):
+    """ Executa 'consulta' (uma função da sessão) e retorna o plano de cada SELECT que ela emitiu. """
+    from sqlalchemy import event
+
+    comandos = []
+
+    def captura(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            comandos.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", captura)
+    try:
+        consulta(session)
+    finally:
+        event.remove(engine, "before_cursor_execute", captura)
+
+    planos = []
+    conexao = session.connection().connection.dbapi_connection
+    for statement, parameters in comandos:
+        cursor = conexao.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        planos.append((statement, [linha[3] for linha in cursor.fetchall()]))
+    return planos
+
+
+def verifica_planos(engine, session, limit: int = 100):
+    """
+    Obtém o plano de cada SELECT da listagem de livros com cada combinação de FILTROS,
+    com e sem o modelo de leitura 'livro_view' (que deve existir no banco).
+
+    :return: Lista de dicionários com o modelo, os filtros, o comando, o plano e se ele
+             evita varreduras completas ('ok').
+    """
+    from model import consulta_livros
+
+    combinacoes = [combinacao for tamanho in range(1, len(FILTROS) + 1)
+                   for combinacao in itertools.combinations(FILTROS, tamanho)]
+    resultado = []
+    for materializada in (False, True):
+        for combinacao in combinacoes:
+            filtros = {chave: valor for nome in combinacao for chave, valor in FILTROS[nome].items()}
+
+            def consulta(session):
+                return consulta_livros(session, limit=limit + 1, materializada=materializada, **filtros)
+
+            for statement, plano in planos_da_consulta(engine, session, consulta):
+                resultado.append({"livro_view": materializada, "filtros": filtros, "sql": statement,
+                                  "ok": not percorre_tabela(plano), "plano": plano})
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--livros", type=int, default=20000)
+    parser.add_argument("--autores", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    prepara_ambiente()
+    from model import Session, engine, inicializa_banco
+    from model.livro_view import configura_livro_view
+    from bench.catalogo import gera_catalogo
+
+    inicializa_banco()
+    gera_catalogo(Session(), 50, args.autores, args.livros)
+    configura_livro_view(engine, True)
+
+    resultado = verifica_planos(engine, Session(), args.limit)
+    Session.remove()
+    for item in resultado:
+        del item["sql"]
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
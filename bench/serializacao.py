@@ -0,0 +1,64 @@
+"""
+Compara a serialização da listagem de livros pelo caminho anterior
+(apresenta_livros com objetos + jsonify do Flask) com o caminho rápido
+(apresenta_livros_json, de tuplas direto para bytes JSON).
+
+Uso: python -m bench.serializacao [--linhas 1000 10000 100000] [--repeticoes 3]
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from bench import prepara_ambiente
+
+
+def melhor_tempo(funcao, repeticoes: int):
+    """ Executa 'funcao' 'repeticoes' vezes e retorna o menor tempo, em segundos. """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    prepara_ambiente()
+    from flask import jsonify
+    from app import app
+    from schemas import apresenta_livros, apresenta_livros_json, BIBLIOTECA_JSON
+
+    resultado = []
+    for quantidade in args.linhas:
+        tuplas = [(i, f"Título do livro {i}", 1900 + i % 120, f"Editora {i % 50}",
+                   [f"Autor {i % 700}", f"Autor {i % 300}"]) for i in range(quantidade)]
+        # Objetos com a mesma forma dos modelos ORM, para o caminho anterior
+        objetos = [SimpleNamespace(id=id, titulo=titulo, ano_publicacao=datetime(ano, 1, 1),
+                                   editora=SimpleNamespace(nome=editora),
+                                   autores=[SimpleNamespace(nome=nome) for nome in autores])
+                   for id, titulo, ano, editora, autores in tuplas]
+
+        with app.app_context():
+            anterior = melhor_tempo(lambda: jsonify(apresenta_livros(objetos)).get_data(), args.repeticoes)
+        rapido = melhor_tempo(lambda: apresenta_livros_json(tuplas), args.repeticoes)
+
+        resultado.append({
+            "linhas": quantidade,
+            "biblioteca": BIBLIOTECA_JSON,
+            "anterior_ms": round(anterior * 1000, 2),
+            "rapido_ms": round(rapido * 1000, 2),
+            "ganho": round(anterior / rapido, 1),
+        })
+
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+from collections import OrderedDict
+from functools import wraps
+from flask import request, Response, current_app
+import asyncio
+import os
+import threading
+import time
+
+from model import ao_efetivar
+from leitura import leitura_defasada
+from etag import versoes_requisicao
+from logger import logger
+
+# Tabelas lidas pelas respostas que envolvem livros
+TABELAS_LIVRO = ("livro", "editora", "autor", "livro_autor")
+
+# Configuração do cache, via variáveis de ambiente
+# CACHE_BACKEND: 'local' (padrão, por processo), 'redis' (compartilhado entre workers) ou 'desligado'
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "local")
+CACHE_URL = os.environ.get("CACHE_URL", "redis://localhost:6379/0")
+CACHE_MAX_ENTRADAS = int(os.environ.get("CACHE_MAX_ENTRADAS", 1024))
+CACHE_TTL = float(os.environ.get("CACHE_TTL", 60))  # segundos
+
+
+class CacheLocal:
+    """
+    Cache em memória do processo, limitado por quantidade de entradas (LRU) e por TTL.
+    Um commit do próprio processo remove as entradas que dependem das tabelas alteradas;
+    as de commits de outros workers deixam de ser lidas (a chave inclui as versões do
+    banco) e saem por LRU ou TTL.
+    """
+
+    def __init__(self, max_entradas: int = CACHE_MAX_ENTRADAS, ttl: float = CACHE_TTL):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # chave -> (expiração, tabelas, valor)
+        self._trava = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, chave: str):
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada[0] < time.monotonic():
+                if entrada is not None:
+                    del self._entradas[chave]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.hits += 1
+            return entrada[2]
+
+    def set(self, chave: str, valor: bytes, tabelas=()):
+        with self._trava:
+            self._entradas[chave] = (time.monotonic() + self.ttl, frozenset(tabelas), valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.evictions += 1
+
+    def invalida(self, tabelas):
+        with self._trava:
+            # Remove as entradas que dependem das tabelas alteradas
+            for chave in [chave for chave, (_, dependencias, _) in self._entradas.items()
+                          if not dependencias.isdisjoint(tabelas)]:
+                del self._entradas[chave]
+
+    def estatisticas(self):
+        with self._trava:
+            return {"backend": "local", "entradas": len(self._entradas), "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
+
+
+class CacheRedis:
+    """
+    Cache compartilhado entre workers em um servidor compatível com Redis.
+    Como a chave inclui as versões do banco, um commit em qualquer worker faz com que
+    as respostas anteriores deixem de ser lidas por todos. O TTL é aplicado por entrada
+    (SETEX) e a remoção por LRU fica a cargo da política 'maxmemory-policy' do servidor.
+    """
+
+    def __init__(self, url: str = CACHE_URL, ttl: float = CACHE_TTL):
+        import redis  # dependência opcional, necessária apenas para este backend
+
+        self._cliente = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self._trava = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, chave: str):
+        valor = self._cliente.get(f"cache:{chave}")
+        with self._trava:
+            if valor is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return valor
+
+    def set(self, chave: str, valor: bytes, tabelas=()):
+        self._cliente.setex(f"cache:{chave}", int(self.ttl), valor)
+
+    def invalida(self, tabelas):
+        # As entradas anteriores ao commit ficam com versões antigas na chave e expiram pelo TTL
+        pass
+
+    def estatisticas(self):
+        info = self._cliente.info("stats")
+        with self._trava:
+            return {"backend": "redis", "entradas": self._cliente.dbsize(), "hits": self.hits,
+                    "misses": self.misses, "evictions": info.get("evicted_keys", 0)}
+
+
+def cria_cache(backend: str = CACHE_BACKEND):
+    """ Cria o backend de cache configurado, ou None se o cache estiver desligado. """
+    if backend == "desligado":
+        return None
+    if backend == "redis":
+        return CacheRedis()
+    return CacheLocal()
+
+
+cache = cria_cache()
+
+
+@ao_efetivar
+def invalida_cache(tabelas):
+    """ Invalida as respostas em cache que dependem das tabelas alteradas por um commit. """
+    if cache is not None:
+        logger.debug("Invalidando cache das tabelas: %s", ", ".join(sorted(tabelas)))
+        cache.invalida(tabelas)
+
+
+class ConsultasCoalescidas:
+    """
+    Coalesce consultas idênticas e simultâneas: enquanto uma consulta está em andamento,
+    as demais com a mesma chave aguardam e recebem o mesmo resultado, sem ir ao banco.
+
+    Um commit no processo inicia uma nova geração de chaves, então uma consulta iniciada
+    depois de um commit nunca recebe o resultado de uma consulta iniciada antes dele.
+    O resultado é compartilhado entre as requisições e deve ser imutável (ex.: bytes JSON).
+    """
+
+    def __init__(self):
+        self._em_andamento = {}  # (geração, chave) -> [evento, resultado, erro] ou tarefa asyncio
+        self._geracao = 0
+        self._trava = threading.Lock()
+        self.executadas = self.coalescidas = 0
+
+    def invalida(self):
+        with self._trava:
+            self._geracao += 1
+
+    def executa(self, chave, funcao):
+        """ Executa funcao() uma única vez por grupo de chamadas simultâneas com a mesma chave. """
+        with self._trava:
+            chave = (self._geracao, chave)
+            consulta = self._em_andamento.get(chave)
+            lider = consulta is None
+            if lider:
+                consulta = self._em_andamento[chave] = [threading.Event(), None, None]
+                self.executadas += 1
+            else:
+                self.coalescidas += 1
+
+        evento = consulta[0]
+        if not lider:
+            evento.wait()
+            if consulta[2] is not None:
+                raise consulta[2]
+            return consulta[1]
+
+        try:
+            consulta[1] = funcao()
+            return consulta[1]
+        except Exception as e:
+            consulta[2] = e
+            raise
+        finally:
+            with self._trava:
+                del self._em_andamento[chave]
+            evento.set()
+
+    async def executa_assincrono(self, chave, funcao):
+        """ Versão de 'executa' para o modo ASGI, em que funcao() retorna uma corrotina. """
+        with self._trava:
+            chave = (self._geracao, chave)
+            tarefa = self._em_andamento.get(chave)
+            if tarefa is None:
+                tarefa = self._em_andamento[chave] = asyncio.ensure_future(funcao())
+                tarefa.add_done_callback(lambda _: self._encerra(chave))
+                self.executadas += 1
+            else:
+                self.coalescidas += 1
+        # Uma requisição cancelada não cancela a consulta aguardada pelas demais
+        return await asyncio.shield(tarefa)
+
+    def _encerra(self, chave):
+        with self._trava:
+            self._em_andamento.pop(chave, None)
+
+    def estatisticas(self):
+        with self._trava:
+            return {"executadas": self.executadas, "coalescidas": self.coalescidas}
+
+
+consultas_coalescidas = ConsultasCoalescidas()
+
+
+@ao_efetivar
+def invalida_consultas_coalescidas(tabelas):
+    """ Separa as consultas posteriores a um commit das que ainda estão em andamento. """
+    consultas_coalescidas.invalida()
+
+
+def cache_leitura(*tabelas):
+    """
+    Decorator de leitura com cache (read-through) para rotas GET.
+
+    A chave é formada pelo caminho, pelos parâmetros da query e pelas versões das
+    tabelas lidas pela rota, consultadas no banco (versao_tabela); apenas respostas 200
+    são guardadas, já serializadas.
+
+    :param tabelas: Nomes das tabelas das quais a resposta depende.
+    """
+    def decorator(funcao):
+        @wraps(funcao)
+        def wrapper(*args, **kwargs):
+            if cache is None:
+                return funcao(*args, **kwargs)
+
+            # As versões do banco (as mesmas do ETag): um commit de outro worker, que não
+            # invalida este cache, também muda a chave
+            versoes, _ = versoes_requisicao(tabelas)
+            parametros = "&".join(f"{nome}={valor}" for nome, valor in sorted(request.args.items(multi=True)))
+            chave = f"{request.path}?{parametros}#{'.'.join(map(str, versoes))}"
+
+            corpo = cache.get(chave)
+            if corpo is not None:
+                response = Response(corpo, mimetype="application/json")
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            response = current_app.make_response(funcao(*args, **kwargs))
+            # Uma resposta lida de uma cópia atrasada não pode ficar no cache com as versões atuais
+            if response.status_code == 200 and not leitura_defasada():
+                cache.set(chave, response.get_data(), tabelas)
+            response.headers["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,72 @@
+from flask_openapi3 import OpenAPI, APIBlueprint
+from flask_openapi3.utils import parse_parameters
+import threading
+
+
+class DocumentacaoSobDemanda:
+    """
+    Adia a geração da documentação OpenAPI de cada rota até a primeira leitura da especificação.
+
+    Ao registrar uma rota, o flask-openapi3 gera o JSON Schema de cada parâmetro e de cada
+    resposta, o que domina o tempo de importação da aplicação. Aqui o registro apenas extrai
+    os modelos usados na validação dos parâmetros e guarda o restante para depois.
+
+    Sobrescreve métodos e atributos internos do flask-openapi3 (_collect_openapi_info,
+    spec_json, tag_names, components_schemas e a propriedade api_doc), por isso a versão
+    é fixada em requirements.txt; tests/test_documentacao.py confere a especificação gerada.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pendentes = []
+
+    def _collect_openapi_info(self, rule, func, **kwargs):
+        if kwargs.get("doc_ui", True) is True and getattr(self, "doc_ui", True) is True:
+            self._pendentes.append((rule, func, kwargs))
+        return parse_parameters(func, doc_ui=False)
+
+    def gera_documentacao_pendente(self):
+        """ Gera a documentação das rotas registradas desde a última chamada. """
+        pendentes, self._pendentes = self._pendentes, []
+        for rule, func, kwargs in pendentes:
+            super()._collect_openapi_info(rule, func, **kwargs)
+        return bool(pendentes)
+
+
+class APIBlueprintSobDemanda(DocumentacaoSobDemanda, APIBlueprint):
+    """ APIBlueprint com a documentação das rotas gerada sob demanda. """
+
+
+class OpenAPISobDemanda(DocumentacaoSobDemanda, OpenAPI):
+    """
+    OpenAPI com a documentação das rotas, próprias e dos APIBlueprintSobDemanda registrados,
+    gerada apenas quando a especificação é lida (/openapi ou 'flask openapi').
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._blueprints = []
+        self._trava_documentacao = threading.Lock()
+
+    def register_api(self, api, **options):
+        super().register_api(api, **options)
+        self._blueprints.append(api)
+
+    @property
+    def api_doc(self):
+        with self._trava_documentacao:
+            alterada = self.gera_documentacao_pendente()
+            for api in self._blueprints:
+                if isinstance(api, DocumentacaoSobDemanda) and api.gera_documentacao_pendente():
+                    # Mesma incorporação feita por OpenAPI.register_api (rotas sem url_prefix)
+                    for tag in api.tags:
+                        if tag.name not in self.tag_names:
+                            self.tags.append(tag)
+                            self.tag_names.append(tag.name)
+                    self.paths.update(api.paths)
+                    self.components_schemas.update(api.components_schemas)
+                    alterada = True
+            if alterada:
+                # Descarta a especificação já gerada, para incluir as novas rotas
+                self.spec_json = {}
+            return OpenAPI.api_doc.fget(self)
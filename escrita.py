@@ -0,0 +1,162 @@
+from concurrent.futures import Future
+from sqlalchemy.exc import IntegrityError
+import os
+import queue
+import threading
+import time
+
+from model import Session, Autor, Editora, insere_livros_lote, insere_nomeados_lote
+from model.lote import DUPLICADO, REFERENCIA_INVALIDA
+from logger import logger
+
+# Configuração da escrita em grupo (group commit), via variáveis de ambiente
+# ESCRITA_EM_GRUPO=1 envia as inclusões unitárias de livros, autores e editoras a uma única
+# thread de escrita, que as efetiva em grupos, com um commit por grupo
+ESCRITA_EM_GRUPO = os.environ.get("ESCRITA_EM_GRUPO", "0") == "1"
+ESCRITA_GRUPO_JANELA_MS = float(os.environ.get("ESCRITA_GRUPO_JANELA_MS", 2))  # espera por mais operações
+ESCRITA_GRUPO_MAXIMO = int(os.environ.get("ESCRITA_GRUPO_MAXIMO", 128))  # operações por grupo
+
+# Ordem de inserção dos tipos em um grupo
+TIPOS_ESCRITA = ("editora", "autor", "livro")
+
+
+class RegistroDuplicado(Exception):
+    """ O registro incluído em grupo já existe (nome ou título único). """
+
+
+class ReferenciaInvalida(Exception):
+    """ O livro incluído em grupo referencia uma editora ou autores inexistentes. """
+
+
+class EscritorEmGrupo:
+    """
+    Efetiva as inclusões de várias requisições simultâneas em uma única transação.
+
+    Cada requisição enfileira sua operação e aguarda o resultado; a thread de escrita
+    retira da fila a primeira operação, aguarda até 'janela' segundos (ou até 'maximo'
+    operações) por outras e insere cada tipo com as funções de inserção em lote, que
+    apontam por registro os duplicados e as referências inválidas. Assim uma operação
+    inválida não desfaz as demais do grupo, e cada requisição recebe a sua situação.
+
+    Se o commit do grupo falhar por integridade (uma escrita de outro processo entre a
+    verificação e a inserção), as operações são refeitas uma a uma, cada uma com seu commit.
+    """
+
+    def __init__(self, session_factory, janela: float = ESCRITA_GRUPO_JANELA_MS / 1000,
+                 maximo: int = ESCRITA_GRUPO_MAXIMO):
+        self.session_factory = session_factory
+        self.janela = janela
+        self.maximo = maximo
+        self._fila = queue.SimpleQueue()
+        self._thread = None
+        self._trava = threading.Lock()
+        self.grupos = self.operacoes = 0
+
+    def submete(self, tipo: str, registro):
+        """
+        Enfileira uma inclusão e retorna um Future com a tupla (situação, id) do registro.
+
+        :param tipo: 'livro', 'autor' ou 'editora'.
+        :param registro: O nome (autor e editora) ou o objeto com os dados do livro.
+        """
+        futuro = Future()
+        with self._trava:
+            # A thread é iniciada no primeiro uso, em cada processo (inclusive após um fork)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executa, name="escritor-em-grupo", daemon=True)
+                self._thread.start()
+        self._fila.put((tipo, registro, futuro))
+        return futuro
+
+    def insere(self, tipo: str, registro):
+        """
+        Enfileira uma inclusão e aguarda a sua efetivação.
+
+        :return: O id do registro criado.
+        :raises RegistroDuplicado: Se o nome ou título já existe.
+        :raises ReferenciaInvalida: Se o livro referencia uma editora ou autores inexistentes.
+        """
+        return resultado_insercao(self.submete(tipo, registro).result())
+
+    def _executa(self):
+        while True:
+            grupo = [self._fila.get()]
+            limite = time.monotonic() + self.janela
+            while len(grupo) < self.maximo:
+                try:
+                    # Operações já enfileiradas entram no grupo mesmo com a janela encerrada
+                    grupo.append(self._fila.get(timeout=max(limite - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            self._efetiva(grupo)
+
+    def _efetiva(self, grupo):
+        try:
+            resultados = self._insere(grupo)
+        except IntegrityError:
+            logger.warning("Conflito ao efetivar grupo de %s escritas; efetivando uma a uma.", len(grupo))
+            for operacao in grupo:
+                try:
+                    [resultado] = self._insere([operacao])
+                except IntegrityError:
+                    resultado = (DUPLICADO, None)
+                except Exception as e:
+                    operacao[2].set_exception(e)
+                    continue
+                operacao[2].set_result(resultado)
+            return
+        except Exception as e:
+            logger.error("Erro ao efetivar grupo de %s escritas: %s", len(grupo), e)
+            for _, _, futuro in grupo:
+                futuro.set_exception(e)
+            return
+
+        for (_, _, futuro), resultado in zip(grupo, resultados):
+            futuro.set_result(resultado)
+
+    def _insere(self, grupo):
+        """ Insere as operações do grupo em uma única transação e retorna as situações, na mesma ordem. """
+        resultados = [None] * len(grupo)
+        session = self.session_factory()
+        try:
+            for tipo in TIPOS_ESCRITA:
+                indices = [indice for indice, operacao in enumerate(grupo) if operacao[0] == tipo]
+                if not indices:
+                    continue
+                registros = [grupo[indice][1] for indice in indices]
+                if tipo == "livro":
+                    situacoes = insere_livros_lote(session, registros)
+                else:
+                    situacoes = insere_nomeados_lote(session, Autor if tipo == "autor" else Editora, registros)
+                for indice, situacao in zip(indices, situacoes):
+                    resultados[indice] = situacao
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        with self._trava:
+            self.grupos += 1
+            self.operacoes += len(grupo)
+        logger.debug("Grupo de %s escritas efetivado.", len(grupo))
+        return resultados
+
+    def estatisticas(self):
+        with self._trava:
+            return {"grupos": self.grupos, "operacoes": self.operacoes}
+
+
+def resultado_insercao(resultado):
+    """ Converte a tupla (situação, id) de uma inclusão em grupo no id, ou na exceção correspondente. """
+    status, id = resultado
+    if status == DUPLICADO:
+        raise RegistroDuplicado()
+    if status == REFERENCIA_INVALIDA:
+        raise ReferenciaInvalida()
+    return id
+
+
+# Sessões criadas diretamente pela fábrica, com o acompanhamento de alterações (invalidação dos caches)
+escritor = EscritorEmGrupo(Session.session_factory) if ESCRITA_EM_GRUPO else None
@@ -0,0 +1,60 @@
+from functools import wraps
+from flask import g, request, current_app
+
+from model import consulta_versoes
+from leitura import sessao_leitura
+from logger import logger
+
+
+def versoes_requisicao(tabelas):
+    """
+    Retorna as versões das tabelas e a data da alteração mais recente, lidas do banco que
+    fornece os dados da requisição (ver leitura.roteia_leitura) uma única vez por requisição:
+    o ETag (get_condicional) e a chave do cache (cache.cache_leitura) usam as mesmas versões.
+
+    :param tabelas: Nomes das tabelas.
+    :return: Tupla (versões na ordem de 'tabelas', data/hora UTC da alteração mais recente).
+    """
+    consultadas = g.setdefault("versoes_tabelas", {})
+    chave = tuple(tabelas)
+    if chave not in consultadas:
+        consultadas[chave] = consulta_versoes(sessao_leitura(), tabelas)
+    return consultadas[chave]
+
+
+def get_condicional(*tabelas):
+    """
+    Decorator de GET condicional (ETag / Last-Modified) para rotas de leitura.
+
+    O ETag é derivado das versões das tabelas lidas pela rota, que só mudam quando um
+    commit as altera. Se o cliente envia If-None-Match (ou If-Modified-Since) ainda
+    válido, a resposta 304 é devolvida antes de qualquer consulta ORM ou serialização.
+
+    :param tabelas: Nomes das tabelas das quais a resposta depende.
+    """
+    def decorator(funcao):
+        @wraps(funcao)
+        def wrapper(*args, **kwargs):
+            versoes, alterado_em = versoes_requisicao(tabelas)
+            etag = "v" + ".".join(map(str, versoes))
+
+            if request.if_none_match:
+                nao_modificado = request.if_none_match.contains(etag)
+            else:
+                nao_modificado = alterado_em is not None and request.if_modified_since is not None \
+                                 and alterado_em.replace(microsecond=0) <= request.if_modified_since
+
+            if nao_modificado:
+                logger.debug("Recurso não modificado: %s", request.full_path)
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(funcao(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if alterado_em is not None:
+                response.last_modified = alterado_em
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,263 @@
+from functools import wraps
+from flask import g, has_request_context
+from sqlalchemy import create_engine, make_url, select
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from model import Session, engine, db_url, cria_engine, ao_efetivar, DB_POOL_SIZE, DB_MAX_OVERFLOW
+from model.versao import VersaoTabela
+from logger import logger
+
+# Configuração da separação entre leituras e escritas, via variáveis de ambiente
+# LEITURA_MODO: 'primario' (padrão: tudo no banco principal), 'somente_leitura' (pool próprio,
+# somente leitura, sobre o mesmo arquivo SQLite em WAL), 'memoria' (cópia do SQLite em memória,
+# atualizada quando as versões do catálogo mudam) ou 'replica' (banco em LEITURA_URL)
+LEITURA_MODO = os.environ.get("LEITURA_MODO", "primario")
+LEITURA_URL = os.environ.get("LEITURA_URL")
+# Defasagem máxima (s) tolerada nas leituras separadas; acima dela a leitura vai ao banco principal
+LEITURA_DEFASAGEM_MAXIMA = float(os.environ.get("LEITURA_DEFASAGEM_MAXIMA", 2))
+# Intervalo (s) entre as verificações das versões do catálogo no banco principal (modo 'memoria')
+LEITURA_VERIFICACAO = float(os.environ.get("LEITURA_VERIFICACAO", 0.5))
+
+MODOS_LEITURA = ("primario", "somente_leitura", "memoria", "replica")
+
+
+class CopiaMemoria:
+    """
+    Cópia em memória do banco SQLite principal, para as leituras.
+
+    A cópia é feita com a API de backup do SQLite (de uma só vez, sob um único snapshot
+    de leitura do WAL) para um banco em memória nomeado e compartilhado entre as conexões
+    do pool. Uma thread de fundo compara as versões do catálogo (versao_tabela) da cópia
+    com as do banco principal a cada LEITURA_VERIFICACAO segundos e refaz a cópia quando
+    mudam; assim, sob escritas contínuas, a cópia é refeita no máximo uma vez por intervalo.
+    Ao trocar de cópia o pool é recriado; as conexões ainda em uso com a cópia anterior
+    terminam a requisição sobre ela e são descartadas.
+    """
+
+    def __init__(self, primario, pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW,
+                 verificacao: float = LEITURA_VERIFICACAO):
+        self.primario = primario
+        self.verificacao = verificacao
+        self._nome = None
+        self._guarda = None  # mantém o banco em memória vivo entre as conexões do pool
+        self.versoes = None
+        self.copiado_em = None
+        self.desatualizada_desde = None  # alteração mais antiga que a cópia atual pode não incluir
+        self._pendente_desde = None  # commit mais antigo do processo desde o início da última cópia
+        self.atualizacoes = 0
+        self._trava = threading.Lock()
+        self._thread = None
+        self.engine = create_engine("sqlite://", creator=self._conecta, poolclass=QueuePool,
+                                    pool_size=pool_size, max_overflow=max_overflow)
+
+    def _conecta(self):
+        with self._trava:
+            nome = self._nome
+        conexao = sqlite3.connect(f"file:{nome}?mode=memory&cache=shared", uri=True, check_same_thread=False)
+        conexao.execute("PRAGMA query_only=1")
+        return conexao
+
+    def inicia(self):
+        """ Faz a primeira cópia e inicia a thread de atualização (no primeiro uso, em cada processo). """
+        with self._trava:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._executa, name="copia-leitura", daemon=True)
+            self._thread.start()
+
+    def _executa(self):
+        while True:
+            try:
+                self.atualiza()
+            except Exception as e:
+                logger.warning("Erro ao atualizar a cópia de leitura: %s", e)
+            time.sleep(self.verificacao)
+
+    def notifica_alteracao(self):
+        """ Marca a cópia como atrasada após um commit do próprio processo, até a próxima atualização. """
+        agora = time.monotonic()
+        with self._trava:
+            if self.desatualizada_desde is None:
+                self.desatualizada_desde = agora
+            if self._pendente_desde is None:
+                self._pendente_desde = agora
+
+    def atualiza(self):
+        """ Refaz a cópia se as versões do catálogo no banco principal mudaram. """
+        # Os commits do processo notificados a partir daqui podem não entrar nesta cópia
+        with self._trava:
+            self._pendente_desde = None
+        with self.primario.connect() as conn:
+            versoes = dict(conn.execute(select(VersaoTabela.tabela, VersaoTabela.versao)).all())
+        if versoes == self.versoes:
+            with self._trava:
+                self.desatualizada_desde = self._pendente_desde
+            return False
+
+        with self._trava:
+            if self.desatualizada_desde is None:
+                self.desatualizada_desde = time.monotonic()
+
+        nome = f"leitura_{uuid.uuid4().hex}"
+        guarda = sqlite3.connect(f"file:{nome}?mode=memory&cache=shared", uri=True, check_same_thread=False)
+        origem = self.primario.raw_connection()
+        try:
+            origem.driver_connection.backup(guarda)
+        finally:
+            origem.close()
+        # As versões da própria cópia, que podem ser mais novas que as lidas acima
+        versoes = dict(guarda.execute("SELECT tabela, versao FROM versao_tabela").fetchall())
+
+        with self._trava:
+            anterior = self._guarda
+            self._nome, self._guarda, self.versoes = nome, guarda, versoes
+            self.copiado_em = time.monotonic()
+            self.atualizacoes += 1
+            self.desatualizada_desde = self._pendente_desde
+        # Novas conexões abrem a cópia nova; as ociosas com a anterior são fechadas
+        self.engine.dispose()
+        if anterior is not None:
+            anterior.close()
+        logger.debug("Cópia de leitura atualizada: %s", versoes)
+        return True
+
+    def defasagem(self):
+        """ Retorna há quantos segundos a cópia está atrasada (0 se atualizada, None se ainda não copiada). """
+        with self._trava:
+            if self._nome is None:
+                return None
+            if self.desatualizada_desde is None:
+                return 0.0
+            return time.monotonic() - self.desatualizada_desde
+
+
+class RoteadorLeitura:
+    """
+    Escolhe, a cada requisição de leitura, entre o banco de leitura e o principal.
+
+    - 'somente_leitura': sempre o pool de leitura, que enxerga os commits já efetivados no WAL;
+    - 'memoria': a cópia em memória, enquanto a defasagem for até 'defasagem_maxima';
+    - 'replica': a réplica, exceto até 'defasagem_maxima' segundos após um commit do
+      próprio processo (que a réplica pode ainda não ter recebido).
+    """
+
+    def __init__(self, modo: str, defasagem_maxima: float = LEITURA_DEFASAGEM_MAXIMA):
+        if modo not in MODOS_LEITURA:
+            raise ValueError(f"LEITURA_MODO inválido: '{modo}' (use {', '.join(MODOS_LEITURA)}).")
+        self.modo = modo
+        self.defasagem_maxima = defasagem_maxima
+        self.copia = None
+        self._ultima_escrita = None
+        self._trava = threading.Lock()
+        self.leituras = {"leitura": 0, "primario": 0}
+
+        if modo == "memoria":
+            if engine.dialect.name != "sqlite":
+                raise ValueError("LEITURA_MODO=memoria requer o banco principal em SQLite.")
+            self.copia = CopiaMemoria(engine)
+            self.engine = self.copia.engine
+        elif modo == "replica":
+            if not LEITURA_URL:
+                raise ValueError("LEITURA_MODO=replica requer LEITURA_URL.")
+            self.engine = cria_engine(LEITURA_URL)
+        else:
+            url = make_url(db_url)
+            if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+                raise ValueError("LEITURA_MODO=somente_leitura requer o banco principal em um arquivo SQLite.")
+            # O mesmo arquivo, aberto somente para leitura
+            self.engine = cria_engine(f"sqlite:///file:{os.path.abspath(url.database)}?mode=ro&uri=true")
+
+        self.SessaoLeitura = scoped_session(sessionmaker(bind=self.engine))
+
+    def notifica_alteracao(self):
+        self._ultima_escrita = time.monotonic()
+        if self.copia is not None:
+            self.copia.notifica_alteracao()
+
+    def sessao(self):
+        """
+        Retorna a sessão da leitura atual e se ela pode estar defasada.
+
+        :return: Tupla (sessão, defasada).
+        """
+        defasagem = 0.0
+        if self.copia is not None:
+            self.copia.inicia()
+            defasagem = self.copia.defasagem()
+            usa_leitura = defasagem is not None and defasagem <= self.defasagem_maxima
+        elif self.modo == "replica":
+            usa_leitura = self._ultima_escrita is None or \
+                          time.monotonic() - self._ultima_escrita > self.defasagem_maxima
+        else:
+            usa_leitura = True
+
+        with self._trava:
+            self.leituras["leitura" if usa_leitura else "primario"] += 1
+        if usa_leitura:
+            return self.SessaoLeitura(), bool(defasagem)
+        return Session(), False
+
+    def estatisticas(self):
+        with self._trava:
+            resultado = {"leituras_separadas": self.leituras["leitura"], "leituras_primario": self.leituras["primario"]}
+        if self.copia is not None:
+            resultado["atualizacoes"] = self.copia.atualizacoes
+            resultado["defasagem"] = self.copia.defasagem() or 0.0
+        return resultado
+
+
+roteador = RoteadorLeitura(LEITURA_MODO) if LEITURA_MODO != "primario" else None
+
+if roteador is not None:
+    @ao_efetivar
+    def notifica_leitura(tabelas):
+        """ Registra os commits do processo, que a leitura separada pode ainda não enxergar. """
+        roteador.notifica_alteracao()
+
+
+def roteia_leitura(funcao):
+    """
+    Decorator das rotas de leitura que podem ser atendidas pelo banco de leitura: escolhe
+    a sessão da requisição antes de get_condicional e cache_leitura, para que o ETag seja
+    calculado com as versões do mesmo banco que fornece os dados.
+    """
+    @wraps(funcao)
+    def wrapper(*args, **kwargs):
+        if roteador is not None:
+            g.sessao_leitura, g.leitura_defasada = roteador.sessao()
+        return funcao(*args, **kwargs)
+    return wrapper
+
+
+def sessao_leitura():
+    """ Retorna a sessão escolhida para as leituras da requisição (o banco principal, se nenhuma foi escolhida). """
+    if has_request_context() and "sessao_leitura" in g:
+        return g.sessao_leitura
+    return Session()
+
+
+def leitura_defasada():
+    """ Indica se a requisição está lendo de uma cópia possivelmente atrasada (a resposta não deve ir ao cache). """
+    return has_request_context() and g.get("leitura_defasada", False)
+
+
+def registra_leitura(app):
+    """
+    Encerra, ao fim de cada requisição, a sessão do banco de leitura da thread. No modo
+    'memoria', inicia já a primeira cópia (até lá, as leituras vão ao banco principal).
+
+    :param app: A aplicação Flask.
+    """
+    if roteador is not None and roteador.copia is not None:
+        roteador.copia.inicia()
+
+    @app.teardown_appcontext
+    def remove_sessao_leitura(exception=None):
+        if roteador is not None:
+            roteador.SessaoLeitura.remove()
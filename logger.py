@@ -1,71 +1,273 @@
 from logging.config import dictConfig
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from datetime import datetime, timezone
+import atexit
+import json
 import logging
 import os
+import queue
+import threading
+import time
+import uuid
 
 
 log_path = "log/"
-# Verifica se o diretorio para armexanar os logs não existe
-if not os.path.exists(log_path):
-   # então cria o diretorio
-   os.makedirs(log_path)
-
-
-dictConfig({
-    "version": 1,
-    "disable_existing_loggers": True,
-    "formatters": {
-        "default": {
-            "format": "[%(asctime)s] %(levelname)-4s %(funcName)s() L%(lineno)-4d %(message)s",
-        },
-        "detailed": {
-            "format": "[%(asctime)s] %(levelname)-4s %(funcName)s() L%(lineno)-4d %(message)s - call_trace=%(pathname)s L%(lineno)-4d",
-        }
-    },
-    "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "default",
-            "stream": "ext://sys.stdout",
-        },
-        # "email": {
-        #     "class": "logging.handlers.SMTPHandler",
-        #     "formatter": "default",
-        #     "level": "ERROR",
-        #     "mailhost": ("smtp.example.com", 587),
-        #     "fromaddr": "devops@example.com",
-        #     "toaddrs": ["receiver@example.com", "receiver2@example.com"],
-        #     "subject": "Error Logs",
-        #     "credentials": ("username", "password"),
-        # },
-        "error_file": {
-            "class": "logging.handlers.RotatingFileHandler",
-            "formatter": "detailed",
-            "filename": "log/gunicorn.error.log",
-            "maxBytes": 10000,
-            "backupCount": 10,
-            "delay": "True",
-        },
-        "detailed_file": {
-            "class": "logging.handlers.RotatingFileHandler",
-            "formatter": "detailed",
-            "filename": "log/gunicorn.detailed.log",
-            "maxBytes": 10000,
-            "backupCount": 10,
-            "delay": "True",
-        }
-    },
-    "loggers": {
-        "gunicorn.error": {
-            "handlers": ["console", "error_file"],  #, email],
-            "level": "INFO",
-            "propagate": False,
+
+# Configuração do log, via variáveis de ambiente
+# LOG_MODO: 'fila' (padrão) grava em uma thread de fundo; 'sincrono' grava na thread da requisição
+LOG_MODO = os.environ.get("LOG_MODO", "fila")
+LOG_FORMATO = os.environ.get("LOG_FORMATO", "texto")  # 'texto' ou 'json' (uma linha JSON por registro)
+LOG_NIVEL = os.environ.get("LOG_NIVEL", "INFO")
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", 10 * 1024 * 1024))  # tamanho de cada arquivo antes da rotação
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", 10))
+LOG_ACESSO = os.environ.get("LOG_ACESSO", "0") == "1"  # registra uma linha por requisição, com a duração
+
+# Registros gravados pela thread de fundo antes de cada descarga (flush) dos arquivos
+TAMANHO_LOTE_LOG = 256
+
+
+class FormatadorJson(logging.Formatter):
+    """ Formata cada registro como uma linha JSON, com o id e a duração da requisição, se houver. """
+
+    def format(self, record):
+        registro = {
+            "momento": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "funcao": record.funcName,
+            "linha": record.lineno,
+            "mensagem": record.getMessage(),
         }
-    },
-    "root": {
-        "handlers": ["console", "detailed_file"],
-        "level": "INFO",
-    }
-})
+        for campo in ("id_requisicao", "duracao_ms"):
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                registro[campo] = valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            registro["excecao"] = record.exc_text
+        return json.dumps(registro, ensure_ascii=False)
+
+
+class ContextoRequisicao(logging.Filter):
+    """
+    Acrescenta aos registros emitidos durante uma requisição o id da requisição e o tempo
+    decorrido desde o seu início. Roda na thread que emite o registro, antes da fila.
+    """
+
+    def filter(self, record):
+        from flask import g, has_request_context
+
+        if has_request_context() and "id_requisicao" in g:
+            record.id_requisicao = g.id_requisicao
+            if getattr(record, "duracao_ms", None) is None:
+                record.duracao_ms = round((time.perf_counter() - g.inicio_requisicao) * 1000, 2)
+        return True
+
+
+class DescargaEmLote:
+    """
+    Mixin de handlers de stream que não descarregam (flush) a cada registro; a descarga
+    é feita por 'descarrega', chamada pelo ListenerEmLote ao fim de cada lote.
+    """
+
+    def flush(self):
+        pass
+
+    def descarrega(self):
+        super().flush()
+
+    def close(self):
+        self.descarrega()
+        super().close()
+
+
+class ConsoleEmLote(DescargaEmLote, logging.StreamHandler):
+    pass
+
+
+class ArquivoRotativoEmLote(DescargaEmLote, RotatingFileHandler):
+    pass
+
+
+class ListenerEmLote(QueueListener):
+    """
+    Consome a fila de registros em uma thread de fundo, gravando-os em lotes: aguarda
+    o primeiro registro, retira da fila os que já estiverem disponíveis (até
+    TAMANHO_LOTE_LOG) e descarrega os handlers uma única vez por lote.
+    """
+
+    def _monitor(self):
+        fila = self.queue
+        tem_task_done = hasattr(fila, "task_done")
+        while True:
+            lote = [fila.get()]
+            try:
+                while len(lote) < TAMANHO_LOTE_LOG:
+                    lote.append(fila.get_nowait())
+            except queue.Empty:
+                pass
+
+            encerrar = False
+            for registro in lote:
+                if registro is self._sentinel:
+                    encerrar = True
+                else:
+                    self.handle(registro)
+            for handler in self.handlers:
+                if isinstance(handler, DescargaEmLote):
+                    handler.descarrega()
+            if tem_task_done:
+                for _ in lote:
+                    fila.task_done()
+            if encerrar:
+                return
+
+
+def _enfileira(nome_logger: str):
+    """
+    Substitui os handlers do logger por um QueueHandler e inicia um ListenerEmLote
+    que grava, em uma thread de fundo, nos handlers originais.
+    """
+    alvo = logging.getLogger(nome_logger or None)
+    handlers = list(alvo.handlers)
+    fila = queue.SimpleQueue()
+    handler_fila = QueueHandler(fila)
+    # O contexto da requisição precisa ser lido na thread da requisição, antes da fila
+    handler_fila.addFilter(ContextoRequisicao())
+    for handler in handlers:
+        alvo.removeHandler(handler)
+    alvo.addHandler(handler_fila)
+
+    listener = ListenerEmLote(fila, *handlers, respect_handler_level=True)
+    listener.start()
+    # Grava os registros ainda na fila ao encerrar o processo
+    atexit.register(listener.stop)
+    return listener
 
 
 logger = logging.getLogger(__name__)
+
+_listeners = []
+_configurado = False
+_trava_configuracao = threading.Lock()
+
+
+def configura_log():
+    """
+    Configura os handlers do log (console e arquivos em log/), uma única vez por processo.
+    No modo fila, inicia também as threads de fundo que gravam os registros.
+
+    Chamada pela fábrica da aplicação (app.create_app); importar 'logger' apenas obtém o logger.
+    """
+    global _configurado
+    with _trava_configuracao:
+        if _configurado:
+            return
+        _configurado = True
+
+        # Verifica se o diretorio para armexanar os logs não existe
+        if not os.path.exists(log_path):
+           # então cria o diretorio
+           os.makedirs(log_path)
+
+        # No modo fila, os handlers de console e de arquivo só descarregam ao fim de cada lote
+        em_lote = LOG_MODO == "fila"
+
+        dictConfig({
+            "version": 1,
+            "disable_existing_loggers": True,
+            "formatters": {
+                "default": {
+                    "format": "[%(asctime)s] %(levelname)-4s %(funcName)s() L%(lineno)-4d %(message)s",
+                },
+                "detailed": {
+                    "format": "[%(asctime)s] %(levelname)-4s %(funcName)s() L%(lineno)-4d %(message)s - call_trace=%(pathname)s L%(lineno)-4d",
+                },
+                "json": {
+                    "()": FormatadorJson,
+                }
+            },
+            "handlers": {
+                "console": {
+                    "()": ConsoleEmLote if em_lote else logging.StreamHandler,
+                    "formatter": "json" if LOG_FORMATO == "json" else "default",
+                    "stream": "ext://sys.stdout",
+                },
+                # "email": {
+                #     "class": "logging.handlers.SMTPHandler",
+                #     "formatter": "default",
+                #     "level": "ERROR",
+                #     "mailhost": ("smtp.example.com", 587),
+                #     "fromaddr": "devops@example.com",
+                #     "toaddrs": ["receiver@example.com", "receiver2@example.com"],
+                #     "subject": "Error Logs",
+                #     "credentials": ("username", "password"),
+                # },
+                "error_file": {
+                    "()": ArquivoRotativoEmLote if em_lote else RotatingFileHandler,
+                    "formatter": "json" if LOG_FORMATO == "json" else "detailed",
+                    "filename": "log/gunicorn.error.log",
+                    "maxBytes": LOG_MAX_BYTES,
+                    "backupCount": LOG_BACKUP_COUNT,
+                    "delay": True,
+                },
+                "detailed_file": {
+                    "()": ArquivoRotativoEmLote if em_lote else RotatingFileHandler,
+                    "formatter": "json" if LOG_FORMATO == "json" else "detailed",
+                    "filename": "log/gunicorn.detailed.log",
+                    "maxBytes": LOG_MAX_BYTES,
+                    "backupCount": LOG_BACKUP_COUNT,
+                    "delay": True,
+                }
+            },
+            "loggers": {
+                "gunicorn.error": {
+                    "handlers": ["console", "error_file"],  #, email],
+                    "level": "INFO",
+                    "propagate": False,
+                }
+            },
+            "root": {
+                "handlers": ["console", "detailed_file"],
+                "level": LOG_NIVEL,
+            }
+        })
+
+        # disable_existing_loggers desabilita os loggers já criados, inclusive o desta aplicação,
+        # obtido na importação do módulo
+        logger.disabled = False
+
+        if em_lote:
+            _listeners.extend(_enfileira(nome) for nome in ("", "gunicorn.error"))
+        else:
+            for nome in ("", "gunicorn.error"):
+                for handler in logging.getLogger(nome or None).handlers:
+                    handler.addFilter(ContextoRequisicao())
+
+
+
+def registra_log_requisicao(app):
+    """
+    Atribui a cada requisição um id (o cabeçalho X-Request-ID recebido, ou um novo),
+    incluído nos registros de log emitidos durante ela e devolvido na resposta.
+    Com LOG_ACESSO=1, registra também uma linha por requisição com status e duração.
+
+    :param app: A aplicação Flask.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def inicia_requisicao():
+        g.inicio_requisicao = time.perf_counter()
+        g.id_requisicao = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+
+    @app.after_request
+    def finaliza_requisicao(response):
+        if "id_requisicao" in g:
+            response.headers["X-Request-ID"] = g.id_requisicao
+            if LOG_ACESSO:
+                duracao_ms = round((time.perf_counter() - g.inicio_requisicao) * 1000, 2)
+                logger.info("%s %s %s", request.method, request.full_path.rstrip("?"), response.status_code,
+                            extra={"duracao_ms": duracao_ms})
+        return response
@@ -0,0 +1,272 @@
+from collections import defaultdict
+from functools import lru_cache
+from flask import g, has_request_context, request
+from sqlalchemy import event
+import bisect
+import os
+import re
+import threading
+import time
+
+from model import engine
+from cache import cache, consultas_coalescidas
+from escrita import escritor
+from autocompletar import indice_prefixos
+from leitura import roteador
+from admissao import admissao
+from logger import logger
+
+# Configuração das métricas, via variáveis de ambiente
+# METRICAS_SQL_LENTO_MS: comandos SQL mais lentos que este tempo (ms) são registrados no log; 0 desliga
+METRICAS_SQL_LENTO_MS = float(os.environ.get("METRICAS_SQL_LENTO_MS", 0))
+METRICAS_TOP_SQL = int(os.environ.get("METRICAS_TOP_SQL", 10))  # comandos mais lentos expostos em /metrics
+
+# Limites (em segundos) dos buckets do histograma de latência das requisições
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Expressões usadas para agrupar comandos SQL que diferem apenas nos valores
+_LISTA_PARAMETROS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_LITERAL_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_LITERAL_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_ESPACOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normaliza_sql(comando: str):
+    """ Retorna o texto do comando SQL sem literais, com listas IN (?, ?, ...) reduzidas a (?). """
+    comando = _LITERAL_TEXTO.sub("?", comando)
+    comando = _LITERAL_NUMERO.sub("?", comando)
+    comando = _LISTA_PARAMETROS.sub("(?)", comando)
+    return _ESPACOS.sub(" ", comando).strip()
+
+
+class Metricas:
+    """
+    Métricas acumuladas do processo: requisições e latências por rota, comandos SQL
+    e tempo de banco por rota, e estatísticas por comando SQL normalizado.
+    """
+
+    def __init__(self, buckets=BUCKETS_LATENCIA):
+        self.buckets = buckets
+        self._trava = threading.Lock()
+        self.requisicoes = defaultdict(int)  # (método, rota, status) -> quantidade
+        self.histogramas = {}  # (método, rota) -> [contagem por bucket..., +Inf], soma
+        self.comandos = defaultdict(int)  # (método, rota) -> comandos SQL
+        self.tempo_banco = defaultdict(float)  # (método, rota) -> segundos no banco
+        self.sql = {}  # comando normalizado -> [execuções, segundos totais, segundos máximos]
+
+    def registra_requisicao(self, metodo: str, rota: str, status: int, duracao: float,
+                            comandos: int, tempo_banco: float):
+        with self._trava:
+            self.requisicoes[(metodo, rota, status)] += 1
+            contagens, soma = self.histogramas.get((metodo, rota), ([0] * (len(self.buckets) + 1), 0.0))
+            contagens[bisect.bisect_left(self.buckets, duracao)] += 1
+            self.histogramas[(metodo, rota)] = (contagens, soma + duracao)
+            self.comandos[(metodo, rota)] += comandos
+            self.tempo_banco[(metodo, rota)] += tempo_banco
+
+    def registra_sql(self, comando: str, duracao: float):
+        chave = normaliza_sql(comando)
+        with self._trava:
+            estatistica = self.sql.setdefault(chave, [0, 0.0, 0.0])
+            estatistica[0] += 1
+            estatistica[1] += duracao
+            estatistica[2] = max(estatistica[2], duracao)
+
+    def exporta(self, top_sql: int = METRICAS_TOP_SQL):
+        """ Retorna as métricas no formato texto do Prometheus (versão 0.0.4). """
+        with self._trava:
+            requisicoes = dict(self.requisicoes)
+            histogramas = {chave: (list(contagens), soma) for chave, (contagens, soma) in self.histogramas.items()}
+            comandos, tempo_banco = dict(self.comandos), dict(self.tempo_banco)
+            lentos = sorted(self.sql.items(), key=lambda item: item[1][2], reverse=True)[:top_sql]
+            lentos = [(chave, list(estatistica)) for chave, estatistica in lentos]
+
+        linhas = ["# HELP http_requisicoes_total Requisições atendidas, por rota e status.",
+                  "# TYPE http_requisicoes_total counter"]
+        for (metodo, rota, status), total in sorted(requisicoes.items()):
+            linhas.append(f"http_requisicoes_total{_rotulos(metodo=metodo, rota=rota, status=status)} {total}")
+
+        linhas += ["# HELP http_requisicao_duracao_segundos Latência das requisições, por rota.",
+                   "# TYPE http_requisicao_duracao_segundos histogram"]
+        for (metodo, rota), (contagens, soma) in sorted(histogramas.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.buckets + ("+Inf",), contagens):
+                acumulado += contagem
+                linhas.append(f"http_requisicao_duracao_segundos_bucket"
+                              f"{_rotulos(metodo=metodo, rota=rota, le=limite)} {acumulado}")
+            linhas.append(f"http_requisicao_duracao_segundos_sum{_rotulos(metodo=metodo, rota=rota)} {soma:.6f}")
+            linhas.append(f"http_requisicao_duracao_segundos_count{_rotulos(metodo=metodo, rota=rota)} {acumulado}")
+
+        linhas += ["# HELP db_comandos_total Comandos SQL executados durante as requisições, por rota.",
+                   "# TYPE db_comandos_total counter"]
+        for (metodo, rota), total in sorted(comandos.items()):
+            linhas.append(f"db_comandos_total{_rotulos(metodo=metodo, rota=rota)} {total}")
+
+        linhas += ["# HELP db_tempo_segundos_total Tempo gasto executando comandos SQL durante as requisições, por rota.",
+                   "# TYPE db_tempo_segundos_total counter"]
+        for (metodo, rota), total in sorted(tempo_banco.items()):
+            linhas.append(f"db_tempo_segundos_total{_rotulos(metodo=metodo, rota=rota)} {total:.6f}")
+
+        linhas += ["# HELP db_sql_execucoes_total Execuções dos comandos SQL mais lentos, por texto normalizado.",
+                   "# TYPE db_sql_execucoes_total counter",
+                   "# HELP db_sql_segundos_total Tempo total dos comandos SQL mais lentos, por texto normalizado.",
+                   "# TYPE db_sql_segundos_total counter",
+                   "# HELP db_sql_maximo_segundos Maior duração dos comandos SQL mais lentos, por texto normalizado.",
+                   "# TYPE db_sql_maximo_segundos gauge"]
+        for comando, (execucoes, total, maximo) in lentos:
+            rotulos = _rotulos(sql=comando)
+            linhas.append(f"db_sql_execucoes_total{rotulos} {execucoes}")
+            linhas.append(f"db_sql_segundos_total{rotulos} {total:.6f}")
+            linhas.append(f"db_sql_maximo_segundos{rotulos} {maximo:.6f}")
+
+        if cache is not None:
+            estatisticas = cache.estatisticas()
+            backend = estatisticas.pop("backend")
+            for nome, valor in estatisticas.items():
+                nome, tipo = ("cache_entradas", "gauge") if nome == "entradas" else (f"cache_{nome}_total", "counter")
+                linhas += [f"# TYPE {nome} {tipo}", f"{nome}{_rotulos(backend=backend)} {valor}"]
+
+        coalescencia = consultas_coalescidas.estatisticas()
+        linhas += ["# HELP consultas_executadas_total Consultas coalescíveis executadas no banco.",
+                   "# TYPE consultas_executadas_total counter",
+                   f"consultas_executadas_total {coalescencia['executadas']}",
+                   "# HELP consultas_coalescidas_total Consultas atendidas pelo resultado de uma consulta idêntica simultânea.",
+                   "# TYPE consultas_coalescidas_total counter",
+                   f"consultas_coalescidas_total {coalescencia['coalescidas']}"]
+
+        if escritor is not None:
+            escrita = escritor.estatisticas()
+            linhas += ["# HELP escrita_grupos_total Transações efetivadas pela escrita em grupo.",
+                       "# TYPE escrita_grupos_total counter",
+                       f"escrita_grupos_total {escrita['grupos']}",
+                       "# HELP escrita_operacoes_total Inclusões efetivadas pela escrita em grupo.",
+                       "# TYPE escrita_operacoes_total counter",
+                       f"escrita_operacoes_total {escrita['operacoes']}"]
+
+        if roteador is not None:
+            leitura = roteador.estatisticas()
+            linhas += ["# HELP leituras_total Leituras das rotas roteáveis, por banco que as atendeu.",
+                       "# TYPE leituras_total counter",
+                       f"leituras_total{_rotulos(banco='leitura', modo=roteador.modo)} {leitura['leituras_separadas']}",
+                       f"leituras_total{_rotulos(banco='primario', modo=roteador.modo)} {leitura['leituras_primario']}"]
+            if "atualizacoes" in leitura:
+                linhas += ["# HELP leitura_copia_atualizacoes_total Cópias do banco principal feitas para a leitura em memória.",
+                           "# TYPE leitura_copia_atualizacoes_total counter",
+                           f"leitura_copia_atualizacoes_total {leitura['atualizacoes']}",
+                           "# HELP leitura_copia_defasagem_segundos Há quanto tempo a cópia em memória está atrasada (0 se atualizada).",
+                           "# TYPE leitura_copia_defasagem_segundos gauge",
+                           f"leitura_copia_defasagem_segundos {leitura['defasagem']:.3f}"]
+
+        if admissao is not None:
+            limites = admissao.estatisticas()
+            linhas += ["# HELP admissao_concorrencia Vagas simultâneas de cada limite de admissão.",
+                       "# TYPE admissao_concorrencia gauge"]
+            linhas += [f"admissao_concorrencia{_rotulos(limite=nome)} {valores['concorrencia']}"
+                       for nome, valores in limites.items()]
+            linhas += ["# HELP admissao_em_execucao Requisições ocupando vagas de cada limite de admissão.",
+                       "# TYPE admissao_em_execucao gauge"]
+            linhas += [f"admissao_em_execucao{_rotulos(limite=nome)} {valores['em_execucao']}"
+                       for nome, valores in limites.items()]
+            linhas += ["# HELP admissao_fila Requisições aguardando vaga em cada limite de admissão.",
+                       "# TYPE admissao_fila gauge"]
+            linhas += [f"admissao_fila{_rotulos(limite=nome)} {valores['fila']}"
+                       for nome, valores in limites.items()]
+            linhas += ["# HELP admissao_rejeicoes_total Requisições respondidas com 503, por limite e motivo.",
+                       "# TYPE admissao_rejeicoes_total counter"]
+            linhas += [f"admissao_rejeicoes_total{_rotulos(limite=nome, motivo=motivo)} {total}"
+                       for nome, valores in limites.items() for motivo, total in valores["rejeicoes"].items()]
+            linhas += ["# HELP admissao_espera_segundos Espera por vaga das requisições admitidas, por limite.",
+                       "# TYPE admissao_espera_segundos summary"]
+            for nome, valores in limites.items():
+                linhas.append(f"admissao_espera_segundos_sum{_rotulos(limite=nome)} {valores['espera_total']:.6f}")
+                linhas.append(f"admissao_espera_segundos_count{_rotulos(limite=nome)} {valores['admitidas']}")
+            linhas += ["# HELP admissao_espera_maxima_segundos Maior espera por vaga de uma requisição admitida, por limite.",
+                       "# TYPE admissao_espera_maxima_segundos gauge"]
+            linhas += [f"admissao_espera_maxima_segundos{_rotulos(limite=nome)} {valores['espera_maxima']:.6f}"
+                       for nome, valores in limites.items()]
+
+        autocompletar = indice_prefixos.estatisticas()
+        linhas += ["# HELP autocompletar_entradas Nomes no índice em memória do autocompletar, por tipo.",
+                   "# TYPE autocompletar_entradas gauge"]
+        linhas += [f"autocompletar_entradas{_rotulos(tipo=tipo)} {valores['entradas']}"
+                   for tipo, valores in autocompletar.items()]
+        linhas += ["# HELP autocompletar_bytes Memória aproximada do índice do autocompletar, por tipo.",
+                   "# TYPE autocompletar_bytes gauge"]
+        linhas += [f"autocompletar_bytes{_rotulos(tipo=tipo)} {valores['bytes']}"
+                   for tipo, valores in autocompletar.items()]
+
+        return "\n".join(linhas) + "\n"
+
+
+def _rotulos(**rotulos):
+    # Escapa barra invertida, aspas e quebras de linha, como exige o formato do Prometheus
+    pares = []
+    for nome, valor in rotulos.items():
+        valor = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pares.append(f'{nome}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+
+metricas = Metricas()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _inicio_comando(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_comandos", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _fim_comando(conn, cursor, statement, parameters, context, executemany):
+    duracao = time.perf_counter() - conn.info["inicio_comandos"].pop()
+    metricas.registra_sql(statement, duracao)
+
+    if has_request_context() and "metricas_requisicao" in g:
+        g.metricas_requisicao["comandos"] += 1
+        g.metricas_requisicao["tempo_banco"] += duracao
+
+    if METRICAS_SQL_LENTO_MS and duracao * 1000 >= METRICAS_SQL_LENTO_MS:
+        logger.warning("SQL lento (%.1f ms): %s", duracao * 1000, normaliza_sql(statement))
+
+
+@event.listens_for(engine, "handle_error")
+def _erro_comando(contexto):
+    # Um comando que falha não dispara after_cursor_execute; descarta o início empilhado
+    # (sem cursor, o erro ocorreu antes da execução, ex.: ao montar os parâmetros)
+    if getattr(contexto, "cursor", None) is not None and contexto.connection is not None:
+        inicios = contexto.connection.info.get("inicio_comandos")
+        if inicios:
+            inicios.pop()
+
+
+if roteador is not None:
+    # Os comandos do banco de leitura entram nas mesmas métricas por rota
+    event.listen(roteador.engine, "before_cursor_execute", _inicio_comando)
+    event.listen(roteador.engine, "after_cursor_execute", _fim_comando)
+    event.listen(roteador.engine, "handle_error", _erro_comando)
+
+
+def registra_metricas(app):
+    """
+    Mede cada requisição da aplicação: latência, comandos SQL executados e tempo
+    gasto no banco, acumulados por rota em 'metricas'.
+
+    A rota é o padrão da URL (ex.: /autor/<int:id>/livros), para que a quantidade de
+    séries não cresça com os valores dos parâmetros. Em respostas em streaming, a
+    latência e os comandos contados vão até o início do envio do corpo.
+
+    :param app: A aplicação Flask.
+    """
+    @app.before_request
+    def inicia_medicao():
+        g.metricas_requisicao = {"inicio": time.perf_counter(), "comandos": 0, "tempo_banco": 0.0}
+
+    @app.after_request
+    def registra_medicao(response):
+        medicao = g.pop("metricas_requisicao", None)
+        if medicao is not None:
+            rota = request.url_rule.rule if request.url_rule is not None else "<desconhecida>"
+            metricas.registra_requisicao(request.method, rota, response.status_code,
+                                         time.perf_counter() - medicao["inicio"],
+                                         medicao["comandos"], medicao["tempo_banco"])
+        return response
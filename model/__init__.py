@@ -1,32 +1,161 @@
-from sqlalchemy_utils import database_exists, create_database
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool, StaticPool
+from sqlalchemy import create_engine, event, make_url
 import os
+import threading
 
 # importando os elementos definidos no modelo
 from model.base import Base
 from model.autor import Autor
 from model.editora import Editora
-from model.livro import Livro
+from model.livro import Livro, consulta_livros, remove_livro, remove_livros, preenche_ano_livros, CAMPOS_LIVRO
+from model.lote import insere_livros_lote, insere_nomeados_lote
+from model.busca import cria_indice_busca, busca_livros
+from model.versao import VersaoTabela, inicializa_versoes, consulta_versoes
+from model.alteracoes import registra_alteracoes, ao_efetivar
+from model.colunas import cria_colunas_faltantes
+from model.indices import cria_indices_faltantes
+from model.estatisticas import configura_contagem, consulta_contagens, AGRUPAMENTOS
+from model.livro_view import configura_livro_view, reconstroi_livro_view
 
 db_path = "database/"
-# Verifica se o diretorio não existe
-if not os.path.exists(db_path):
-   # então cria o diretorio
-   os.makedirs(db_path)
 
-# url de acesso ao banco (essa é uma url de acesso ao sqlite local)
-db_url = 'sqlite:///%s/db.sqlite3' % db_path
+# url de acesso ao banco (por padrão, uma url de acesso ao sqlite local)
+# pode ser substituída pela variável de ambiente DATABASE_URL (ex.: postgresql://...)
+db_url = os.environ.get("DATABASE_URL", 'sqlite:///%s/db.sqlite3' % db_path)
 
-# cria a engine de conexão com o banco
-engine = create_engine(db_url, echo=False)
+# Tamanho do pool de conexões e conexões extras permitidas além dele
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
 
-# Instancia um criador de seção com o banco
-Session = sessionmaker(bind=engine)
+# Ajustes do SQLite, aplicados via PRAGMA a cada nova conexão
+SQLITE_BUSY_TIMEOUT = int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000))  # ms esperando o lock de escrita
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))  # bytes mapeados em memória
+SQLITE_CACHE_SIZE = int(os.environ.get("SQLITE_CACHE_SIZE", -64000))  # negativo: tamanho em KiB
 
-# cria o banco se ele não existir 
-if not database_exists(engine.url):
-    create_database(engine.url) 
+# Mantém as contagens de livros por editora/autor/ano em uma tabela de resumo, atualizada a cada escrita
+ESTATISTICAS_MATERIALIZADAS = os.environ.get("ESTATISTICAS_MATERIALIZADAS", "0") == "1"
 
-# cria as tabelas do banco, caso não existam
-Base.metadata.create_all(engine)
+# Mantém os livros já no formato de LivroViewSchema na tabela 'livro_view', atualizada a cada escrita,
+# lida sem junções pelas listagens e pela busca de um livro
+LIVROS_MATERIALIZADOS = os.environ.get("LIVROS_MATERIALIZADOS", "0") == "1"
+
+# Prepara o banco ao iniciar a aplicação; com INICIALIZA_BANCO=0 isso fica a cargo de um
+# passo de migração executado antes dos workers (python -m model)
+INICIALIZA_BANCO = os.environ.get("INICIALIZA_BANCO", "1") == "1"
+
+
+def configura_sqlite(dbapi_connection, connection_record):
+    """
+    Aplica os PRAGMAs de desempenho a uma nova conexão SQLite.
+
+    WAL permite leitores concorrentes a um escritor; com WAL, synchronous=NORMAL
+    continua seguro contra corrupção e evita um fsync por commit.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.close()
+
+
+def cria_engine(url: str = db_url, pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW):
+    """
+    Cria a engine de conexão com o banco, com o pool adequado ao tipo de banco.
+
+    SQLite em arquivo usa um QueuePool compartilhado entre as threads do worker, com
+    os PRAGMAs de configura_sqlite; SQLite em memória usa uma única conexão (StaticPool),
+    pois cada conexão teria seu próprio banco. Os demais bancos usam um QueuePool
+    com verificação da conexão antes do uso.
+
+    :param url: A url de acesso ao banco.
+    :param pool_size: Quantidade de conexões mantidas no pool.
+    :param max_overflow: Conexões extras permitidas além do pool.
+    """
+    url = make_url(url)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(url, echo=False, pool_size=pool_size, max_overflow=max_overflow,
+                             pool_pre_ping=True)
+
+    if url.database in (None, "", ":memory:"):
+        engine = create_engine(url, echo=False, poolclass=StaticPool,
+                               connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(url, echo=False, poolclass=QueuePool,
+                               pool_size=pool_size, max_overflow=max_overflow,
+                               connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", configura_sqlite)
+    return engine
+
+
+# cria a engine de conexão com o banco (nenhuma conexão é aberta até o primeiro uso)
+engine = cria_engine()
+
+# Instancia um criador de sessão com o banco, com uma sessão por thread (por requisição);
+# a sessão é encerrada ao fim de cada requisição por sessao.registra_sessao
+Session = scoped_session(sessionmaker(bind=engine))
+
+# notifica, após cada commit, as tabelas alteradas (usado para invalidar caches)
+registra_alteracoes(Session.session_factory)
+
+# A tabela de resumo das estatísticas só é mantida no SQLite (ver configura_contagem)
+CONTAGEM_MATERIALIZADA = ESTATISTICAS_MATERIALIZADAS and engine.dialect.name == "sqlite"
+
+# O modelo de leitura dos livros também só é mantido no SQLite (ver configura_livro_view)
+LIVRO_VIEW_MATERIALIZADA = LIVROS_MATERIALIZADOS and engine.dialect.name == "sqlite"
+
+_banco_inicializado = False
+_trava_inicializacao = threading.Lock()
+
+
+def inicializa_banco():
+    """
+    Prepara o banco para uso, uma única vez por processo: cria o banco, as tabelas,
+    as colunas, os índices, o controle de versão, o índice de busca, a tabela de resumo das
+    estatísticas e o modelo de leitura dos livros que ainda não existam.
+
+    Chamada pela fábrica da aplicação (app.create_app), ou antes, como um passo de
+    migração separado (python -m model); importar 'model' não acessa o banco.
+    """
+    global _banco_inicializado
+    with _trava_inicializacao:
+        if _banco_inicializado:
+            return
+        # importado aqui por ser necessário apenas na inicialização (e lento de importar)
+        from sqlalchemy_utils import database_exists, create_database
+
+        # Verifica se o diretorio do sqlite local não existe
+        if db_url.startswith("sqlite:///%s" % db_path) and not os.path.exists(db_path):
+           # então cria o diretorio
+           os.makedirs(db_path)
+
+        # cria o banco se ele não existir
+        if not database_exists(engine.url):
+            create_database(engine.url)
+
+        # cria as tabelas do banco, caso não existam
+        Base.metadata.create_all(engine)
+
+        # cria as colunas declaradas nos modelos que ainda não existam em um banco já criado,
+        # e preenche o ano (inteiro) dos livros gravados antes da coluna existir
+        cria_colunas_faltantes(engine, Base.metadata)
+        preenche_ano_livros(engine)
+
+        # cria os índices declarados nos modelos que ainda não existam em um banco já criado
+        cria_indices_faltantes(engine, Base.metadata)
+
+        # cria o controle de versão das tabelas do catálogo, caso não exista
+        inicializa_versoes(engine)
+
+        # cria o índice de busca textual e seus triggers, caso não existam
+        cria_indice_busca(engine)
+
+        # cria ou remove a tabela de resumo das estatísticas, conforme a configuração
+        configura_contagem(engine, ESTATISTICAS_MATERIALIZADAS)
+
+        # cria ou remove o modelo de leitura dos livros, conforme a configuração
+        configura_livro_view(engine, LIVROS_MATERIALIZADOS)
+
+        _banco_inicializado = True
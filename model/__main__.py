@@ -0,0 +1,28 @@
+"""
+Passo de migração: prepara o banco (tabelas, índices, busca, estatísticas e modelo de
+leitura dos livros) sem iniciar a aplicação. Com INICIALIZA_BANCO=0, os workers não
+repetem este passo.
+
+Com --reconstroi-livro-view, recalcula também todas as linhas de 'livro_view' a partir
+das tabelas do modelo (requer LIVROS_MATERIALIZADOS=1).
+
+Uso: python -m model [--reconstroi-livro-view]
+"""
+import argparse
+
+from logger import configura_log
+from model import inicializa_banco, reconstroi_livro_view, engine, LIVRO_VIEW_MATERIALIZADA
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--reconstroi-livro-view", action="store_true",
+                    help="recalcula o modelo de leitura dos livros")
+args = parser.parse_args()
+
+configura_log()
+inicializa_banco()
+print(f"Banco preparado: {engine.url.render_as_string(hide_password=True)}")
+
+if args.reconstroi_livro_view:
+    if not LIVRO_VIEW_MATERIALIZADA:
+        parser.error("o modelo de leitura só é mantido com LIVROS_MATERIALIZADOS=1 (apenas SQLite)")
+    print(f"Modelo de leitura reconstruído: {reconstroi_livro_view(engine)} livros")
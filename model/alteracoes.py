@@ -0,0 +1,81 @@
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Mapper
+
+from model.autor import livro_autor
+from model.versao import VersaoTabela, incrementa_versoes
+
+# Funções notificadas após cada commit, com o conjunto de tabelas alteradas
+_ouvintes = []
+
+
+def ao_efetivar(funcao):
+    """
+    Registra uma função a ser chamada após cada commit que alterou tabelas do catálogo.
+    A função recebe o conjunto de nomes das tabelas alteradas. Pode ser usada como decorator.
+    """
+    _ouvintes.append(funcao)
+    return funcao
+
+
+def _tabelas_alteradas(session):
+    return session.info.setdefault("tabelas_alteradas", set())
+
+
+def registra_alteracoes(session_factory):
+    """
+    Acompanha as tabelas alteradas por cada sessão criada por 'session_factory',
+    incrementa suas versões (versao_tabela) na própria transação e, após o commit,
+    notifica as funções registradas com ao_efetivar.
+
+    São consideradas tanto as alterações feitas pelo flush de objetos ORM quanto os
+    INSERT/UPDATE/DELETE executados diretamente com session.execute (ex.: inserções
+    em lote). Um rollback descarta as alterações acumuladas sem notificar.
+
+    :param session_factory: O sessionmaker cujas sessões serão acompanhadas.
+    """
+    @event.listens_for(session_factory, "after_flush")
+    def _registra_flush(session, flush_context):
+        tabelas = _tabelas_alteradas(session)
+        # Objetos apenas "tocados" por uma coleção (ex.: o outro lado de um Many-to-Many)
+        # aparecem em session.dirty, mas não alteram a própria tabela
+        alterados = [objeto for objeto in session.dirty
+                     if session.is_modified(objeto, include_collections=False)]
+        for objeto in list(session.new) + list(session.deleted) + alterados:
+            tabelas.add(inspect(objeto).mapper.local_table.name)
+
+        # Alterações nas coleções Many-to-Many são gravadas na tabela associativa
+        for objeto in list(session.new) + list(session.dirty) + list(session.deleted):
+            estado = inspect(objeto)
+            for relacao in estado.mapper.relationships:
+                if relacao.secondary is livro_autor and \
+                        (objeto in session.deleted or estado.attrs[relacao.key].history.has_changes()):
+                    tabelas.add(livro_autor.name)
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _registra_execucao(orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            tabela = orm_execute_state.statement.table
+            if isinstance(tabela, Mapper):
+                tabela = tabela.local_table
+            if tabela.name != VersaoTabela.__tablename__:
+                _tabelas_alteradas(orm_execute_state.session).add(tabela.name)
+
+    @event.listens_for(session_factory, "before_commit")
+    def _versiona(session):
+        # O flush final acontece depois deste evento; antecipá-lo garante que todas as
+        # tabelas alteradas já sejam conhecidas antes de incrementar as versões
+        session.flush()
+        tabelas = session.info.get("tabelas_alteradas")
+        if tabelas:
+            incrementa_versoes(session, tabelas)
+
+    @event.listens_for(session_factory, "after_commit")
+    def _notifica(session):
+        tabelas = session.info.pop("tabelas_alteradas", None)
+        if tabelas:
+            for funcao in _ouvintes:
+                funcao(frozenset(tabelas))
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _descarta(session):
+        session.info.pop("tabelas_alteradas", None)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Table
+from sqlalchemy import Column, String, Integer, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from model import Base
 
@@ -10,7 +10,10 @@ livro_autor = Table(
     "livro_autor",  # Nome da tabela de associação
     Base.metadata,  # Referência ao metadata da base
     Column("id_livro", Integer, ForeignKey("livro.pk_livro"), primary_key=True),  # Chave estrangeira para o livro
-    Column("id_autor", Integer, ForeignKey("autor.pk_autor"), primary_key=True)  # Chave estrangeira para o autor
+    Column("id_autor", Integer, ForeignKey("autor.pk_autor"), primary_key=True),  # Chave estrangeira para o autor
+    # A chave primária (id_livro, id_autor) só atende buscas por livro; o índice reverso
+    # atende as buscas "livros do autor" (Autor.livros) sem percorrer a tabela
+    Index("ix_livro_autor_id_autor_id_livro", "id_autor", "id_livro")
 )
 
 class Autor(Base):
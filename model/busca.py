@@ -0,0 +1,175 @@
+import re
+
+from sqlalchemy import text, select, func, and_, or_
+
+from model.livro import Livro
+from model.autor import Autor
+from model.editora import Editora
+
+# Índice de busca textual (SQLite FTS5) sobre o título do livro, os nomes dos autores
+# e o nome da editora. O 'rowid' de cada entrada é o 'pk_livro' do livro indexado.
+# 'remove_diacritics 2' torna a busca insensível a acentos (ex.: "bras" encontra "Brás")
+# e 'prefix' mantém índices auxiliares para consultas por prefixo de 2 e 3 caracteres.
+DDL_INDICE_BUSCA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS livro_busca USING fts5(
+    titulo, autores, editora,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+# Expressões que recalculam as colunas indexadas de um livro a partir das tabelas do modelo
+_AUTORES_DO_LIVRO = """(SELECT group_concat(autor.nome, ' ') FROM livro_autor
+                        JOIN autor ON autor.pk_autor = livro_autor.id_autor
+                        WHERE livro_autor.id_livro = {id_livro})"""
+_EDITORA_DO_LIVRO = """(SELECT editora.nome FROM editora WHERE editora.pk_editora = {id_editora})"""
+
+# Triggers que mantêm o índice sincronizado a cada escrita, inclusive em inserções em lote
+DDL_TRIGGERS_BUSCA = [
+    f"""CREATE TRIGGER IF NOT EXISTS livro_busca_ai AFTER INSERT ON livro BEGIN
+        INSERT INTO livro_busca(rowid, titulo, autores, editora)
+        VALUES (new.pk_livro, new.titulo,
+                {_AUTORES_DO_LIVRO.format(id_livro="new.pk_livro")},
+                {_EDITORA_DO_LIVRO.format(id_editora="new.id_editora")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS livro_busca_au AFTER UPDATE OF titulo, id_editora ON livro BEGIN
+        UPDATE livro_busca SET titulo = new.titulo,
+                               editora = {_EDITORA_DO_LIVRO.format(id_editora="new.id_editora")}
+        WHERE rowid = new.pk_livro;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS livro_busca_ad AFTER DELETE ON livro BEGIN
+        DELETE FROM livro_busca WHERE rowid = old.pk_livro;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS livro_autor_busca_ai AFTER INSERT ON livro_autor BEGIN
+        UPDATE livro_busca SET autores = {_AUTORES_DO_LIVRO.format(id_livro="new.id_livro")}
+        WHERE rowid = new.id_livro;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS livro_autor_busca_ad AFTER DELETE ON livro_autor BEGIN
+        UPDATE livro_busca SET autores = {_AUTORES_DO_LIVRO.format(id_livro="old.id_livro")}
+        WHERE rowid = old.id_livro;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS autor_busca_au AFTER UPDATE OF nome ON autor BEGIN
+        UPDATE livro_busca SET autores = {_AUTORES_DO_LIVRO.format(id_livro="livro_busca.rowid")}
+        WHERE rowid IN (SELECT id_livro FROM livro_autor WHERE id_autor = new.pk_autor);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS editora_busca_au AFTER UPDATE OF nome ON editora BEGIN
+        UPDATE livro_busca SET editora = new.nome
+        WHERE rowid IN (SELECT pk_livro FROM livro WHERE id_editora = new.pk_editora);
+    END""",
+]
+
+# Preenche o índice com os livros já existentes (usado apenas quando o índice é criado)
+DML_CARGA_BUSCA = f"""
+INSERT INTO livro_busca(rowid, titulo, autores, editora)
+SELECT livro.pk_livro, livro.titulo,
+       {_AUTORES_DO_LIVRO.format(id_livro="livro.pk_livro")},
+       {_EDITORA_DO_LIVRO.format(id_editora="livro.id_editora")}
+FROM livro
+"""
+
+# Pesos de cada coluna no ranking BM25: título, autores, editora
+PESOS_BUSCA = (10.0, 5.0, 1.0)
+
+
+def cria_indice_busca(engine):
+    """
+    Cria o índice FTS5 e seus triggers, caso não existam, e faz a carga inicial
+    com os livros já cadastrados. Disponível apenas para SQLite (nos demais bancos,
+    busca_livros usa LIKE sobre as próprias tabelas).
+
+    :param engine: A engine de conexão com o banco.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        existe = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'livro_busca'"
+        )).first()
+        conn.execute(text(DDL_INDICE_BUSCA))
+        for ddl in DDL_TRIGGERS_BUSCA:
+            conn.execute(text(ddl))
+        if not existe:
+            conn.execute(text(DML_CARGA_BUSCA))
+
+
+def palavras_busca(termos: str):
+    """ Separa as palavras do texto digitado pelo usuário (sem pontuação nem operadores). """
+    return re.findall(r"\w+", termos)
+
+
+def expressao_busca(termos: str):
+    """
+    Converte o texto digitado pelo usuário em uma expressão FTS5 segura, em que
+    cada palavra é buscada por prefixo e todas precisam estar presentes.
+
+    :param termos: O texto da busca.
+    :return: A expressão MATCH, ou None se não houver nenhuma palavra.
+    """
+    palavras = palavras_busca(termos)
+    if not palavras:
+        return None
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
+
+
+def busca_livros(session, termos: str, limit: int, offset: int = 0):
+    """
+    Busca os ids dos livros que correspondem aos termos, do mais para o menos relevante.
+
+    :param session: A sessão de banco de dados.
+    :param termos: O texto da busca.
+    :param limit: Quantidade máxima de ids retornados.
+    :param offset: Quantidade de resultados a pular (paginação).
+    :return: Lista de ids de livros, ordenada por relevância.
+    """
+    if session.get_bind().dialect.name != "sqlite":
+        # Sem o índice FTS5 (ver cria_indice_busca)
+        return busca_livros_like(session, termos, limit, offset)
+
+    expressao = expressao_busca(termos)
+    if expressao is None:
+        return []
+
+    resultado = session.execute(text(
+        "SELECT rowid FROM livro_busca WHERE livro_busca MATCH :expressao "
+        "ORDER BY bm25(livro_busca, :peso_titulo, :peso_autores, :peso_editora), rowid "
+        "LIMIT :limit OFFSET :offset"
+    ), {
+        "expressao": expressao,
+        "peso_titulo": PESOS_BUSCA[0],
+        "peso_autores": PESOS_BUSCA[1],
+        "peso_editora": PESOS_BUSCA[2],
+        "limit": limit,
+        "offset": offset,
+    })
+    return [id for id, in resultado]
+
+
+def _contem_palavra(coluna, palavra: str):
+    # Alguma palavra da coluna começa com 'palavra', sem diferença de maiúsculas
+    coluna = func.lower(coluna)
+    return or_(coluna.startswith(palavra, autoescape=True), coluna.contains(f" {palavra}", autoescape=True))
+
+
+def busca_livros_like(session, termos: str, limit: int, offset: int = 0):
+    """
+    Busca equivalente a busca_livros para os bancos sem FTS5, com LIKE sobre o título e os
+    nomes dos autores e da editora: cada palavra é buscada por prefixo e todas precisam estar
+    presentes. Sem ranking (ordem por id) e sem ignorar acentos; percorre a tabela de livros.
+
+    :param session: A sessão de banco de dados.
+    :param termos: O texto da busca.
+    :param limit: Quantidade máxima de ids retornados.
+    :param offset: Quantidade de resultados a pular (paginação).
+    :return: Lista de ids de livros, ordenada por id.
+    """
+    palavras = [palavra.lower() for palavra in palavras_busca(termos)]
+    if not palavras:
+        return []
+
+    condicoes = [or_(_contem_palavra(Livro.titulo, palavra),
+                     Livro.autores.any(_contem_palavra(Autor.nome, palavra)),
+                     Livro.editora.has(_contem_palavra(Editora.nome, palavra)))
+                 for palavra in palavras]
+    consulta = select(Livro.id).where(and_(*condicoes)).order_by(Livro.id).limit(limit).offset(offset)
+    return list(session.scalars(consulta))
@@ -0,0 +1,34 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from logger import logger
+
+
+def cria_colunas_faltantes(engine, metadata):
+    """
+    Compara as colunas declaradas nos modelos com as existentes no banco e cria as que faltam.
+
+    Assim como os índices (ver cria_indices_faltantes), Base.metadata.create_all só cria
+    as colunas junto com a tabela. As colunas criadas aqui ficam vazias (NULL) nos registros
+    existentes; o preenchimento, quando necessário, fica a cargo de cada modelo.
+
+    :param engine: A engine de conexão com o banco.
+    :param metadata: O metadata com as tabelas e colunas declaradas.
+    :return: Lista com os nomes ('tabela.coluna') das colunas criadas.
+    """
+    inspector = inspect(engine)
+    criadas = []
+    with engine.begin() as conn:
+        for tabela in metadata.sorted_tables:
+            if not inspector.has_table(tabela.name):
+                continue
+            existentes = {coluna["name"] for coluna in inspector.get_columns(tabela.name)}
+            for coluna in tabela.columns:
+                if coluna.name not in existentes:
+                    definicao = CreateColumn(coluna).compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {tabela.name} ADD COLUMN {definicao}"))
+                    criadas.append(f"{tabela.name}.{coluna.name}")
+
+    if criadas:
+        logger.info("Colunas criadas no banco existente: %s", ", ".join(criadas))
+    return criadas
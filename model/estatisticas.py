@@ -0,0 +1,147 @@
+from sqlalchemy import func, select, text, null
+
+from model.autor import Autor, livro_autor
+from model.editora import Editora
+from model.livro import Livro
+
+# Agrupamentos disponíveis para as contagens de livros
+AGRUPAMENTOS = ("editora", "autor", "ano")
+
+# Tabela de resumo (materializada) com a quantidade de livros por grupo
+DDL_CONTAGEM = """
+CREATE TABLE IF NOT EXISTS contagem_livros (
+    agrupamento VARCHAR(10) NOT NULL,
+    chave INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (agrupamento, chave)
+)
+"""
+
+_ANO = "CAST(strftime('%Y', {data}) AS INTEGER)"
+
+
+def _ajusta(agrupamento: str, chave: str, delta: int):
+    # Soma 'delta' ao total do grupo, criando o grupo se necessário (upsert)
+    return f"""INSERT INTO contagem_livros(agrupamento, chave, total)
+        SELECT '{agrupamento}', {chave}, {delta} WHERE {chave} IS NOT NULL
+        ON CONFLICT(agrupamento, chave) DO UPDATE SET total = total + ({delta});"""
+
+
+# Triggers que atualizam a tabela de resumo de forma incremental, apenas nos grupos afetados
+DDL_TRIGGERS_CONTAGEM = {
+    "contagem_livros_ai": f"""CREATE TRIGGER IF NOT EXISTS contagem_livros_ai AFTER INSERT ON livro BEGIN
+        {_ajusta("editora", "new.id_editora", 1)}
+        {_ajusta("ano", _ANO.format(data="new.ano_publicacao"), 1)}
+    END""",
+    "contagem_livros_ad": f"""CREATE TRIGGER IF NOT EXISTS contagem_livros_ad AFTER DELETE ON livro BEGIN
+        {_ajusta("editora", "old.id_editora", -1)}
+        {_ajusta("ano", _ANO.format(data="old.ano_publicacao"), -1)}
+    END""",
+    "contagem_livros_au": f"""CREATE TRIGGER IF NOT EXISTS contagem_livros_au
+        AFTER UPDATE OF id_editora, ano_publicacao ON livro BEGIN
+        {_ajusta("editora", "old.id_editora", -1)}
+        {_ajusta("ano", _ANO.format(data="old.ano_publicacao"), -1)}
+        {_ajusta("editora", "new.id_editora", 1)}
+        {_ajusta("ano", _ANO.format(data="new.ano_publicacao"), 1)}
+    END""",
+    "contagem_livro_autor_ai": f"""CREATE TRIGGER IF NOT EXISTS contagem_livro_autor_ai AFTER INSERT ON livro_autor BEGIN
+        {_ajusta("autor", "new.id_autor", 1)}
+    END""",
+    "contagem_livro_autor_ad": f"""CREATE TRIGGER IF NOT EXISTS contagem_livro_autor_ad AFTER DELETE ON livro_autor BEGIN
+        {_ajusta("autor", "old.id_autor", -1)}
+    END""",
+}
+
+
+def _consulta_agregada(agrupamento: str):
+    """ Retorna o SELECT ... GROUP BY (chave, nome, total) de um agrupamento, ordenado pela chave. """
+    if agrupamento == "editora":
+        return select(Editora.id.label("chave"), Editora.nome.label("nome"), func.count(Livro.id).label("total")) \
+            .join(Livro, Livro.id_editora == Editora.id) \
+            .group_by(Editora.id, Editora.nome)
+    if agrupamento == "autor":
+        return select(Autor.id.label("chave"), Autor.nome.label("nome"),
+                      func.count(livro_autor.c.id_livro).label("total")) \
+            .join(livro_autor, livro_autor.c.id_autor == Autor.id) \
+            .group_by(Autor.id, Autor.nome)
+    # Agrupa pela coluna 'ano' (inteiro), lida em ordem pelo seu índice, sem extrair o ano de cada data
+    return select(Livro.ano.label("chave"), null().label("nome"), func.count(Livro.id).label("total")) \
+        .where(Livro.ano.isnot(None)) \
+        .group_by(Livro.ano)
+
+
+def configura_contagem(engine, materializada: bool):
+    """
+    Cria (e carrega, na primeira vez) ou remove a tabela de resumo 'contagem_livros'
+    e seus triggers. Disponível apenas para SQLite; nos demais bancos as contagens
+    são sempre calculadas com GROUP BY.
+
+    :param engine: A engine de conexão com o banco.
+    :param materializada: Se as contagens devem ser materializadas.
+    :return: True se as contagens estão materializadas, False caso contrário.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+
+    with engine.begin() as conn:
+        existe = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contagem_livros'"
+        )).first()
+
+        if not materializada:
+            # Sem a materialização, os triggers deixariam as escritas mais lentas à toa
+            for nome in DDL_TRIGGERS_CONTAGEM:
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {nome}"))
+            conn.execute(text("DROP TABLE IF EXISTS contagem_livros"))
+            return False
+
+        conn.execute(text(DDL_CONTAGEM))
+        for ddl in DDL_TRIGGERS_CONTAGEM.values():
+            conn.execute(text(ddl))
+        if not existe:
+            for agrupamento in AGRUPAMENTOS:
+                consulta = _consulta_agregada(agrupamento).subquery()
+                grupos = [{"agrupamento": agrupamento, "chave": chave, "total": total}
+                          for chave, _, total in conn.execute(select(consulta))]
+                # Um catálogo vazio não tem grupos a carregar (executemany exige ao menos um)
+                if grupos:
+                    conn.execute(text(
+                        "INSERT INTO contagem_livros(agrupamento, chave, total) VALUES (:agrupamento, :chave, :total)"
+                    ), grupos)
+    return True
+
+
+def consulta_contagens(session, agrupamento: str, limit: int, after: int = None, materializada: bool = False):
+    """
+    Conta os livros por editora, por autor ou por ano de publicação, paginando por
+    cursor sobre a chave do grupo (id da editora/autor ou o ano).
+
+    :param session: A sessão de banco de dados.
+    :param agrupamento: 'editora', 'autor' ou 'ano'.
+    :param limit: Quantidade máxima de grupos.
+    :param after: Cursor, chave do último grupo da página anterior (opcional).
+    :param materializada: Lê da tabela de resumo em vez de agregar os livros.
+    :return: Lista de tuplas (chave, nome, total); 'nome' é None no agrupamento por ano.
+    """
+    if materializada:
+        consulta = text(
+            "SELECT chave, total FROM contagem_livros "
+            "WHERE agrupamento = :agrupamento AND total > 0 "
+            + ("AND chave > :after " if after is not None else "")
+            + "ORDER BY chave LIMIT :limit"
+        )
+        grupos = session.execute(consulta, {"agrupamento": agrupamento, "limit": limit, "after": after}).all()
+        # Os nomes são buscados pela chave primária, apenas para os grupos da página
+        nomes = {}
+        if agrupamento != "ano" and grupos:
+            modelo = Editora if agrupamento == "editora" else Autor
+            nomes = dict(session.execute(
+                select(modelo.id, modelo.nome).where(modelo.id.in_([chave for chave, _ in grupos]))
+            ).all())
+        return [(chave, nomes.get(chave), total) for chave, total in grupos]
+
+    consulta = _consulta_agregada(agrupamento).subquery()
+    query = select(consulta)
+    if after is not None:
+        query = query.where(consulta.c.chave > after)
+    return [tuple(grupo) for grupo in session.execute(query.order_by(consulta.c.chave).limit(limit))]
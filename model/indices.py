@@ -0,0 +1,30 @@
+from sqlalchemy import inspect
+
+from logger import logger
+
+
+def cria_indices_faltantes(engine, metadata):
+    """
+    Compara os índices declarados nos modelos com os existentes no banco e cria os que faltam.
+
+    Base.metadata.create_all só cria os índices junto com a tabela; em um banco já
+    existente, índices declarados depois nunca seriam criados sem esta verificação.
+
+    :param engine: A engine de conexão com o banco.
+    :param metadata: O metadata com as tabelas e índices declarados.
+    :return: Lista com os nomes dos índices criados.
+    """
+    inspector = inspect(engine)
+    criados = []
+    for tabela in metadata.sorted_tables:
+        if not inspector.has_table(tabela.name):
+            continue
+        existentes = {indice["name"] for indice in inspector.get_indexes(tabela.name)}
+        for indice in tabela.indexes:
+            if indice.name not in existentes:
+                indice.create(engine)
+                criados.append(indice.name)
+
+    if criados:
+        logger.info("Índices criados no banco existente: %s", ", ".join(criados))
+    return criados
@@ -1,15 +1,32 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, null, extract, select, update, or_, delete
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 from typing import Union
 
 from model import Base
-from model.autor import livro_autor  # Associações entre livros e autores
+from model.autor import Autor, livro_autor  # Associações entre livros e autores
 from model.editora import Editora  # Importa o modelo da editora
+from model.livro_view import consulta_livros_view  # Modelo de leitura desnormalizado (opcional)
+
+def _ano_da_publicacao(contexto):
+    # Valor padrão de 'ano' nas inserções pelo Core (lotes e escrita em grupo), calculado por registro
+    data = contexto.get_current_parameters().get("ano_publicacao")
+    return (data or datetime.now()).year
+
 
 class Livro(Base):
     __tablename__ = 'livro'  # Nome da tabela no banco de dados
 
+    # Índices secundários: livros por editora (Editora.livros) e buscas por intervalo de publicação.
+    # Os filtros da listagem por ano usam 'ano' (inteiro); a editora com intervalo de anos usa o
+    # índice composto, e a editora sozinha o índice simples, já na ordem da paginação (id)
+    __table_args__ = (
+        Index("ix_livro_id_editora", "id_editora"),
+        Index("ix_livro_ano_publicacao", "ano_publicacao"),
+        Index("ix_livro_ano", "ano"),
+        Index("ix_livro_id_editora_ano", "id_editora", "ano"),
+    )
+
     # Definição da chave primária 'id' para a tabela 'livro'
     id = Column("pk_livro", Integer, primary_key=True)
 
@@ -20,14 +37,21 @@ class Livro(Base):
     # Caso não seja fornecida, é atribuído o valor da data/hora atual
     ano_publicacao = Column(DateTime, default=datetime.now)
 
+    # Ano de publicação (inteiro), mantido a cada escrita a partir de 'ano_publicacao',
+    # para filtrar e projetar o ano sem extraí-lo da data linha a linha
+    ano = Column(Integer, default=_ano_da_publicacao)
+
     # Relacionamento Many-to-Many com a tabela 'Autor' via tabela associativa 'livro_autor'
     # 'back_populates' define o nome do campo correspondente na tabela 'Autor'
-    autores = relationship("Autor", secondary=livro_autor, back_populates="livros")
+    # 'selectin' carrega os autores de todos os livros da consulta em um único SELECT ... IN
+    autores = relationship("Autor", secondary=livro_autor, back_populates="livros",
+                           lazy="selectin", order_by="Autor.id")
 
     # Relacionamento Many-to-One com a tabela 'Editora', usando a chave estrangeira 'id_editora'
     # 'back_populates' define o nome do campo correspondente na tabela 'Editora'
+    # 'joined' traz a editora no mesmo SELECT do livro (LEFT OUTER JOIN)
     id_editora = Column(Integer, ForeignKey("editora.pk_editora"))
-    editora = relationship("Editora", back_populates="livros")
+    editora = relationship("Editora", back_populates="livros", lazy="joined")
 
     def __init__(self, titulo: str, ano_publicacao: Union[DateTime, None] = None, editora: Editora = None, autores=None):
         """
@@ -42,3 +66,168 @@ class Livro(Base):
         self.ano_publicacao = ano_publicacao if ano_publicacao else datetime.now()  # Usa a data atual se não for fornecida
         self.editora = editora
         self.autores = autores if autores is not None else []  # Define uma lista vazia se 'autores' não for fornecido
+
+    @validates("ano_publicacao")
+    def _atualiza_ano(self, chave, ano_publicacao):
+        # Mantém 'ano' sincronizado nas escritas pelo ORM
+        self.ano = ano_publicacao.year if ano_publicacao is not None else None
+        return ano_publicacao
+
+
+# Campos de um livro que podem ser projetados nas listagens (mesma ordem de LivroViewSchema)
+CAMPOS_LIVRO = ("id", "titulo", "ano_publicacao", "editora", "autores")
+
+
+def consulta_livros(session, limit: int = None, after: int = None, campos=CAMPOS_LIVRO, ids=None,
+                    id_editora: int = None, id_autor: int = None, titulos=None,
+                    ano_de: int = None, ano_ate: int = None, materializada: bool = False):
+    """
+    Busca os livros como tuplas, sem hidratar objetos ORM nem o identity map da sessão.
+
+    A paginação é feita por cursor (keyset) sobre a chave primária: apenas livros com
+    id maior que 'after', em ordem crescente de id, no máximo 'limit' livros.
+    São executados no máximo dois SELECTs, independente do tamanho do catálogo:
+    um para os livros (com o nome da editora via LEFT OUTER JOIN, se solicitada) e
+    outro para os nomes dos autores via 'livro_autor', se solicitados.
+
+    :param session: A sessão de banco de dados.
+    :param limit: Quantidade máxima de livros (opcional, sem limite se não fornecido).
+    :param after: Cursor, id do último livro da página anterior (opcional).
+    :param campos: Campos solicitados; os demais são retornados como None.
+    :param ids: Restringe a busca aos livros com esses ids (opcional).
+    :param titulos: Restringe a busca aos livros com esses títulos (opcional); junto com 'ids',
+                    busca os livros com algum dos ids ou algum dos títulos, no mesmo SELECT.
+    :param id_editora: Restringe a busca aos livros da editora (opcional).
+    :param id_autor: Restringe a busca aos livros do autor (opcional).
+    :param ano_de: Restringe a busca aos livros publicados a partir desse ano (opcional).
+    :param ano_ate: Restringe a busca aos livros publicados até esse ano, inclusive (opcional).
+    :param materializada: Lê do modelo de leitura 'livro_view', com um único SELECT sem junções.
+    :return: Lista de tuplas (id, titulo, ano, editora, autores), em que 'ano' é o ano
+             de publicação (inteiro).
+    """
+    if materializada:
+        return consulta_livros_view(session, limit=limit, after=after, ids=ids,
+                                    id_editora=id_editora, id_autor=id_autor, titulos=titulos,
+                                    ano_de=ano_de, ano_ate=ano_ate)
+
+    # Campos não solicitados são substituídos por NULL, sem custo de leitura
+    query = session.query(Livro.id,
+                          Livro.titulo if "titulo" in campos else null(),
+                          Livro.ano if "ano_publicacao" in campos else null(),
+                          Editora.nome if "editora" in campos else null())
+    if "editora" in campos:
+        query = query.outerjoin(Editora, Livro.id_editora == Editora.id)
+    if after is not None:
+        query = query.filter(Livro.id > after)
+    chaves = []
+    if ids is not None:
+        chaves.append(Livro.id.in_(ids))
+    if titulos is not None:
+        chaves.append(Livro.titulo.in_(titulos))
+    if chaves:
+        query = query.filter(or_(*chaves))
+    if id_editora is not None:
+        query = query.filter(Livro.id_editora == id_editora)
+    if id_autor is not None:
+        query = query.filter(Livro.id.in_(select(livro_autor.c.id_livro).where(livro_autor.c.id_autor == id_autor)))
+    if ano_de is not None:
+        query = query.filter(Livro.ano >= ano_de)
+    if ano_ate is not None:
+        query = query.filter(Livro.ano <= ano_ate)
+    query = query.order_by(Livro.id)
+    if limit is not None:
+        query = query.limit(limit)
+    livros = query.all()
+
+    # Agrupa os nomes dos autores por livro
+    autores_por_livro = {}
+    if "autores" in campos and livros:
+        autores = session.query(livro_autor.c.id_livro, Autor.nome) \
+                         .join(Autor, livro_autor.c.id_autor == Autor.id) \
+                         .order_by(Autor.id)
+        # Sem paginação nem filtros, todos os livros foram lidos e o IN é desnecessário
+        catalogo_completo = limit is None and after is None and ids is None and titulos is None \
+                            and id_editora is None and id_autor is None and ano_de is None and ano_ate is None
+        if not catalogo_completo:
+            autores = autores.filter(livro_autor.c.id_livro.in_([livro[0] for livro in livros]))
+        for id_livro, nome in autores:
+            autores_por_livro.setdefault(id_livro, []).append(nome)
+
+    return [(id, titulo, ano, editora, autores_por_livro.get(id, []))
+            for id, titulo, ano, editora in livros]
+
+
+def remove_livros(session, ids=None, titulos=None, id_editora: int = None,
+                  ano_de: int = None, ano_ate: int = None):
+    """
+    Remove os livros que atendem a todos os filtros informados, e suas associações com
+    autores, com dois DELETEs em conjunto (livro_autor e livro), sem carregar objetos ORM.
+    A efetivação (commit) fica a cargo de quem chama, então as duas remoções ficam na
+    mesma transação.
+
+    :param session: A sessão de banco de dados.
+    :param ids: Remove apenas os livros com esses ids (opcional).
+    :param titulos: Remove apenas os livros com esses títulos (opcional).
+    :param id_editora: Remove apenas os livros da editora (opcional).
+    :param ano_de: Remove apenas os livros publicados a partir desse ano (opcional).
+    :param ano_ate: Remove apenas os livros publicados até esse ano, inclusive (opcional).
+    :return: Tupla (ids dos livros removidos, quantidade de associações com autores removidas).
+    """
+    condicoes = []
+    if ids is not None:
+        condicoes.append(Livro.id.in_(ids))
+    if titulos is not None:
+        condicoes.append(Livro.titulo.in_(titulos))
+    if id_editora is not None:
+        condicoes.append(Livro.id_editora == id_editora)
+    # Mesmo critério de ano da listagem (consulta_livros): a coluna inteira 'ano', indexada
+    if ano_de is not None:
+        condicoes.append(Livro.ano >= ano_de)
+    if ano_ate is not None:
+        condicoes.append(Livro.ano <= ano_ate)
+    if not condicoes:
+        raise ValueError("Informe ao menos um filtro para remover livros.")
+
+    # As associações são removidas antes dos livros que referenciam
+    associacoes = session.execute(
+        delete(livro_autor).where(livro_autor.c.id_livro.in_(select(Livro.id).where(*condicoes)))
+    ).rowcount
+    remocao = delete(Livro.__table__).where(*condicoes)
+    if session.get_bind().dialect.delete_returning:
+        ids_removidos = session.execute(remocao.returning(Livro.id)).scalars().all()
+    else:
+        # Sem DELETE ... RETURNING, os ids são lidos antes, na mesma transação
+        ids_removidos = session.execute(select(Livro.id).where(*condicoes)).scalars().all()
+        session.execute(remocao)
+    return ids_removidos, associacoes
+
+
+def remove_livro(session, titulo: str):
+    """
+    Remove o livro com o título informado e suas associações com autores,
+    pelo mesmo caminho em conjunto de remove_livros.
+    A efetivação (commit) fica a cargo de quem chama.
+
+    :param session: A sessão de banco de dados.
+    :param titulo: O título do livro.
+    :return: O id do livro removido, ou None se não foi encontrado.
+    """
+    ids_removidos, _ = remove_livros(session, titulos=[titulo])
+    return ids_removidos[0] if ids_removidos else None
+
+
+def preenche_ano_livros(engine):
+    """
+    Preenche a coluna 'ano' dos livros gravados antes de sua criação (ou por fora do
+    SQLAlchemy), a partir de 'ano_publicacao'. Os livros sem ano são localizados pelo
+    índice de 'ano', então a verificação é barata quando não há o que preencher.
+
+    :param engine: A engine de conexão com o banco.
+    :return: Quantidade de livros preenchidos.
+    """
+    with engine.begin() as conn:
+        return conn.execute(
+            update(Livro.__table__)
+            .where(Livro.ano.is_(None), Livro.ano_publicacao.is_not(None))
+            .values(ano=extract("year", Livro.ano_publicacao))
+        ).rowcount
@@ -0,0 +1,178 @@
+import json
+
+from sqlalchemy import text, bindparam
+
+# Modelo de leitura desnormalizado: uma linha por livro com os dados de LivroViewSchema
+# já resolvidos (ano, nome da editora e lista JSON dos nomes dos autores),
+# lida sem junções pelas listagens e pela busca de um livro
+DDL_LIVRO_VIEW = """
+CREATE TABLE IF NOT EXISTS livro_view (
+    pk_livro INTEGER NOT NULL PRIMARY KEY,
+    titulo VARCHAR(200) NOT NULL,
+    ano INTEGER,
+    id_editora INTEGER,
+    editora VARCHAR(200),
+    autores TEXT NOT NULL DEFAULT '[]'
+)
+"""
+
+DDL_INDICES_LIVRO_VIEW = [
+    "CREATE INDEX IF NOT EXISTS ix_livro_view_titulo ON livro_view (titulo)",
+    "CREATE INDEX IF NOT EXISTS ix_livro_view_id_editora ON livro_view (id_editora, pk_livro)",
+    # Filtros da listagem por intervalo de anos, com ou sem a editora
+    "CREATE INDEX IF NOT EXISTS ix_livro_view_ano ON livro_view (ano)",
+    "CREATE INDEX IF NOT EXISTS ix_livro_view_id_editora_ano ON livro_view (id_editora, ano)",
+]
+
+# Expressões que recalculam as colunas de um livro a partir das tabelas do modelo;
+# os autores seguem a mesma ordem de consulta_livros (pelo id do autor). O ano é
+# copiado da coluna livro.ano, a mesma usada pelos filtros com junções
+_AUTORES_DO_LIVRO = """(SELECT json_group_array(nome) FROM (
+                           SELECT autor.nome FROM livro_autor
+                           JOIN autor ON autor.pk_autor = livro_autor.id_autor
+                           WHERE livro_autor.id_livro = {id_livro} ORDER BY autor.pk_autor))"""
+_EDITORA_DO_LIVRO = """(SELECT editora.nome FROM editora WHERE editora.pk_editora = {id_editora})"""
+
+# Triggers que mantêm o modelo de leitura sincronizado a cada escrita: inclusão e remoção
+# de livros (unitárias ou em lote), associações com autores e renomeação de autores e editoras
+DDL_TRIGGERS_LIVRO_VIEW = {
+    "livro_view_ai": f"""CREATE TRIGGER IF NOT EXISTS livro_view_ai AFTER INSERT ON livro BEGIN
+        INSERT OR REPLACE INTO livro_view(pk_livro, titulo, ano, id_editora, editora, autores)
+        VALUES (new.pk_livro, new.titulo, new.ano, new.id_editora,
+                {_EDITORA_DO_LIVRO.format(id_editora="new.id_editora")},
+                {_AUTORES_DO_LIVRO.format(id_livro="new.pk_livro")});
+    END""",
+    "livro_view_au": f"""CREATE TRIGGER IF NOT EXISTS livro_view_au
+        AFTER UPDATE OF titulo, ano, id_editora ON livro BEGIN
+        UPDATE livro_view SET titulo = new.titulo, ano = new.ano,
+                              id_editora = new.id_editora,
+                              editora = {_EDITORA_DO_LIVRO.format(id_editora="new.id_editora")}
+        WHERE pk_livro = new.pk_livro;
+    END""",
+    "livro_view_ad": """CREATE TRIGGER IF NOT EXISTS livro_view_ad AFTER DELETE ON livro BEGIN
+        DELETE FROM livro_view WHERE pk_livro = old.pk_livro;
+    END""",
+    "livro_autor_view_ai": f"""CREATE TRIGGER IF NOT EXISTS livro_autor_view_ai AFTER INSERT ON livro_autor BEGIN
+        UPDATE livro_view SET autores = {_AUTORES_DO_LIVRO.format(id_livro="new.id_livro")}
+        WHERE pk_livro = new.id_livro;
+    END""",
+    "livro_autor_view_ad": f"""CREATE TRIGGER IF NOT EXISTS livro_autor_view_ad AFTER DELETE ON livro_autor BEGIN
+        UPDATE livro_view SET autores = {_AUTORES_DO_LIVRO.format(id_livro="old.id_livro")}
+        WHERE pk_livro = old.id_livro;
+    END""",
+    "autor_view_au": f"""CREATE TRIGGER IF NOT EXISTS autor_view_au AFTER UPDATE OF nome ON autor BEGIN
+        UPDATE livro_view SET autores = {_AUTORES_DO_LIVRO.format(id_livro="livro_view.pk_livro")}
+        WHERE pk_livro IN (SELECT id_livro FROM livro_autor WHERE id_autor = new.pk_autor);
+    END""",
+    "editora_view_au": """CREATE TRIGGER IF NOT EXISTS editora_view_au AFTER UPDATE OF nome ON editora BEGIN
+        UPDATE livro_view SET editora = new.nome WHERE id_editora = new.pk_editora;
+    END""",
+}
+
+# Recalcula o modelo de leitura de todos os livros (carga inicial e reconstrução)
+DML_CARGA_LIVRO_VIEW = f"""
+INSERT INTO livro_view(pk_livro, titulo, ano, id_editora, editora, autores)
+SELECT livro.pk_livro, livro.titulo, livro.ano, livro.id_editora,
+       {_EDITORA_DO_LIVRO.format(id_editora="livro.id_editora")},
+       {_AUTORES_DO_LIVRO.format(id_livro="livro.pk_livro")}
+FROM livro
+"""
+
+
+def configura_livro_view(engine, materializada: bool):
+    """
+    Cria (e carrega, na primeira vez) ou remove a tabela 'livro_view' e seus triggers.
+    Disponível apenas para SQLite; nos demais bancos os livros são sempre lidos com junções.
+
+    :param engine: A engine de conexão com o banco.
+    :param materializada: Se o modelo de leitura deve ser mantido.
+    :return: True se o modelo de leitura está materializado, False caso contrário.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+
+    with engine.begin() as conn:
+        existe = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'livro_view'"
+        )).first()
+
+        if not materializada:
+            # Sem a materialização, os triggers deixariam as escritas mais lentas à toa
+            for nome in DDL_TRIGGERS_LIVRO_VIEW:
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {nome}"))
+            conn.execute(text("DROP TABLE IF EXISTS livro_view"))
+            return False
+
+        conn.execute(text(DDL_LIVRO_VIEW))
+        for ddl in DDL_INDICES_LIVRO_VIEW:
+            conn.execute(text(ddl))
+        # Recriados a cada inicialização, para que um banco existente receba a definição atual
+        for nome, ddl in DDL_TRIGGERS_LIVRO_VIEW.items():
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {nome}"))
+            conn.execute(text(ddl))
+        if not existe:
+            conn.execute(text(DML_CARGA_LIVRO_VIEW))
+    return True
+
+
+def reconstroi_livro_view(engine):
+    """
+    Reconstrói o modelo de leitura a partir das tabelas do modelo, em uma única transação
+    (ex.: após alterações feitas com os triggers desativados ou para conferir a carga).
+
+    :param engine: A engine de conexão com o banco.
+    :return: Quantidade de livros carregados.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM livro_view"))
+        return conn.execute(text(DML_CARGA_LIVRO_VIEW)).rowcount
+
+
+def consulta_livros_view(session, limit: int = None, after: int = None, ids=None,
+                         id_editora: int = None, id_autor: int = None, titulos=None,
+                         ano_de: int = None, ano_ate: int = None):
+    """
+    Busca os livros no modelo de leitura, com um único SELECT e sem junções, nas mesmas
+    condições e no mesmo formato de consulta_livros.
+
+    :return: Lista de tuplas (id, titulo, ano, editora, autores).
+    """
+    condicoes, parametros, expansiveis = [], {}, []
+    if after is not None:
+        condicoes.append("pk_livro > :after")
+        parametros["after"] = after
+    chaves = []
+    if ids is not None:
+        chaves.append("pk_livro IN :ids")
+        parametros["ids"] = list(ids)
+        expansiveis.append(bindparam("ids", expanding=True))
+    if titulos is not None:
+        chaves.append("titulo IN :titulos")
+        parametros["titulos"] = list(titulos)
+        expansiveis.append(bindparam("titulos", expanding=True))
+    if chaves:
+        condicoes.append("(" + " OR ".join(chaves) + ")")
+    if id_editora is not None:
+        condicoes.append("id_editora = :id_editora")
+        parametros["id_editora"] = id_editora
+    if id_autor is not None:
+        condicoes.append("pk_livro IN (SELECT id_livro FROM livro_autor WHERE id_autor = :id_autor)")
+        parametros["id_autor"] = id_autor
+    if ano_de is not None:
+        condicoes.append("ano >= :ano_de")
+        parametros["ano_de"] = ano_de
+    if ano_ate is not None:
+        condicoes.append("ano <= :ano_ate")
+        parametros["ano_ate"] = ano_ate
+
+    consulta = "SELECT pk_livro, titulo, ano, editora, autores FROM livro_view"
+    if condicoes:
+        consulta += " WHERE " + " AND ".join(condicoes)
+    consulta += " ORDER BY pk_livro"
+    if limit is not None:
+        consulta += " LIMIT :limit"
+        parametros["limit"] = limit
+
+    consulta = text(consulta).bindparams(*expansiveis)
+    return [(id, titulo, ano, editora, json.loads(autores))
+            for id, titulo, ano, editora, autores in session.execute(consulta, parametros)]
@@ -0,0 +1,96 @@
+from sqlalchemy import insert, select
+
+from model.autor import Autor, livro_autor
+from model.editora import Editora
+from model.livro import Livro
+
+# Situação de cada registro em uma inserção em lote
+CRIADO = "criado"
+DUPLICADO = "duplicado"
+REFERENCIA_INVALIDA = "referencia_invalida"
+
+
+def insere_nomeados_lote(session, modelo, nomes):
+    """
+    Insere em lote registros identificados apenas por um nome único (Autor ou Editora).
+
+    Os nomes já existentes são descobertos com um único SELECT ... IN e os novos
+    são inseridos com um único INSERT executemany, sem hidratar objetos ORM.
+    A efetivação (commit) fica a cargo de quem chama.
+
+    :param session: A sessão de banco de dados.
+    :param modelo: A classe do modelo (Autor ou Editora).
+    :param nomes: Lista de nomes, na ordem recebida.
+    :return: Lista de tuplas (situação, id), uma por nome, na mesma ordem.
+    """
+    existentes = set(session.scalars(select(modelo.nome).where(modelo.nome.in_(set(nomes)))))
+
+    resultados = []
+    novos = {}
+    for nome in nomes:
+        if nome in existentes or nome in novos:
+            resultados.append((DUPLICADO, None))
+        else:
+            novos[nome] = len(resultados)
+            resultados.append((CRIADO, None))
+
+    if novos:
+        ids = session.scalars(
+            insert(modelo).returning(modelo.id, sort_by_parameter_order=True),
+            [{"nome": nome} for nome in novos]
+        ).all()
+        for indice, id in zip(novos.values(), ids):
+            resultados[indice] = (CRIADO, id)
+
+    return resultados
+
+
+def insere_livros_lote(session, livros):
+    """
+    Insere livros em lote, com as associações em 'livro_autor'.
+
+    Títulos existentes, editoras e autores são resolvidos com um SELECT ... IN cada,
+    e as inserções em 'livro' e 'livro_autor' são feitas com um INSERT executemany cada.
+    A efetivação (commit) fica a cargo de quem chama.
+
+    :param session: A sessão de banco de dados.
+    :param livros: Lista de objetos com titulo, ano_publicacao, id_editora e ids_autores.
+    :return: Lista de tuplas (situação, id), uma por livro, na mesma ordem.
+    """
+    titulos = {livro.titulo for livro in livros}
+    ids_editoras = {livro.id_editora for livro in livros}
+    ids_autores = {id_autor for livro in livros for id_autor in livro.ids_autores}
+
+    existentes = set(session.scalars(select(Livro.titulo).where(Livro.titulo.in_(titulos))))
+    editoras = set(session.scalars(select(Editora.id).where(Editora.id.in_(ids_editoras))))
+    autores = set(session.scalars(select(Autor.id).where(Autor.id.in_(ids_autores))))
+
+    resultados = []
+    novos = {}
+    for livro in livros:
+        if livro.titulo in existentes or livro.titulo in novos:
+            resultados.append((DUPLICADO, None))
+        elif livro.id_editora not in editoras or not livro.ids_autores \
+                or not autores.issuperset(livro.ids_autores):
+            resultados.append((REFERENCIA_INVALIDA, None))
+        else:
+            novos[livro.titulo] = (len(resultados), livro)
+            resultados.append((CRIADO, None))
+
+    if novos:
+        ids = session.scalars(
+            insert(Livro).returning(Livro.id, sort_by_parameter_order=True),
+            [{"titulo": livro.titulo,
+              "ano_publicacao": livro.ano_publicacao,
+              "ano": livro.ano_publicacao.year,
+              "id_editora": livro.id_editora} for _, livro in novos.values()]
+        ).all()
+
+        associacoes = []
+        for (indice, livro), id in zip(novos.values(), ids):
+            resultados[indice] = (CRIADO, id)
+            associacoes.extend({"id_livro": id, "id_autor": id_autor}
+                               for id_autor in set(livro.ids_autores))
+        session.execute(insert(livro_autor), associacoes)
+
+    return resultados
@@ -0,0 +1,73 @@
+from sqlalchemy import Column, String, Integer, DateTime, select, update
+from datetime import datetime, timezone
+
+from model.base import Base
+
+# Tabelas do catálogo cujas versões são controladas
+TABELAS_VERSIONADAS = ("livro", "editora", "autor", "livro_autor")
+
+
+def _agora():
+    # Datas gravadas em UTC, sem fuso (o tipo DateTime do SQLite não guarda fuso)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class VersaoTabela(Base):
+    __tablename__ = 'versao_tabela'  # Nome da tabela no banco de dados
+
+    # Nome da tabela versionada
+    tabela = Column(String(50), primary_key=True)
+
+    # Versão da tabela, incrementada a cada commit que a altera (monotonicamente crescente)
+    versao = Column(Integer, nullable=False, default=0)
+
+    # Data/hora (UTC) do último commit que alterou a tabela
+    alterado_em = Column(DateTime, nullable=False, default=_agora)
+
+
+def inicializa_versoes(engine):
+    """
+    Cria o registro de versão de cada tabela versionada que ainda não tenha um.
+
+    :param engine: A engine de conexão com o banco.
+    """
+    with engine.begin() as conn:
+        existentes = set(conn.scalars(select(VersaoTabela.tabela)))
+        faltantes = [{"tabela": tabela, "versao": 0, "alterado_em": _agora()}
+                     for tabela in TABELAS_VERSIONADAS if tabela not in existentes]
+        if faltantes:
+            conn.execute(VersaoTabela.__table__.insert(), faltantes)
+
+
+def incrementa_versoes(session, tabelas):
+    """
+    Incrementa, na transação corrente, a versão das tabelas versionadas alteradas.
+
+    :param session: A sessão de banco de dados, antes do commit.
+    :param tabelas: Nomes das tabelas alteradas.
+    """
+    tabelas = [tabela for tabela in tabelas if tabela in TABELAS_VERSIONADAS]
+    if tabelas:
+        session.execute(
+            update(VersaoTabela.__table__)
+            .where(VersaoTabela.tabela.in_(tabelas))
+            .values(versao=VersaoTabela.versao + 1, alterado_em=_agora())
+        )
+
+
+def consulta_versoes(session, tabelas):
+    """
+    Busca as versões das tabelas com uma única consulta, sem carregar objetos ORM.
+
+    :param session: A sessão de banco de dados.
+    :param tabelas: Nomes das tabelas.
+    :return: Tupla (versões na ordem de 'tabelas', data/hora UTC da alteração mais recente).
+    """
+    linhas = {tabela: (versao, alterado_em) for tabela, versao, alterado_em in session.execute(
+        select(VersaoTabela.tabela, VersaoTabela.versao, VersaoTabela.alterado_em)
+        .where(VersaoTabela.tabela.in_(tabelas))
+    )}
+    versoes = [linhas.get(tabela, (0, None))[0] for tabela in tabelas]
+    datas = [alterado_em for _, alterado_em in linhas.values() if alterado_em is not None]
+    ultima = max(datas).replace(tzinfo=timezone.utc) if datas else None
+    return versoes, ultima
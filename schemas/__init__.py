@@ -1,10 +1,24 @@
 from schemas.autor import AutorSchema, AutorBuscaSchema, AutorViewSchema, \
                             ListagemAutoresSchema, AutorDelSchema, apresenta_autores, \
-                            apresenta_autor, apresenta_autores
+                            apresenta_autor, apresenta_autores, AutorLoteSchema, \
+                            apresenta_autores_json, AutorPathSchema
 from schemas.editora import EditoraSchema, EditoraBuscaSchema, EditoraViewSchema, \
                             ListagemEditorasSchema, EditoraDelSchema, apresenta_editoras, \
-                            apresenta_editora, apresenta_editoras
+                            apresenta_editora, apresenta_editoras, EditoraLoteSchema, \
+                            apresenta_editoras_json, EditoraPathSchema
 from schemas.livro import LivroSchema, LivroBuscaSchema, LivroViewSchema, \
                             ListagemLivrosSchema, LivroDelSchema, apresenta_livros, \
-                            apresenta_livro, apresenta_livros
+                            apresenta_livro, apresenta_livros, apresenta_livros_consulta, \
+                            LivroListagemSchema, LivroLoteSchema, LivroBuscaTextoSchema, \
+                            ListagemBuscaLivrosSchema, apresenta_livros_json, \
+                            LivroLookupSchema, LookupLivrosSchema, apresenta_lookup_livros, \
+                            LivroRemocaoSchema, RemocaoLivrosSchema, LivroFiltroSchema
+from schemas.paginacao import PaginacaoSchema, pagina
+from schemas.lote import ResultadoLoteSchema, ListagemResultadoLoteSchema, \
+                            apresenta_resultado_lote
+from schemas.estatisticas import EstatisticasBuscaSchema, GrupoViewSchema, \
+                            ListagemEstatisticasSchema, apresenta_estatisticas
+from schemas.autocompletar import AutocompletarBuscaSchema, SugestaoViewSchema, \
+                            ListagemSugestoesSchema, apresenta_sugestoes
+from schemas.serializacao import codifica_json, BIBLIOTECA_JSON
 from schemas.error import ErrorSchema
\ No newline at end of file
@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal
+from autocompletar import normaliza_nome
+
+
+class AutocompletarBuscaSchema(BaseModel):
+    """ Define os parâmetros do autocompletar: o prefixo digitado, o tipo de registro e a quantidade de sugestões. """
+    prefix: str = Field(..., min_length=1, description="Início do nome; a busca ignora acentos e maiúsculas")
+    tipo: Literal["livro", "autor", "editora"] = Field("livro", description="Tipo de registro sugerido")
+    limit: int = Field(10, ge=1, le=50, description="Quantidade máxima de sugestões")
+
+    @field_validator("prefix")
+    @classmethod
+    def valida_prefixo(cls, prefix: str):
+        # Um prefixo só de acentos (marcas combinantes) fica vazio ao ser normalizado e
+        # corresponderia a todo o índice
+        if not normaliza_nome(prefix):
+            raise ValueError("O prefixo precisa ter ao menos uma letra ou dígito além dos acentos.")
+        return prefix
+
+
+class SugestaoViewSchema(BaseModel):
+    """ Define como uma sugestão do autocompletar será retornada. """
+    id: int
+    nome: str
+
+
+class ListagemSugestoesSchema(BaseModel):
+    """ Define como as sugestões do autocompletar serão retornadas. """
+    tipo: str
+    sugestoes: List[SugestaoViewSchema]
+
+
+def apresenta_sugestoes(tipo: str, sugestoes: List[tuple]):
+    """ Retorna uma representação das sugestões seguindo o schema definido em ListagemSugestoesSchema,
+        a partir de tuplas (id, nome).
+    """
+    result = []
+    for id, nome in sugestoes:
+        result.append({
+            "id": id,
+            "nome": nome
+        })
+
+    return {"tipo": tipo, "sugestoes": result}
@@ -1,11 +1,21 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from model.autor import Autor
+from schemas.lote import TAMANHO_MAXIMO_LOTE
+from schemas.serializacao import codifica_json
 
 class AutorSchema(BaseModel):
     """ Define como um novo autor a ser inserido deve ser representado """
     nome: str
 
+class AutorLoteSchema(BaseModel):
+    """ Define como um lote de autores a ser inserido deve ser representado """
+    autores: List[AutorSchema] = Field(..., min_length=1, max_length=TAMANHO_MAXIMO_LOTE)
+
+class AutorPathSchema(BaseModel):
+    """ Define como o autor é identificado no caminho da URL, pelo id. """
+    id: int
+
 class AutorViewSchema(BaseModel):
     """ Define como um autor será retornado: autor. """
     id: int
@@ -23,8 +33,9 @@ class AutorBuscaSchema(BaseModel):
 class ListagemAutoresSchema(BaseModel):
     """ Define como uma listagem de autores será retornada. """
     autores: List[AutorViewSchema]
+    next_cursor: Optional[int] = None
 
-def apresenta_autores(autores: List[Autor]):
+def apresenta_autores(autores: List[Autor], next_cursor: Optional[int] = None):
     """ Retorna uma representação do autor seguindo o schema definido em AutorViewSchema. """
     result = []
     for autor in autores:
@@ -33,7 +44,14 @@ def apresenta_autores(autores: List[Autor]):
             "nome": autor.nome
         })
 
-    return {"autores": result}
+    return {"autores": result, "next_cursor": next_cursor}
+
+def apresenta_autores_json(autores: List[tuple], next_cursor: Optional[int] = None):
+    """ Retorna a listagem seguindo o schema definido em ListagemAutoresSchema, já serializada
+        em bytes JSON, a partir de tuplas (id, nome).
+    """
+    return codifica_json({"autores": [{"id": id, "nome": nome} for id, nome in autores],
+                          "next_cursor": next_cursor})
 
 def apresenta_autor(autor: Autor):
     """ Retorna uma representação do autor seguindo o schema definido em AutorViewSchema. """
@@ -1,11 +1,21 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from model.editora import Editora
+from schemas.lote import TAMANHO_MAXIMO_LOTE
+from schemas.serializacao import codifica_json
 
 class EditoraSchema(BaseModel):
     """ Define como uma nova editora a ser inserida deve ser representada """
     nome: str
 
+class EditoraLoteSchema(BaseModel):
+    """ Define como um lote de editoras a ser inserido deve ser representado """
+    editoras: List[EditoraSchema] = Field(..., min_length=1, max_length=TAMANHO_MAXIMO_LOTE)
+
+class EditoraPathSchema(BaseModel):
+    """ Define como a editora é identificada no caminho da URL, pelo id. """
+    id: int
+
 class EditoraViewSchema(BaseModel):
     """ Define como uma editora será retornada: editora. """
     id: int
@@ -23,8 +33,9 @@ class EditoraBuscaSchema(BaseModel):
 class ListagemEditorasSchema(BaseModel):
     """ Define como uma listagem de editoras será retornada. """
     editoras: List[EditoraViewSchema]
+    next_cursor: Optional[int] = None
 
-def apresenta_editoras(editoras: List[Editora]):
+def apresenta_editoras(editoras: List[Editora], next_cursor: Optional[int] = None):
     """ Retorna uma representação da editora seguindo o schema definido em EditoraViewSchema. """
     result = []
     for editora in editoras:
@@ -33,7 +44,14 @@ def apresenta_editoras(editoras: List[Editora]):
             "nome": editora.nome
         })
 
-    return {"editoras": result}
+    return {"editoras": result, "next_cursor": next_cursor}
+
+def apresenta_editoras_json(editoras: List[tuple], next_cursor: Optional[int] = None):
+    """ Retorna a listagem seguindo o schema definido em ListagemEditorasSchema, já serializada
+        em bytes JSON, a partir de tuplas (id, nome).
+    """
+    return codifica_json({"editoras": [{"id": id, "nome": nome} for id, nome in editoras],
+                          "next_cursor": next_cursor})
 
 def apresenta_editora(editora: Editora):
     """ Retorna uma representação da editora seguindo o schema definido em EditoraViewSchema. """
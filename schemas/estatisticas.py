@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Literal
+from schemas.paginacao import PaginacaoSchema
+
+
+class EstatisticasBuscaSchema(PaginacaoSchema):
+    """ Define os parâmetros das estatísticas: o agrupamento e a paginação por cursor sobre a chave do grupo. """
+    agrupamento: Literal["editora", "autor", "ano"] = Field("editora", description="Agrupamento das contagens")
+
+
+class GrupoViewSchema(BaseModel):
+    """ Define como a contagem de livros de um grupo será retornada. """
+    chave: int  # id da editora/autor ou o ano de publicação
+    nome: Optional[str] = None
+    total: int
+
+
+class ListagemEstatisticasSchema(BaseModel):
+    """ Define como as estatísticas de livros serão retornadas. """
+    agrupamento: str
+    grupos: List[GrupoViewSchema]
+    next_cursor: Optional[int] = None
+
+
+def apresenta_estatisticas(agrupamento: str, grupos: List[tuple], next_cursor: Optional[int] = None):
+    """ Retorna uma representação das estatísticas seguindo o schema definido em ListagemEstatisticasSchema,
+        a partir de tuplas (chave, nome, total).
+    """
+    result = []
+    for chave, nome, total in grupos:
+        result.append({
+            "chave": chave,
+            "nome": nome,
+            "total": total
+        })
+
+    return {"agrupamento": agrupamento, "grupos": result, "next_cursor": next_cursor}
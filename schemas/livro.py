@@ -1,7 +1,10 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Optional
 from datetime import datetime
-from model.livro import Livro
+from model.livro import Livro, CAMPOS_LIVRO
+from schemas.paginacao import PaginacaoSchema
+from schemas.lote import TAMANHO_MAXIMO_LOTE
+from schemas.serializacao import codifica_json
 
 
 class LivroSchema(BaseModel):
@@ -12,6 +15,11 @@ class LivroSchema(BaseModel):
     ids_autores: List[int]
 
 
+class LivroLoteSchema(BaseModel):
+    """ Define como um lote de livros a ser inserido deve ser representado """
+    livros: List[LivroSchema] = Field(..., min_length=1, max_length=TAMANHO_MAXIMO_LOTE)
+
+
 class LivroViewSchema(BaseModel):
     """ Define como um livro será retornado: livro. """
     id: int
@@ -28,14 +36,111 @@ class LivroDelSchema(BaseModel):
     ano_publicacao: datetime
 
 
+class LivroRemocaoSchema(BaseModel):
+    """ Define os filtros da remoção de livros em conjunto; os filtros informados são combinados (E). """
+    ids: Optional[List[int]] = Field(None, max_length=TAMANHO_MAXIMO_LOTE, description="Ids dos livros")
+    id_editora: Optional[int] = Field(None, description="Remove os livros da editora")
+    ano_de: Optional[int] = Field(None, ge=1, le=9999, description="Remove os livros publicados a partir deste ano")
+    ano_ate: Optional[int] = Field(None, ge=1, le=9999, description="Remove os livros publicados até este ano")
+
+    @model_validator(mode="after")
+    def valida_filtros(self):
+        if self.ids is None and self.id_editora is None and self.ano_de is None and self.ano_ate is None:
+            raise ValueError("Informe ao menos um filtro: ids, id_editora, ano_de ou ano_ate.")
+        return self
+
+
+class RemocaoLivrosSchema(BaseModel):
+    """ Define como o resultado de uma remoção de livros em conjunto será retornado. """
+    message: str
+    livros: int
+    associacoes: int
+
+
 class LivroBuscaSchema(BaseModel):
     """ Define como deve ser a estrutura que representa a busca, feita apenas com base no título do livro. """
     titulo: str
 
 
+class LivroListagemSchema(PaginacaoSchema):
+    """ Define os parâmetros da listagem de livros: paginação por cursor e projeção de campos. """
+    fields: Optional[str] = Field(None, description="Campos retornados, separados por vírgula (ex.: id,titulo)")
+
+    @field_validator("fields")
+    @classmethod
+    def valida_campos(cls, fields: Optional[str]):
+        if fields is None:
+            return None
+        campos = [campo.strip() for campo in fields.split(",") if campo.strip()]
+        invalidos = [campo for campo in campos if campo not in CAMPOS_LIVRO]
+        if invalidos:
+            raise ValueError(f"Campos inválidos: {', '.join(invalidos)}")
+        return ",".join(campos)
+
+    @property
+    def campos(self):
+        """ Retorna a tupla de campos solicitados, na ordem de LivroViewSchema. """
+        if not self.fields:
+            return CAMPOS_LIVRO
+        solicitados = set(self.fields.split(","))
+        return tuple(campo for campo in CAMPOS_LIVRO if campo in solicitados)
+
+
+class LivroFiltroSchema(LivroListagemSchema):
+    """ Define os parâmetros da listagem de livros com filtros; os filtros informados são combinados (E). """
+    ano_de: Optional[int] = Field(None, ge=1, le=9999, description="Apenas livros publicados a partir deste ano")
+    ano_ate: Optional[int] = Field(None, ge=1, le=9999, description="Apenas livros publicados até este ano")
+    id_editora: Optional[int] = Field(None, description="Apenas livros da editora")
+    id_autor: Optional[int] = Field(None, description="Apenas livros do autor")
+
+    @model_validator(mode="after")
+    def valida_intervalo(self):
+        if self.ano_de is not None and self.ano_ate is not None and self.ano_de > self.ano_ate:
+            raise ValueError("'ano_de' deve ser menor ou igual a 'ano_ate'.")
+        return self
+
+    @property
+    def filtros(self):
+        """ Retorna os filtros informados, como argumentos de consulta_livros. """
+        return self.model_dump(include={"ano_de", "ano_ate", "id_editora", "id_autor"}, exclude_none=True)
+
+
+class LivroBuscaTextoSchema(BaseModel):
+    """ Define os parâmetros da busca textual de livros por título, autores e editora. """
+    q: str = Field(..., min_length=1, description="Termos da busca; cada palavra é buscada por prefixo, sem acentos")
+    limit: int = Field(20, ge=1, le=100, description="Quantidade máxima de livros na página")
+    offset: int = Field(0, ge=0, description="Quantidade de resultados a pular")
+
+
+class ListagemBuscaLivrosSchema(BaseModel):
+    """ Define como o resultado de uma busca textual de livros será retornado, em ordem de relevância. """
+    livros: List[LivroViewSchema]
+    next_offset: Optional[int] = None
+
+
+class LivroLookupSchema(BaseModel):
+    """ Define como deve ser a estrutura que representa a busca de vários livros por título e/ou id. """
+    titulos: List[str] = Field([], max_length=TAMANHO_MAXIMO_LOTE)
+    ids: List[int] = Field([], max_length=TAMANHO_MAXIMO_LOTE)
+
+    @model_validator(mode="after")
+    def valida_chaves(self):
+        if not self.titulos and not self.ids:
+            raise ValueError("Informe ao menos um título ou id.")
+        return self
+
+
+class LookupLivrosSchema(BaseModel):
+    """ Define como o resultado da busca de vários livros será retornado, na ordem das chaves informadas. """
+    livros: List[LivroViewSchema]
+    ids_nao_encontrados: List[int]
+    titulos_nao_encontrados: List[str]
+
+
 class ListagemLivrosSchema(BaseModel):
     """ Define como uma listagem de livros será retornada. """
     livros: List[LivroViewSchema]
+    next_cursor: Optional[int] = None
 
 
 def apresenta_livros(livros: List[Livro]):
@@ -52,6 +157,45 @@ def apresenta_livros(livros: List[Livro]):
     return {"livros": result}
 
 
+def apresenta_livros_consulta(livros: List[tuple], campos=CAMPOS_LIVRO, next_cursor: Optional[int] = None):
+    """ Retorna uma representação dos livros, seguindo o schema definido em LivroViewSchema,
+        a partir das tuplas retornadas por consulta_livros, apenas com os campos solicitados.
+    """
+    if campos == CAMPOS_LIVRO:
+        result = [{"id": id, "titulo": titulo, "ano_publicacao": ano, "editora": editora, "autores": autores}
+                  for id, titulo, ano, editora, autores in livros]
+    else:
+        indices = [CAMPOS_LIVRO.index(campo) for campo in campos]
+        result = [{campo: livro[indice] for campo, indice in zip(campos, indices)} for livro in livros]
+    return {"livros": result, "next_cursor": next_cursor}
+
+
+def apresenta_livros_json(livros: List[tuple], campos=CAMPOS_LIVRO, next_cursor: Optional[int] = None):
+    """ Retorna a listagem de livros, seguindo o schema definido em ListagemLivrosSchema,
+        já serializada em bytes JSON, a partir das tuplas retornadas por consulta_livros.
+    """
+    return codifica_json(apresenta_livros_consulta(livros, campos, next_cursor))
+
+
+def apresenta_lookup_livros(livros: List[tuple], ids: List[int], titulos: List[str]):
+    """ Retorna o resultado da busca de vários livros, seguindo o schema definido em LookupLivrosSchema,
+        já serializado em bytes JSON, a partir das tuplas retornadas por consulta_livros.
+        Os livros seguem a ordem dos ids e depois a dos títulos informados, sem repetições.
+    """
+    por_id = {livro[0]: livro for livro in livros}
+    por_titulo = {livro[1]: livro for livro in livros}
+    encontrados, vistos = [], set()
+    for livro in [por_id.get(id) for id in ids] + [por_titulo.get(titulo) for titulo in titulos]:
+        if livro is not None and livro[0] not in vistos:
+            vistos.add(livro[0])
+            encontrados.append(livro)
+    return codifica_json({
+        "livros": apresenta_livros_consulta(encontrados)["livros"],
+        "ids_nao_encontrados": list(dict.fromkeys(id for id in ids if id not in por_id)),
+        "titulos_nao_encontrados": list(dict.fromkeys(titulo for titulo in titulos if titulo not in por_titulo)),
+    })
+
+
 def apresenta_livro(livro: Livro):
     """ Retorna uma representação do livro seguindo o schema definido em LivroViewSchema. """
     return {
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+# Quantidade máxima de registros por lote (mantém os SELECT ... IN abaixo do limite de parâmetros do SQLite)
+TAMANHO_MAXIMO_LOTE = 1000
+
+
+class ResultadoLoteSchema(BaseModel):
+    """ Define como o resultado de cada registro de uma inserção em lote será retornado. """
+    indice: int
+    status: str  # criado, duplicado ou referencia_invalida
+    id: Optional[int] = None
+
+
+class ListagemResultadoLoteSchema(BaseModel):
+    """ Define como o resultado de uma inserção em lote será retornado. """
+    criados: int
+    resultados: List[ResultadoLoteSchema]
+
+
+def apresenta_resultado_lote(resultados: List[tuple]):
+    """ Retorna uma representação do resultado de uma inserção em lote seguindo o schema
+        definido em ListagemResultadoLoteSchema, a partir das tuplas (situação, id).
+    """
+    result = []
+    criados = 0
+    for indice, (status, id) in enumerate(resultados):
+        if id is not None:
+            criados += 1
+        result.append({
+            "indice": indice,
+            "status": status,
+            "id": id
+        })
+
+    return {"criados": criados, "resultados": result}
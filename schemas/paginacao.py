@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class PaginacaoSchema(BaseModel):
+    """ Define os parâmetros de paginação por cursor (keyset) usados nas listagens.
+        O cursor é a chave primária do último registro da página anterior.
+    """
+    limit: int = Field(100, ge=1, le=1000, description="Quantidade máxima de registros na página")
+    after: Optional[int] = Field(None, ge=0, description="Cursor: retorna apenas registros com id maior que este valor")
+
+
+def pagina(registros: list, limit: int, chave=lambda registro: registro.id):
+    """ Recebe até limit + 1 registros ordenados pela chave primária e retorna a página
+        (no máximo limit registros) e o cursor da próxima página, ou None se for a última.
+    """
+    if len(registros) > limit:
+        registros = registros[:limit]
+        return registros, chave(registros[-1])
+    return registros, None
@@ -0,0 +1,34 @@
+import json
+
+# Codificadores JSON opcionais, em ordem de preferência: orjson, msgspec e, na falta
+# de ambos, o json da biblioteca padrão
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+if orjson is not None:
+    BIBLIOTECA_JSON = "orjson"
+
+    def codifica_json(dados) -> bytes:
+        """ Serializa 'dados' (dicts, listas, str, int, None) diretamente em bytes JSON UTF-8. """
+        return orjson.dumps(dados)
+elif msgspec is not None:
+    BIBLIOTECA_JSON = "msgspec"
+    _encoder = msgspec.json.Encoder()
+
+    def codifica_json(dados) -> bytes:
+        """ Serializa 'dados' (dicts, listas, str, int, None) diretamente em bytes JSON UTF-8. """
+        return _encoder.encode(dados)
+else:
+    BIBLIOTECA_JSON = "json"
+
+    def codifica_json(dados) -> bytes:
+        """ Serializa 'dados' (dicts, listas, str, int, None) diretamente em bytes JSON UTF-8. """
+        return json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
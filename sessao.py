@@ -0,0 +1,72 @@
+from flask import g, has_app_context
+from sqlalchemy import event
+import time
+
+from model import Session
+from logger import logger
+
+
+def _metricas():
+    """ Retorna o dicionário de métricas de sessão da requisição atual, ou None fora de uma requisição. """
+    if not has_app_context():
+        return None
+    if "metricas_sessao" not in g:
+        g.metricas_sessao = {"checkout": 0.0, "transacao": 0.0, "inicio": None, "begin": None}
+    return g.metricas_sessao
+
+
+@event.listens_for(Session.session_factory, "after_transaction_create")
+def _inicio_transacao(session, transaction):
+    # A transação raiz é criada imediatamente antes de a sessão pedir uma conexão ao pool
+    metricas = _metricas()
+    if metricas is not None and transaction.parent is None:
+        metricas["inicio"] = time.perf_counter()
+
+
+@event.listens_for(Session.session_factory, "after_begin")
+def _conexao_obtida(session, transaction, connection):
+    metricas = _metricas()
+    if metricas is not None and metricas["inicio"] is not None:
+        agora = time.perf_counter()
+        metricas["checkout"] += agora - metricas["inicio"]
+        metricas["inicio"] = None
+        metricas["begin"] = agora
+
+
+@event.listens_for(Session.session_factory, "after_transaction_end")
+def _fim_transacao(session, transaction):
+    metricas = _metricas()
+    if metricas is not None and transaction.parent is None and metricas["begin"] is not None:
+        metricas["transacao"] += time.perf_counter() - metricas["begin"]
+        metricas["begin"] = None
+
+
+def registra_sessao(app):
+    """
+    Associa o ciclo de vida da sessão de banco ao ciclo de vida da requisição.
+
+    Ao fim de cada requisição a sessão da thread é removida: qualquer transação
+    pendente é desfeita (rollback), os objetos são descartados e a conexão volta
+    ao pool. O tempo de obtenção da conexão e o tempo em que a transação ficou
+    aberta são registrados no log e no cabeçalho Server-Timing da resposta.
+
+    :param app: A aplicação Flask.
+    """
+    @app.after_request
+    def encerra_sessao(response):
+        # Respostas em streaming ainda usam a sessão; ela é removida no teardown
+        if not response.is_streamed:
+            Session.remove()
+
+        metricas = g.pop("metricas_sessao", None)
+        if metricas is not None:
+            checkout_ms = metricas["checkout"] * 1000
+            transacao_ms = metricas["transacao"] * 1000
+            response.headers.add("Server-Timing", f"db-checkout;dur={checkout_ms:.2f}")
+            response.headers.add("Server-Timing", f"db-transacao;dur={transacao_ms:.2f}")
+            logger.debug("Sessão: checkout %.2f ms, transação %.2f ms", checkout_ms, transacao_ms)
+        return response
+
+    @app.teardown_appcontext
+    def remove_sessao(exception=None):
+        Session.remove()
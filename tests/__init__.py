@@ -0,0 +1,46 @@
+"""
+Testes da API (executados com 'python -m pytest' ou 'nose2', a partir da raiz do projeto).
+
+A configuração da aplicação é lida das variáveis de ambiente na importação dos módulos,
+então o ambiente dos testes é preparado aqui, antes de qualquer teste importar 'app' ou
+'model': um diretório temporário como diretório de trabalho (onde são criados 'database/'
+e 'log/') e os modos padrão de cache, leitura, escrita e admissão.
+"""
+import logging
+import os
+import sys
+import tempfile
+
+# Diretório raiz do projeto, para importar 'app', 'model' e 'schemas'
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+os.environ.pop("DATABASE_URL", None)
+os.environ.update(CACHE_BACKEND="local", LEITURA_MODO="primario", ESCRITA_EM_GRUPO="0", ADMISSAO="0",
+                  LIVROS_MATERIALIZADOS="0", ESTATISTICAS_MATERIALIZADAS="0", INICIALIZA_BANCO="1",
+                  AUTOCOMPLETAR_RECARGA="0", LOG_MODO="sincrono")
+os.chdir(tempfile.mkdtemp(prefix="testes-"))
+logging.disable(logging.ERROR)
+
+
+def cria_cliente():
+    """ Retorna um cliente de teste da aplicação (criada uma única vez por processo, com o banco vazio). """
+    from app import app
+    return app.test_client()
+
+
+def limpa_catalogo():
+    """ Remove todos os livros, autores e editoras, efetivando a remoção (o que atualiza as versões do catálogo). """
+    from sqlalchemy import delete
+    from model import Session, Livro, Autor, Editora
+    from model.autor import livro_autor
+    from autocompletar import indice_prefixos
+
+    session = Session()
+    for tabela in (livro_autor, Livro.__table__, Autor.__table__, Editora.__table__):
+        session.execute(delete(tabela))
+    session.commit()
+    Session.remove()
+    indice_prefixos.carrega(Session())
+    Session.remove()
@@ -0,0 +1,29 @@
+import unittest
+
+from tests import cria_cliente, limpa_catalogo
+
+
+class AutocompletarTest(unittest.TestCase):
+    """ GET /autocomplete: busca por prefixo sem acentos e validação do prefixo. """
+
+    def setUp(self):
+        self.client = cria_cliente()
+        limpa_catalogo()
+        for nome in ("Érico Veríssimo", "Erasmo Carlos", "Cecília Meireles"):
+            self.client.post("/autor", data={"nome": nome})
+
+    def test_prefixo_sem_acentos(self):
+        response = self.client.get("/autocomplete?tipo=autor&prefix=er")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([sugestao["nome"] for sugestao in response.json["sugestoes"]],
+                         ["Erasmo Carlos", "Érico Veríssimo"])
+
+    def test_prefixo_vazio_apos_normalizacao(self):
+        # Acento agudo e til combinantes, sem letras: não pode virar um prefixo vazio
+        for prefixo in ("\u0301", "\u0301\u0303"):
+            response = self.client.get("/autocomplete", query_string={"tipo": "autor", "prefix": prefixo})
+            self.assertEqual(response.status_code, 422, prefixo)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from tests import cria_cliente, limpa_catalogo
+
+
+class BuscaLivrosTest(unittest.TestCase):
+    """ Busca textual: FTS5 no SQLite e LIKE (busca_livros_like) nos bancos sem FTS5. """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = cria_cliente()
+        limpa_catalogo()
+        editora = cls.client.post("/editora", data={"nome": "Editora Atlas"}).json["id"]
+        machado = cls.client.post("/autor", data={"nome": "Machado Assis"}).json["id"]
+        clarice = cls.client.post("/autor", data={"nome": "Clarice Lispector"}).json["id"]
+        cls.ids = {}
+        for titulo, autor in (("Dom Casmurro", machado), ("Memorias Postumas", machado),
+                              ("A Hora da Estrela", clarice), ("Casa Velha", machado)):
+            response = cls.client.post("/livro", data={"titulo": titulo, "ano_publicacao": "1900-01-01",
+                                                      "id_editora": editora, "ids_autores": [autor]})
+            cls.ids[titulo] = response.json["id"]
+
+    def busca(self, funcao, termos):
+        from model import Session
+
+        try:
+            return sorted(funcao(Session(), termos, limit=10))
+        finally:
+            Session.remove()
+
+    def test_like_por_prefixo_em_titulo_autor_e_editora(self):
+        from model.busca import busca_livros_like
+
+        self.assertEqual(self.busca(busca_livros_like, "cas"), sorted([self.ids["Dom Casmurro"], self.ids["Casa Velha"]]))
+        self.assertEqual(self.busca(busca_livros_like, "MACHADO casa"), [self.ids["Casa Velha"]])
+        self.assertEqual(self.busca(busca_livros_like, "atlas estrela"), [self.ids["A Hora da Estrela"]])
+        self.assertEqual(self.busca(busca_livros_like, "sma"), [])
+        self.assertEqual(self.busca(busca_livros_like, "%"), [])
+
+    def test_like_equivale_ao_fts(self):
+        from model.busca import busca_livros, busca_livros_like
+
+        for termos in ("cas", "machado", "lisp hora", "editora", "velha dom"):
+            self.assertEqual(self.busca(busca_livros_like, termos), self.busca(busca_livros, termos), termos)
+
+
+if __name__ == "__main__":
+    unittest.main()
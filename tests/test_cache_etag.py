@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from tests import RAIZ, cria_cliente, limpa_catalogo
+
+# Inclusão de um autor por outro processo (outro worker), sobre o mesmo banco: o commit
+# atualiza versao_tabela, mas não invalida o cache local deste processo
+INCLUSAO_EXTERNA = """
+from model import Session, Autor
+session = Session()
+session.add(Autor(nome="Autor de Outro Worker"))
+session.commit()
+"""
+
+
+class CacheEtagTest(unittest.TestCase):
+    """ O cache de respostas e o ETag usam as mesmas versões do banco, inclusive após escritas de outros processos. """
+
+    def setUp(self):
+        self.client = cria_cliente()
+        limpa_catalogo()
+        self.client.post("/autor", data={"nome": "Autor Local"})
+
+    def test_escrita_de_outro_processo(self):
+        primeira = self.client.get("/autores")
+        self.assertEqual(primeira.headers["X-Cache"], "MISS")
+        self.assertEqual(self.client.get("/autores").headers["X-Cache"], "HIT")
+
+        subprocess.run([sys.executable, "-c", INCLUSAO_EXTERNA], check=True, cwd=os.getcwd(),
+                       env=dict(os.environ, PYTHONPATH=RAIZ))
+
+        segunda = self.client.get("/autores")
+        self.assertNotEqual(segunda.headers["ETag"], primeira.headers["ETag"])
+        self.assertEqual(segunda.headers["X-Cache"], "MISS")
+        self.assertIn("Autor de Outro Worker", [autor["nome"] for autor in segunda.json["autores"]])
+
+        # O novo ETag só valida a resposta nova
+        revalidada = self.client.get("/autores", headers={"If-None-Match": segunda.headers["ETag"]})
+        self.assertEqual(revalidada.status_code, 304)
+        self.assertEqual(self.client.get("/autores").headers["X-Cache"], "HIT")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import json
+import re
+import unittest
+
+from tests import cria_cliente
+
+
+class DocumentacaoTest(unittest.TestCase):
+    """
+    A especificação OpenAPI gerada sob demanda (documentacao.py, que sobrescreve partes
+    internas do flask-openapi3) lista todas as rotas da API, com os schemas referenciados.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = cria_cliente()
+        response = cls.client.get("/openapi/openapi.json")
+        assert response.status_code == 200, response.status_code
+        cls.especificacao = response.json
+
+    def test_todas_as_rotas_documentadas(self):
+        from app import app
+
+        rotas = set()
+        for regra in app.url_map.iter_rules():
+            if regra.endpoint.startswith("catalogo."):
+                # /autor/<int:id>/livros -> /autor/{id}/livros
+                caminho = re.sub(r"<(?:[^:<>]+:)?([^<>]+)>", r"{\1}", regra.rule)
+                rotas.update((caminho, metodo.lower()) for metodo in regra.methods - {"HEAD", "OPTIONS"})
+        documentadas = {(caminho, metodo) for caminho, operacoes in self.especificacao["paths"].items()
+                        for metodo in operacoes}
+
+        self.assertGreater(len(rotas), 0)
+        self.assertEqual(rotas - documentadas, set())
+
+    def test_schemas_referenciados_existem(self):
+        referencias = set(re.findall(r'"\$ref": "#/components/schemas/([^"]+)"', json.dumps(self.especificacao)))
+        schemas = set(self.especificacao.get("components", {}).get("schemas", {}))
+
+        self.assertGreater(len(referencias), 0)
+        self.assertEqual(referencias - schemas, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
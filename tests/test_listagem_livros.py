@@ -0,0 +1,48 @@
+import unittest
+
+from sqlalchemy import event
+
+from tests import cria_cliente, limpa_catalogo
+
+
+class ListagemLivrosTest(unittest.TestCase):
+    """ GET /livros com número constante de comandos SQL, independente da quantidade de livros (sem N+1). """
+
+    def setUp(self):
+        self.client = cria_cliente()
+
+    def comandos_da_listagem(self, livros: int):
+        """ Gera um catálogo com 'livros' livros e retorna os comandos SQL de um GET /livros que lista todos. """
+        from model import Session, engine
+        from bench.catalogo import gera_catalogo
+
+        limpa_catalogo()
+        gera_catalogo(Session(), 5, 20, livros)
+        Session.remove()
+
+        comandos = []
+
+        def captura(conn, cursor, statement, parameters, context, executemany):
+            comandos.append(statement)
+
+        event.listen(engine, "before_cursor_execute", captura)
+        try:
+            response = self.client.get("/livros?limit=100")
+        finally:
+            event.remove(engine, "before_cursor_execute", captura)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json["livros"]), livros)
+        # A consulta das versões (ETag, ver etag.get_condicional) não faz parte da listagem
+        return [comando for comando in comandos if "versao_tabela" not in comando]
+
+    def test_comandos_constantes(self):
+        poucos = self.comandos_da_listagem(10)
+        muitos = self.comandos_da_listagem(80)
+
+        self.assertEqual(len(poucos), len(muitos))
+        self.assertLessEqual(len(muitos), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from datetime import datetime
+
+from tests import cria_cliente, limpa_catalogo
+
+
+class LivroViewTest(unittest.TestCase):
+    """ O modelo de leitura 'livro_view' copia o ano de livro.ano e lista os livros como as consultas com junções. """
+
+    def setUp(self):
+        from model import engine
+        from model.livro_view import configura_livro_view
+        from bench.catalogo import gera_catalogo
+        from model import Session
+
+        self.client = cria_cliente()
+        limpa_catalogo()
+        configura_livro_view(engine, True)
+        gera_catalogo(Session(), 5, 20, 200)
+        Session.remove()
+
+    def tearDown(self):
+        from model import engine, LIVROS_MATERIALIZADOS
+        from model.livro_view import configura_livro_view
+
+        configura_livro_view(engine, LIVROS_MATERIALIZADOS)
+
+    def consultas(self, **filtros):
+        from model import Session, consulta_livros
+
+        try:
+            return (consulta_livros(Session(), limit=1000, materializada=False, **filtros),
+                    consulta_livros(Session(), limit=1000, materializada=True, **filtros))
+        finally:
+            Session.remove()
+
+    def test_igual_as_juncoes_apos_escritas(self):
+        from model import Session, Livro
+
+        session = Session()
+        livro = session.query(Livro).order_by(Livro.id).first()
+        livro.ano_publicacao = datetime(1801, 6, 1)  # atualiza também livro.ano (ver Livro._atualiza_ano)
+        session.commit()
+        id_livro = livro.id
+        Session.remove()
+
+        juncoes, view = self.consultas()
+        self.assertEqual(view, juncoes)
+        juncoes, view = self.consultas(ano_de=1801, ano_ate=1801)
+        self.assertEqual([linha[0] for linha in view], [id_livro])
+        self.assertEqual(view, juncoes)
+
+    def test_ano_copiado_de_livro_ano(self):
+        from sqlalchemy import update
+        from model import Session, Livro
+
+        session = Session()
+        id_livro = session.query(Livro.id).order_by(Livro.id).limit(1).scalar()
+        # O ano da view vem de livro.ano, e não de ano_publicacao
+        session.execute(update(Livro.__table__).where(Livro.id == id_livro).values(ano=1700))
+        session.commit()
+        Session.remove()
+
+        juncoes, view = self.consultas(ano_de=1700, ano_ate=1700)
+        self.assertEqual([linha[0] for linha in view], [id_livro])
+        self.assertEqual(view, juncoes)
+
+    def test_reconstrucao(self):
+        from model import engine
+        from model.livro_view import reconstroi_livro_view
+
+        self.assertEqual(reconstroi_livro_view(engine), 200)
+        juncoes, view = self.consultas()
+        self.assertEqual(view, juncoes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from tests import cria_cliente, limpa_catalogo
+
+
+class PlanosListagemTest(unittest.TestCase):
+    """
+    Os filtros de GET /livros (ano_de/ano_ate, id_editora e id_autor, em todas as combinações)
+    são resolvidos por índices (SEARCH), sem percorrer tabelas inteiras (SCAN), com junções e
+    no modelo de leitura 'livro_view'.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from model import Session, engine
+        from model.livro_view import configura_livro_view
+        from bench.catalogo import gera_catalogo
+
+        cria_cliente()
+        limpa_catalogo()
+        gera_catalogo(Session(), 50, 500, 3000)
+        Session.remove()
+        configura_livro_view(engine, True)
+
+    @classmethod
+    def tearDownClass(cls):
+        from model import engine, LIVROS_MATERIALIZADOS
+        from model.livro_view import configura_livro_view
+
+        configura_livro_view(engine, LIVROS_MATERIALIZADOS)
+
+    def test_filtros_usam_indices(self):
+        from model import Session, engine
+        from bench.planos import verifica_planos
+
+        try:
+            resultado = verifica_planos(engine, Session())
+        finally:
+            Session.remove()
+
+        self.assertEqual(len({(item["livro_view"], tuple(item["filtros"])) for item in resultado}), 14)
+        for item in resultado:
+            with self.subTest(livro_view=item["livro_view"], filtros=item["filtros"]):
+                self.assertTrue(item["ok"], "\n".join([item["sql"]] + item["plano"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
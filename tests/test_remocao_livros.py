@@ -0,0 +1,40 @@
+import unittest
+
+from tests import cria_cliente, limpa_catalogo
+
+
+class RemocaoLivrosTest(unittest.TestCase):
+    """ DELETE /livros por intervalo de anos usa o mesmo critério de ano de GET /livros (a coluna 'ano'). """
+
+    def setUp(self):
+        self.client = cria_cliente()
+        limpa_catalogo()
+        editora = self.client.post("/editora", data={"nome": "Editora Remoção"}).json["id"]
+        autor = self.client.post("/autor", data={"nome": "Autor Remoção"}).json["id"]
+        for titulo, data in (("Fim de 1999", "1999-12-31T23:59:59"), ("Início de 2000", "2000-01-01"),
+                             ("Fim de 2000", "2000-12-31T23:59:59"), ("Início de 2001", "2001-01-01")):
+            self.client.post("/livro", data={"titulo": titulo, "ano_publicacao": data,
+                                            "id_editora": editora, "ids_autores": [autor]})
+
+    def titulos(self, query_string=None):
+        return sorted(livro["titulo"] for livro in self.client.get("/livros", query_string=query_string).json["livros"])
+
+    def test_remove_os_livros_do_ano_listados(self):
+        do_ano = self.titulos({"ano_de": 2000, "ano_ate": 2000})
+        self.assertEqual(do_ano, ["Fim de 2000", "Início de 2000"])
+
+        response = self.client.delete("/livros", query_string={"ano_de": 2000, "ano_ate": 2000})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["livros"], len(do_ano))
+        self.assertEqual(self.titulos(), ["Fim de 1999", "Início de 2001"])
+
+    def test_limites_de_ano_iguais_aos_da_listagem(self):
+        self.assertEqual(self.client.get("/livros", query_string={"ano_ate": 9999}).status_code, 200)
+        response = self.client.delete("/livros", query_string={"ano_de": 2001, "ano_ate": 9999})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["livros"], 1)
+        self.assertEqual(self.client.delete("/livros", query_string={"ano_ate": 10000}).status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()